@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asyncio IPTIME router module
+Event-loop counterpart of IPTimeWOL (stdlib asyncio, HTTP/1.1 keep-alive)
+"""
+
+import asyncio
+import json
+import ssl
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from iptime_wol import IPTimeWOL
+from metrics import ROUTER_REQUEST_SECONDS, ROUTER_REQUEST_FAILURES, ROUTER_RELOGINS
+from rate_limiter import TokenBucket, get_router_limiter
+
+
+class AsyncHTTPError(Exception):
+    """Connection, protocol or HTTP status error"""
+
+
+class ConnectionClosedError(AsyncHTTPError):
+    """Connection reset or closed before any response arrived (e.g., a stale keep-alive connection)"""
+
+
+class AsyncHTTPConnection:
+    """One keep-alive HTTP/1.1 connection (requests are sent one at a time)"""
+
+    def __init__(self, host: str, port: int, use_ssl: bool = False):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.requests_sent = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing() and not self.reader.at_eof()
+
+    async def open(self):
+        context = None
+        if self.use_ssl:
+            # Same as verify=False in the sync client (routers use self-signed certificates)
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, List[str]], bytes]:
+        """
+        Send a request and read the response
+
+        Returns:
+            (status, headers with lower-case names -> values, body)
+        """
+        if not self.is_open:
+            await self.open()
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        try:
+            self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+            await self.writer.drain()
+            self.requests_sent += 1
+            status_line = await self.reader.readline()
+        except ConnectionError as e:
+            raise ConnectionClosedError(f"Connection reset by router: {e}") from e
+        if not status_line:
+            raise ConnectionClosedError("Connection closed by router")
+        parts = status_line.decode('latin-1').split(' ', 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise AsyncHTTPError(f"Invalid status line: {status_line!r}")
+        status = int(parts[1])
+        response_headers: Dict[str, List[str]] = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers.setdefault(name.strip().lower(), []).append(value.strip())
+
+        if "chunked" in ",".join(response_headers.get("transfer-encoding", [])).lower():
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            data = b"".join(chunks)
+        elif "content-length" in response_headers:
+            data = await self.reader.readexactly(int(response_headers["content-length"][0]))
+        else:
+            data = await self.reader.read()
+
+        if parts[0] == "HTTP/1.0" or "close" in ",".join(response_headers.get("connection", [])).lower():
+            await self.close()
+        return status, response_headers, data
+
+
+class AsyncIPTimeWOL:
+    """IPTIME router client for asyncio (same methods as IPTimeWOL, awaitable)"""
+
+    def __init__(self, router_url: str, router_id: str, router_pw: str, timeout: float = 10,
+                 rate_limiter: Optional[TokenBucket] = None, max_connections: int = 2):
+        """
+        Args:
+            router_url: Router URL (e.g., http://192.168.0.1:80)
+            router_id: Router login ID
+            router_pw: Router login password
+            timeout: Deadline per request in seconds (including connection setup)
+            rate_limiter: Request rate limiter (default: shared limiter for this router URL)
+            max_connections: Keep-alive connections kept to the router
+        """
+        self.router_url = router_url.rstrip('/')
+        self.router_id = router_id
+        self.router_pw = router_pw
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_router_limiter(self.router_url)
+        parsed = urlsplit(self.router_url)
+        self._host = parsed.hostname
+        self._ssl = parsed.scheme == "https"
+        self._port = parsed.port or (443 if self._ssl else 80)
+        self._max_connections = max_connections
+        self._idle: List[AsyncHTTPConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.cookies: Dict[str, str] = {}
+        self.session_id: Optional[str] = None
+        self.logged_in = False
+        self.connections_opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Close all keep-alive connections"""
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await conn.close()
+
+    def _headers(self, referer_path: str) -> Dict[str, str]:
+        headers = {
+            'Accept': '*/*',
+            'Cache-Control': 'no-store',
+            'Connection': 'keep-alive',
+            'Content-Type': 'application/json; charset=utf-8',
+            'Origin': self.router_url,
+            'Referer': f'{self.router_url}{referer_path}',
+        }
+        if self.cookies:
+            headers['Cookie'] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        return headers
+
+    async def _exchange(self, data: dict, referer_path: str):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_connections)
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            if conn is None or not conn.is_open:
+                conn = AsyncHTTPConnection(self._host, self._port, self._ssl)
+                self.connections_opened += 1
+            payload = json.dumps(data).encode('utf-8')
+            reused = conn.requests_sent > 0
+            try:
+                try:
+                    status, headers, body = await conn.request(
+                        "POST", "/cgi/service.cgi", self._headers(referer_path), payload)
+                except ConnectionClosedError:
+                    if not reused:
+                        raise
+                    # The router dropped an idle keep-alive connection: retry once on a new one
+                    await conn.close()
+                    conn = AsyncHTTPConnection(self._host, self._port, self._ssl)
+                    self.connections_opened += 1
+                    status, headers, body = await conn.request(
+                        "POST", "/cgi/service.cgi", self._headers(referer_path), payload)
+            except BaseException:
+                # Unknown connection state (e.g., cancelled mid-response): never reuse it
+                await conn.close()
+                raise
+            if conn.is_open:
+                self._idle.append(conn)
+        for cookie in headers.get("set-cookie", []):
+            name, _, value = cookie.split(';', 1)[0].partition('=')
+            self.cookies[name.strip()] = value.strip()
+        if status >= 400:
+            raise AsyncHTTPError(f"{status} Error for url: {self.router_url}/cgi/service.cgi")
+        return body
+
+    async def _post(self, data: dict, referer_path: str = '/ui/') -> dict:
+        """
+        POST a request to /cgi/service.cgi within the request deadline
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            asyncio.TimeoutError: Deadline exceeded
+            AsyncHTTPError / OSError: Connection or HTTP error
+            ValueError: Invalid JSON
+        """
+        delay = self.rate_limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        method = data.get("method", "")
+        start = time.perf_counter()
+        try:
+            body = await asyncio.wait_for(self._exchange(data, referer_path), timeout=self.timeout)
+            return json.loads(body.decode('utf-8'))
+        except asyncio.TimeoutError:
+            ROUTER_REQUEST_FAILURES.inc(method=method, reason="timeout")
+            raise
+        except (AsyncHTTPError, OSError, asyncio.IncompleteReadError):
+            ROUTER_REQUEST_FAILURES.inc(method=method, reason="error")
+            raise
+        finally:
+            ROUTER_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method)
+
+    async def login(self) -> bool:
+        """
+        Login to router
+
+        Returns:
+            True if login successful
+
+        Raises:
+            Exception: Login failed
+        """
+        if self.logged_in:
+            ROUTER_RELOGINS.inc()
+        data = {"method": "session/login", "params": {"id": self.router_id, "pw": self.router_pw}}
+        try:
+            result = await self._post(data, '/ui/')
+        except asyncio.TimeoutError:
+            raise Exception(f"Router connection failed: timed out after {self.timeout}s")
+        except (AsyncHTTPError, OSError, asyncio.IncompleteReadError) as e:
+            raise Exception(f"Router connection failed: {e}")
+        except ValueError as e:
+            raise Exception(f"Router response parsing failed: {e}")
+        if 'efm_session_id' in self.cookies:
+            self.session_id = self.cookies['efm_session_id']
+        elif not (result.get('result') == 'success' or result.get('error') is None):
+            raise Exception(f"Login failed: {result}")
+        self.logged_in = True
+        return True
+
+    async def send_wol(self, mac_address: str) -> bool:
+        """
+        Send WOL packet
+
+        Raises:
+            Exception: WOL transmission failed
+        """
+        try:
+            result = await self._post({"method": "wol/signal", "params": [mac_address]}, '/ui/wol')
+        except asyncio.TimeoutError:
+            raise Exception(f"WOL packet transmission failed: timed out after {self.timeout}s")
+        except (AsyncHTTPError, OSError, asyncio.IncompleteReadError) as e:
+            raise Exception(f"WOL packet transmission failed: {e}")
+        except ValueError as e:
+            raise Exception(f"Router response parsing failed: {e}")
+        if result.get('result') == 'success' or result.get('error') is None:
+            return True
+        raise Exception(f"WOL transmission failed: {result}")
+
+    async def send_wol_packet(self, mac_address: str):
+        """Login and send WOL packet"""
+        await self.login()
+        await self.send_wol(mac_address)
+
+    async def get_port_link_status(self) -> list:
+        """
+        Query router for port link status
+
+        Returns:
+            List of port status dicts (see IPTimeWOL.get_port_link_status)
+        """
+        try:
+            result = await self._post({"method": "port/link/status"}, '/ui/port_setup')
+        except asyncio.TimeoutError:
+            raise Exception(f"Failed to query port link status: timed out after {self.timeout}s")
+        except (AsyncHTTPError, OSError, asyncio.IncompleteReadError) as e:
+            raise Exception(f"Failed to query port link status: {e}")
+        except ValueError as e:
+            raise Exception(f"Router response parsing failed: {e}")
+        return result.get('result', [])
+
+    async def is_lan_port_up(self, lan_port: int) -> bool:
+        """Check if the given LAN port has link up"""
+        for item in await self.get_port_link_status():
+            try:
+                if item.get('type') == 'lan' and int(item.get('port')) == int(lan_port):
+                    return IPTimeWOL._link_value_is_up(item.get('link'))
+            except Exception:
+                continue
+        return False
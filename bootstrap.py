@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Program bootstrap module
+Single entry for run.bat and the zipapp: install marker, cold start timing, app directory
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+_ENTERED = time.time()  # Fallback start time if the process start time is unknown
+
+MARKER_FILE = ".deps_installed"
+STARTUP_LOG = "startup_times.jsonl"
+STARTUP_LOG_SIZE = 200
+STARTUP_ONLY_ENV = "WOL_MSTSC_STARTUP_ONLY"  # Exit after startup is measured (benchmarks)
+
+
+def app_dir() -> Path:
+    """Directory holding config.json and state files (next to the .pyz when run as a zipapp)"""
+    here = Path(__file__).resolve().parent
+    return here.parent if here.is_file() else here
+
+
+def is_zipapp() -> bool:
+    return Path(__file__).resolve().parent.is_file()
+
+
+def requirements() -> List[str]:
+    """Requirement lines of requirements.txt (packaged into the zipapp by build_zipapp.py)"""
+    here = Path(__file__).resolve().parent
+    try:
+        if here.is_file():
+            with zipfile.ZipFile(here) as archive:
+                data = archive.read("requirements.txt")
+        else:
+            data = (here / "requirements.txt").read_bytes()
+    except (OSError, KeyError):
+        return []
+    return [line.strip() for line in data.decode("utf-8").splitlines()
+            if line.strip() and not line.strip().startswith("#")]
+
+
+def marker_content(reqs: List[str]) -> str:
+    """Marker text: hash of the requirements and the interpreter they were installed for"""
+    digest = hashlib.sha256("\n".join(reqs).encode("utf-8")).hexdigest()
+    return f"{digest}\n{sys.executable}\n"
+
+
+def ensure_dependencies(base_dir: Optional[Path] = None,
+                        installer: Optional[Callable[[List[str]], int]] = None) -> bool:
+    """
+    Install the requirements once, then trust the install marker
+
+    The marker is only rewritten after a successful install, and it is
+    invalidated by a different requirements.txt or interpreter. A normal
+    start reads one small file; no import check and no second interpreter.
+
+    Args:
+        base_dir: Directory of the marker (default: app_dir())
+        installer: Callable(requirement lines) -> exit code (default: pip in this interpreter)
+
+    Returns:
+        True if the dependencies are (now) installed
+    """
+    marker = (base_dir or app_dir()) / MARKER_FILE
+    reqs = requirements()
+    expected = marker_content(reqs)
+    try:
+        if marker.read_text(encoding="utf-8") == expected:
+            return True
+    except OSError:
+        pass
+
+    print("[INSTALL] Installing required Python packages...")
+    installer = installer or (lambda lines: subprocess.call([sys.executable, "-m", "pip", "install", *lines]))
+    if installer(reqs) != 0:
+        print("❌ Package installation failed. Run: python -m pip install -r requirements.txt")
+        return False
+    try:
+        marker.write_text(expected, encoding="utf-8")
+    except OSError:
+        pass
+    return True
+
+
+def process_start_time() -> Optional[float]:
+    """Epoch seconds when this process was created, None if the platform does not tell"""
+    try:
+        if os.name == "nt":
+            import ctypes
+            from ctypes import wintypes
+            times = [wintypes.FILETIME() for _ in range(4)]
+            kernel32 = ctypes.windll.kernel32
+            if not kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), *[ctypes.byref(t) for t in times]):
+                return None
+            created = (times[0].dwHighDateTime << 32) | times[0].dwLowDateTime
+            return created / 1e7 - 11644473600  # 100 ns ticks since 1601 -> Unix epoch
+        with open("/proc/self/stat", "r") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except Exception:
+        return None
+
+
+def record_startup(seconds: float, base_dir: Optional[Path] = None) -> dict:
+    """
+    Append a cold start measurement to startup_times.jsonl (last entries only)
+
+    Args:
+        seconds: Process start to program ready
+        base_dir: Directory of the log (default: app_dir())
+
+    Returns:
+        The record
+    """
+    record = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "seconds": round(seconds, 4),
+        "mode": "zipapp" if is_zipapp() else "source",
+        "python": f"{sys.version_info[0]}.{sys.version_info[1]}",
+    }
+    path = (base_dir or app_dir()) / STARTUP_LOG
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()[-(STARTUP_LOG_SIZE - 1):] if path.exists() else []
+        lines.append(json.dumps(record))
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    except OSError:
+        pass
+    return record
+
+
+def load_startup_records(base_dir: Optional[Path] = None) -> List[dict]:
+    path = (base_dir or app_dir()) / STARTUP_LOG
+    records = []
+    try:
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    except OSError:
+        pass
+    return records
+
+
+def format_startup_report(records: List[dict]) -> str:
+    """
+    Summarize cold start times per mode (source files vs zipapp)
+
+    Args:
+        records: Records from load_startup_records
+
+    Returns:
+        Report text
+    """
+    lines = [f"{'Mode':<8} {'Runs':>5} {'Median':>9} {'P90':>9} {'Last':>9}"]
+    for mode in ("source", "zipapp"):
+        values = [r["seconds"] for r in records if r.get("mode") == mode]
+        if not values:
+            continue
+        ordered = sorted(values)
+        median = ordered[len(ordered) // 2]
+        p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+        lines.append(f"{mode:<8} {len(values):>5} {median * 1000:>7.0f}ms {p90 * 1000:>7.0f}ms {values[-1] * 1000:>7.0f}ms")
+    return "\n".join(lines)
+
+
+def main():
+    """Check the install marker, load the program, record the cold start and run the CLI"""
+    if not ensure_dependencies():
+        sys.exit(1)
+    import wol_mstsc
+    from metrics import STARTUP_SECONDS
+
+    seconds = time.time() - (process_start_time() or _ENTERED)
+    STARTUP_SECONDS.observe(seconds)
+    record_startup(seconds)
+    if os.environ.get(STARTUP_ONLY_ENV):
+        return
+    wol_mstsc.cli()
+
+
+if __name__ == "__main__":
+    main()
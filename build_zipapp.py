@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zipapp build script
+Package the program as one wol_mstsc.pyz with precompiled bytecode, and benchmark cold starts
+"""
+
+import argparse
+import os
+import py_compile
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipapp
+from pathlib import Path
+from typing import List, Optional
+
+from bootstrap import STARTUP_ONLY_ENV, format_startup_report, load_startup_records
+
+SOURCE_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = "wol_mstsc.pyz"
+MAIN_SOURCE = '''# -*- coding: utf-8 -*-
+import bootstrap
+
+if __name__ == "__main__":
+    bootstrap.main()
+'''
+
+
+def program_modules(source_dir: Path = SOURCE_DIR) -> List[Path]:
+    """Modules that make up the program (no tests, no build script)"""
+    return sorted(p for p in source_dir.glob("*.py")
+                  if not p.name.startswith("test_") and p.name != Path(__file__).name)
+
+
+def build(output: Optional[Path] = None, source_dir: Path = SOURCE_DIR) -> Path:
+    """
+    Build the zipapp
+
+    Every module is stored with its bytecode next to it. The bytecode uses
+    unchecked hashes, so zipimport loads it without comparing timestamps;
+    an interpreter of another version ignores it (bad magic) and falls back
+    to the source. Entries are stored uncompressed, which loads faster.
+
+    Args:
+        output: Archive path (default: wol_mstsc.pyz in the source directory)
+        source_dir: Directory of the program modules
+
+    Returns:
+        Archive path
+    """
+    output = Path(output) if output else source_dir / DEFAULT_OUTPUT
+    with tempfile.TemporaryDirectory(prefix="wol_mstsc_build_") as stage:
+        stage = Path(stage)
+        for module in program_modules(source_dir):
+            shutil.copyfile(module, stage / module.name)
+            py_compile.compile(str(module), cfile=str(stage / (module.stem + ".pyc")), dfile=module.name,
+                               doraise=True, invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        (stage / "__main__.py").write_text(MAIN_SOURCE, encoding="utf-8")
+        shutil.copyfile(source_dir / "requirements.txt", stage / "requirements.txt")
+        tmp_output = output.with_name(output.name + ".tmp")
+        zipapp.create_archive(stage, target=tmp_output, interpreter="/usr/bin/env python3", compressed=False)
+        os.replace(tmp_output, output)
+    return output
+
+
+def benchmark(archive: Path, runs: int = 5, source_dir: Path = SOURCE_DIR) -> str:
+    """
+    Start the program from source files and from the zipapp several times
+
+    Each child exits as soon as the program is loaded and logs its own
+    cold start time (process creation to loaded) to startup_times.jsonl.
+
+    Args:
+        archive: Built zipapp
+        runs: Starts per mode
+        source_dir: Directory of the program modules
+
+    Returns:
+        Report text (wall clock per start and the startup log summary)
+    """
+    env = dict(os.environ, **{STARTUP_ONLY_ENV: "1"})
+    lines = []
+    for mode, command in (("source", [sys.executable, str(source_dir / "bootstrap.py")]),
+                          ("zipapp", [sys.executable, str(archive)])):
+        walls = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL)
+            walls.append(time.perf_counter() - start)
+        lines.append(f"{mode:<8} wall clock median {statistics.median(walls) * 1000:.0f}ms over {runs} starts")
+    lines.append("")
+    records = load_startup_records(source_dir)
+    if archive.parent.resolve() != source_dir.resolve():
+        records += load_startup_records(archive.parent)
+    lines.append(format_startup_report(records))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build wol_mstsc.pyz (single-file launcher with precompiled bytecode)')
+    parser.add_argument('-o', '--output', metavar='PATH', help=f'Archive path (default: {DEFAULT_OUTPUT} next to this script)')
+    parser.add_argument('--bench', type=int, metavar='RUNS', help='After building, compare cold starts of source files and the zipapp')
+    parser.add_argument('--report', action='store_true', help='Only print the cold start summary from startup_times.jsonl')
+    args = parser.parse_args()
+
+    if args.report:
+        print(format_startup_report(load_startup_records()))
+        return
+    archive = build(Path(args.output) if args.output else None)
+    print(f"✅ Built {archive} ({archive.stat().st_size // 1024} KB, Python {sys.version_info[0]}.{sys.version_info[1]} bytecode)")
+    if args.bench:
+        print("\n" + benchmark(archive, args.bench))
+
+
+if __name__ == "__main__":
+    main()
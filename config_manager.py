@@ -7,17 +7,17 @@ Save/load encrypted configuration files
 
 import json
 import os
-from pathlib import Path
 from typing import Dict, Any, Optional
 
-from crypto_utils import encrypt_data, decrypt_data
+from bootstrap import app_dir
+from crypto_utils import encrypt_data, decrypt_data, DEFAULT_KDF_ITERATIONS
 
 
 
 class ConfigManager:
     """Configuration file management class (JSON + encrypted credentials)"""
     def __init__(self, config_file: str = "config.json", cred_file: str = "credentials.enc"):
-        self.config_dir = Path(__file__).parent
+        self.config_dir = app_dir()
         self.config_path = self.config_dir / config_file
         self.cred_path = self.config_dir / cred_file
 
@@ -57,7 +57,8 @@ class ConfigManager:
         json_data = decrypt_data(
             encrypted["encrypted"],
             master_password,
-            encrypted["salt"]
+            encrypted["salt"],
+            encrypted.get("iterations", DEFAULT_KDF_ITERATIONS)
         )
         return json.loads(json_data)
 
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Credential provider module
+Master password backends (environment/fd, keyring, prompt) with per-process caching
+"""
+
+import getpass
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import crypto_utils
+from metrics import CREDENTIAL_LOOKUP_SECONDS
+
+PASSWORD_ENV_VAR = "WOL_MSTSC_MASTER_PASSWORD"
+PASSWORD_FD_ENV_VAR = "WOL_MSTSC_MASTER_PASSWORD_FD"
+
+
+class CredentialProvider:
+    """Base class for master password backends"""
+
+    name = ""
+    description = ""
+
+    def available(self) -> bool:
+        return True
+
+    def get(self) -> Optional[str]:
+        """Master password, or None if this backend has none"""
+        raise NotImplementedError
+
+    def store(self, password: str) -> bool:
+        """Save the password (False if the backend cannot store)"""
+        return False
+
+    def delete(self) -> bool:
+        """Remove a stored password (False if nothing was removed)"""
+        return False
+
+
+class NullProvider(CredentialProvider):
+    """Backend without any password (tests, non-interactive runs)"""
+
+    name = "null"
+    description = "no backend"
+
+    def available(self) -> bool:
+        return False
+
+    def get(self) -> Optional[str]:
+        return None
+
+
+class EnvProvider(CredentialProvider):
+    """Password from an environment variable or an inherited file descriptor
+
+    The file descriptor form (WOL_MSTSC_MASTER_PASSWORD_FD=3) keeps the
+    password out of the environment of child processes.
+    """
+
+    name = "env"
+    description = "environment"
+
+    def __init__(self, var: str = PASSWORD_ENV_VAR, fd_var: str = PASSWORD_FD_ENV_VAR):
+        self.var = var
+        self.fd_var = fd_var
+
+    def available(self) -> bool:
+        return bool(os.environ.get(self.var) or os.environ.get(self.fd_var))
+
+    def get(self) -> Optional[str]:
+        password = os.environ.get(self.var)
+        if password:
+            return password
+        fd = os.environ.get(self.fd_var)
+        if not fd:
+            return None
+        with os.fdopen(int(fd), 'r', encoding='utf-8') as f:
+            return f.readline().rstrip('\r\n') or None
+
+
+class KeyringProvider(CredentialProvider):
+    """Password saved in the OS keyring (Windows Credential Manager, Secret Service, ...)"""
+
+    name = "keyring"
+    description = "Windows Credential Manager"
+
+    def available(self) -> bool:
+        return crypto_utils.is_keyring_available()
+
+    def get(self) -> Optional[str]:
+        return crypto_utils.load_master_password()
+
+    def store(self, password: str) -> bool:
+        return crypto_utils.save_master_password(password)
+
+    def delete(self) -> bool:
+        return crypto_utils.delete_master_password()
+
+
+class PromptProvider(CredentialProvider):
+    """Password typed by the user"""
+
+    name = "prompt"
+    description = "prompt"
+
+    def __init__(self, prompt: str = "Enter master password: "):
+        self.prompt = prompt
+
+    def get(self) -> Optional[str]:
+        return getpass.getpass(self.prompt) or None
+
+
+class CachedProvider(CredentialProvider):
+    """Look a backend up at most once per process and record how long it took"""
+
+    def __init__(self, provider: CredentialProvider):
+        self.provider = provider
+        self.name = provider.name
+        self.description = provider.description
+        self.seconds: Optional[float] = None
+        self._loaded = False
+        self._value: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return self.provider.available()
+
+    def get(self) -> Optional[str]:
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                try:
+                    self._value = self.provider.get() if self.provider.available() else None
+                finally:
+                    self.seconds = time.perf_counter() - start
+                    CREDENTIAL_LOOKUP_SECONDS.observe(self.seconds, backend=self.name)
+                self._loaded = True
+            return self._value
+
+    def store(self, password: str) -> bool:
+        with self._lock:
+            stored = self.provider.store(password)
+            if stored:
+                self._value, self._loaded = password, True
+            return stored
+
+    def delete(self) -> bool:
+        with self._lock:
+            deleted = self.provider.delete()
+            if deleted:
+                self._value, self._loaded = None, True
+            return deleted
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._value = None
+
+
+class CredentialChain:
+    """Ordered saved-password backends; the first one with a password wins"""
+
+    def __init__(self, providers: List[CredentialProvider]):
+        self.providers = [p if isinstance(p, CachedProvider) else CachedProvider(p) for p in providers]
+
+    def lookup(self) -> tuple:
+        """
+        Returns:
+            (password, provider) from the first backend that has one, or (None, None)
+        """
+        for provider in self.providers:
+            password = provider.get()
+            if password:
+                return password, provider
+        return None, None
+
+    def provider(self, name: str) -> CachedProvider:
+        """Backend by name (NullProvider if not in the chain)"""
+        for provider in self.providers:
+            if provider.name == name:
+                return provider
+        return CachedProvider(NullProvider())
+
+    def timings(self) -> Dict[str, float]:
+        """Lookup seconds per backend that was queried"""
+        return {p.name: p.seconds for p in self.providers if p.seconds is not None}
+
+
+_default_chain: Optional[CredentialChain] = None
+
+
+def default_chain() -> CredentialChain:
+    """Process-wide chain: environment/fd first, then the keyring"""
+    global _default_chain
+    if _default_chain is None:
+        _default_chain = CredentialChain([EnvProvider(), KeyringProvider()])
+    return _default_chain
+
+
+def set_default_chain(chain: Optional[CredentialChain]):
+    """Replace the process-wide chain (None rebuilds the default on next use)"""
+    global _default_chain
+    _default_chain = chain
@@ -12,20 +12,48 @@ from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-try:
-    import keyring
-    KEYRING_AVAILABLE = True
-except ImportError:
-    KEYRING_AVAILABLE = False
+# keyring is imported on first use: importing it discovers backends, which
+# is slow on some platforms and not needed by most commands
+_UNLOADED = object()
+_keyring = _UNLOADED
 
 
-def derive_key_from_password(password: str, salt: bytes) -> bytes:
+def _get_keyring():
+    """keyring module (or the backend set with set_keyring_backend), None if unavailable"""
+    global _keyring
+    if _keyring is _UNLOADED:
+        try:
+            import keyring
+            _keyring = keyring
+        except ImportError:
+            _keyring = None
+    return _keyring
+
+
+def set_keyring_backend(backend):
+    """
+    Replace the keyring module (e.g., an in-memory backend in tests)
+
+    Args:
+        backend: Object with get_password/set_password/delete_password, or None for no keyring
+    """
+    global _keyring
+    _keyring = backend
+
+
+# PBKDF2 iterations for new vaults; vaults store their own count
+# (files without one were written with this default)
+DEFAULT_KDF_ITERATIONS = 100000
+
+
+def derive_key_from_password(password: str, salt: bytes, iterations: int = DEFAULT_KDF_ITERATIONS) -> bytes:
     """
     Derive encryption key from master password
     
     Args:
         password: Master password
         salt: Salt value
+        iterations: PBKDF2 iteration count
         
     Returns:
         Encryption key (bytes)
@@ -34,13 +62,13 @@ def derive_key_from_password(password: str, salt: bytes) -> bytes:
         algorithm=hashes.SHA256(),
         length=32,
         salt=salt,
-        iterations=100000,
+        iterations=iterations,
     )
     key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
     return key
 
 
-def encrypt_data(data: str, password: str, salt: bytes = None) -> dict:
+def encrypt_data(data: str, password: str, salt: bytes = None, iterations: int = DEFAULT_KDF_ITERATIONS) -> dict:
     """
     Encrypt data
      
@@ -48,25 +76,27 @@ def encrypt_data(data: str, password: str, salt: bytes = None) -> dict:
         data: Data to encrypt (string)
         password: Master password
         salt: Salt value (auto-generated if None)
+        iterations: PBKDF2 iteration count
         
     Returns:
-        {"encrypted": encrypted data, "salt": salt value}
+        {"encrypted": encrypted data, "salt": salt value, "iterations": PBKDF2 iterations}
     """
     if salt is None:
         salt = os.urandom(16)
     
-    key = derive_key_from_password(password, salt)
+    key = derive_key_from_password(password, salt, iterations)
     fernet = Fernet(key)
     
     encrypted = fernet.encrypt(data.encode())
     
     return {
         "encrypted": base64.b64encode(encrypted).decode(),
-        "salt": base64.b64encode(salt).decode()
+        "salt": base64.b64encode(salt).decode(),
+        "iterations": iterations
     }
 
 
-def decrypt_data(encrypted_data: str, password: str, salt: str) -> str:
+def decrypt_data(encrypted_data: str, password: str, salt: str, iterations: int = DEFAULT_KDF_ITERATIONS) -> str:
     """
     Decrypt data
     
@@ -74,6 +104,7 @@ def decrypt_data(encrypted_data: str, password: str, salt: str) -> str:
         encrypted_data: Encrypted data (base64 encoded string)
         password: Master password
         salt: Salt value (base64 encoded string)
+        iterations: PBKDF2 iteration count the data was encrypted with
         
     Returns:
         Decrypted data (string)
@@ -84,7 +115,7 @@ def decrypt_data(encrypted_data: str, password: str, salt: str) -> str:
     salt_bytes = base64.b64decode(salt)
     encrypted_bytes = base64.b64decode(encrypted_data)
     
-    key = derive_key_from_password(password, salt_bytes)
+    key = derive_key_from_password(password, salt_bytes, iterations)
     fernet = Fernet(key)
     
     try:
@@ -141,7 +172,7 @@ def is_keyring_available() -> bool:
     Returns:
         True if keyring is available
     """
-    return KEYRING_AVAILABLE
+    return _get_keyring() is not None
 
 
 def save_master_password(password: str) -> bool:
@@ -154,7 +185,8 @@ def save_master_password(password: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    if not KEYRING_AVAILABLE:
+    keyring = _get_keyring()
+    if keyring is None:
         return False
     
     try:
@@ -172,7 +204,8 @@ def load_master_password() -> str | None:
     Returns:
         Master password if found, None otherwise
     """
-    if not KEYRING_AVAILABLE:
+    keyring = _get_keyring()
+    if keyring is None:
         return None
     
     try:
@@ -190,7 +223,8 @@ def delete_master_password() -> bool:
     Returns:
         True if successful, False otherwise
     """
-    if not KEYRING_AVAILABLE:
+    keyring = _get_keyring()
+    if keyring is None:
         return False
     
     try:
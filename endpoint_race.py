@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Endpoint race module
+Race a cheap probe across alternative endpoints and remember the winner
+"""
+
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Tuple
+
+from bootstrap import app_dir
+from state_cache import StateCache
+
+DEFAULT_ENDPOINT_FILE = "endpoint_state.json"
+# A remembered winner is used without racing until it is this old (or fails)
+PREFERENCE_TTL = 600.0
+
+
+def race(endpoints: Sequence[str], probe: Callable[[str, float], Optional[float]],
+         timeout: float = 2.0) -> Optional[Tuple[str, float]]:
+    """
+    Probe all endpoints at once and return the first that answers
+
+    Args:
+        endpoints: Candidate endpoints
+        probe: Callable(endpoint, timeout) -> seconds, or None if unreachable
+        timeout: Seconds for each probe
+
+    Returns:
+        (winning endpoint, probe seconds), or None if none answered
+    """
+    results: "queue.Queue[tuple]" = queue.Queue()
+
+    def run(endpoint: str):
+        try:
+            results.put((endpoint, probe(endpoint, timeout)))
+        except Exception:
+            results.put((endpoint, None))
+
+    for endpoint in endpoints:
+        threading.Thread(target=run, args=(endpoint,), daemon=True, name="endpoint-race").start()
+    for _ in endpoints:
+        endpoint, seconds = results.get()
+        if seconds is not None:
+            return endpoint, seconds
+    return None
+
+
+class EndpointMemory:
+    """Winning endpoint per key (router, target), shared between processes"""
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = PREFERENCE_TTL):
+        """
+        Args:
+            path: State file (default: endpoint_state.json next to this module)
+            ttl: Seconds a winner stays preferred before the endpoints are raced again
+        """
+        self.cache = StateCache(Path(path) if path else app_dir() / DEFAULT_ENDPOINT_FILE, ttl=ttl)
+
+    def preferred(self, key: str) -> Optional[str]:
+        entry = self.cache.get(key)
+        return entry.get("endpoint") if entry else None
+
+    def remember(self, key: str, endpoint: str, seconds: float):
+        self.cache.put(key, endpoint=endpoint, seconds=seconds)
+
+    def forget(self, key: str):
+        self.cache.invalidate(key)
+
+
+_memory: Optional[EndpointMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_endpoint_memory() -> EndpointMemory:
+    """Process-wide endpoint memory (endpoint_state.json)"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = EndpointMemory()
+        return _memory
+
+
+def set_endpoint_memory(memory: Optional[EndpointMemory]):
+    """Replace the process-wide endpoint memory (None restores the default on next use)"""
+    global _memory
+    with _memory_lock:
+        _memory = memory
+
+
+def pick_endpoint(key: str, endpoints: Sequence[str], probe: Callable[[str, float], Optional[float]],
+                  timeout: float = 2.0, memory: Optional[EndpointMemory] = None) -> Optional[str]:
+    """
+    Choose the endpoint to use
+
+    A single endpoint is returned without probing. Otherwise the remembered
+    winner is used while it is fresh; if there is none, all endpoints are
+    raced and the winner is remembered.
+
+    Args:
+        key: What the endpoints lead to (e.g., "router:http://192.168.0.1")
+        endpoints: Candidate endpoints, in configured order
+        probe: Callable(endpoint, timeout) -> seconds, or None if unreachable
+        timeout: Seconds for each probe
+        memory: Endpoint memory (default: process-wide)
+
+    Returns:
+        Endpoint, or None if none answered
+    """
+    endpoints = list(dict.fromkeys(endpoints))
+    if len(endpoints) <= 1:
+        return endpoints[0] if endpoints else None
+    memory = memory or get_endpoint_memory()
+    preferred = memory.preferred(key)
+    if preferred in endpoints:
+        return preferred
+    winner = race(endpoints, probe, timeout)
+    if winner is None:
+        return None
+    memory.remember(key, *winner)
+    return winner[0]
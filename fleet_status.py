@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fleet status module
+Check every configured target at once (router port link + RDP reachability)
+"""
+
+import queue
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from iptime_wol import IPTimeWOL
+from rate_limiter import router_limiter_for
+from rdp_probe import parse_server, probe_any, rdp_endpoints
+from router_drivers import best_router_url
+from state_cache import StateCache
+
+LINK_MAX_AGE = 24 * 3600.0  # Seconds a seen port link value stays usable (it rarely changes)
+
+
+# X.224 Connection Request with an RDP Negotiation Request (TLS | CredSSP)
+_RDP_NEG_REQUEST = bytes([0x03, 0x00, 0x00, 0x13, 0x0e, 0xe0, 0x00, 0x00, 0x00, 0x00, 0x00,
+                          0x01, 0x00, 0x08, 0x00, 0x03, 0x00, 0x00, 0x00])
+
+
+def rdp_handshake(host: str, port: int, timeout: float = 2.0) -> bool:
+    """
+    Check that an RDP server answers the X.224 connection request
+
+    Args:
+        host: RDP host
+        port: RDP port
+        timeout: Socket timeout in seconds
+
+    Returns:
+        True if the reply is an X.224 Connection Confirm
+    """
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            sock.sendall(_RDP_NEG_REQUEST)
+            reply = sock.recv(64)
+            # TPKT version 3, X.224 Connection Confirm (0xD0)
+            return len(reply) >= 6 and reply[0] == 0x03 and reply[5] & 0xF0 == 0xD0
+    except OSError:
+        return False
+
+
+class TargetStatus:
+    """Status of one target"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.link: Optional[str] = None  # Router link value (e.g., "1000f"), "" if down
+        self.link_up: Optional[bool] = None
+        self.rdp_seconds: Optional[float] = None  # TCP connect time
+        self.rdp_open: Optional[bool] = None
+        self.handshake: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.cached_age: Optional[float] = None
+
+    @property
+    def is_up(self) -> bool:
+        return bool(self.rdp_open or self.link_up)
+
+    def to_dict(self) -> dict:
+        return {
+            "link": self.link,
+            "link_up": self.link_up,
+            "rdp_seconds": self.rdp_seconds,
+            "rdp_open": self.rdp_open,
+            "handshake": self.handshake,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> "TargetStatus":
+        status = cls(name)
+        for key in ("link", "link_up", "rdp_seconds", "rdp_open", "handshake", "error"):
+            setattr(status, key, data.get(key))
+        status.cached_age = data.get("age")
+        return status
+
+
+def status_sweep(targets: List[dict], credentials: Dict[str, dict], deadline: float = 5.0,
+                 handshake: bool = False, cache: Optional[StateCache] = None, max_age: Optional[float] = None,
+                 on_result: Optional[Callable[[TargetStatus], None]] = None,
+                 client_factory: Optional[Callable] = None) -> List[TargetStatus]:
+    """
+    Check all targets concurrently within one deadline
+
+    Router port links are fetched with one port/link/status call per
+    router; each RDP server gets a TCP check (and optionally an RDP
+    handshake). Results are passed to on_result as soon as each target
+    is complete.
+
+    Args:
+        targets: Target configs
+        credentials: Credentials per target name (router login for link status)
+        deadline: Seconds for the whole sweep
+        handshake: Also perform an RDP X.224 handshake
+        cache: State cache to read fresh results from and store new ones in
+        max_age: Reuse cached results younger than this many seconds (default: the cache TTL; 0: always probe)
+        on_result: Callback called with each completed TargetStatus
+        client_factory: Callable(target, cred) -> IPTimeWOL-like client (for tests)
+
+    Returns:
+        Statuses in completion order
+    """
+    start = time.monotonic()
+    results: List[TargetStatus] = []
+    statuses: Dict[str, TargetStatus] = {}
+    pending_parts: Dict[str, int] = {}
+
+    def complete(status: TargetStatus):
+        results.append(status)
+        if cache and status.cached_age is None:
+            cache.put(status.name, status=status.to_dict())
+        if on_result:
+            on_result(status)
+
+    if max_age is None:
+        max_age = cache.ttl if cache else 0.0
+    to_probe = []
+    for target in targets:
+        cached = cache.get(target["name"], max_age=max_age) if cache and max_age > 0 else None
+        if cached and "status" in cached:
+            complete(TargetStatus.from_dict(target["name"], dict(cached["status"], age=cached["age"])))
+        else:
+            to_probe.append(target)
+    if not to_probe:
+        return results
+
+    def router_task(router_targets: List[dict]):
+        first = router_targets[0]
+        cred = credentials[first["name"]]
+        if client_factory:
+            client = client_factory(first, cred)
+        else:
+            client = IPTimeWOL(router_url=best_router_url(first["router"]), router_id=cred["router_id"],
+                               router_pw=cred["router_pw"], rate_limiter=router_limiter_for(first["router"]),
+                               timeout=deadline, verbose=False)
+        client.login()
+        links = {int(item.get('port')): item.get('link') or ""
+                 for item in client.get_port_link_status() if item.get('type') == 'lan'}
+        for t in router_targets:
+            status = statuses[t["name"]]
+            status.link = links.get(int(t["wol"]["lan_port"]), "")
+            status.link_up = IPTimeWOL._link_value_is_up(status.link)
+
+    def rdp_task(target: dict):
+        status = statuses[target["name"]]
+        remaining = max(0.1, deadline - (time.monotonic() - start))
+        winner = probe_any(rdp_endpoints(target["rdp"]), timeout=remaining)
+        server, status.rdp_seconds = winner if winner else (None, None)
+        status.rdp_open = status.rdp_seconds is not None
+        if handshake and status.rdp_open:
+            host, port = parse_server(server)
+            status.handshake = rdp_handshake(host, port, timeout=max(0.1, deadline - (time.monotonic() - start)))
+
+    # One link status call per router account
+    routers: Dict[tuple, List[dict]] = {}
+    for target in to_probe:
+        statuses[target["name"]] = TargetStatus(target["name"])
+        pending_parts[target["name"]] = 1
+        cred = credentials.get(target["name"])
+        if cred and target.get("wol", {}).get("lan_port", 0) > 0:
+            key = (target["router"]["url"].rstrip('/').lower(), cred["router_id"])
+            routers.setdefault(key, []).append(target)
+            pending_parts[target["name"]] += 1
+
+    # Daemon threads: a probe stuck past the deadline must not keep the process alive
+    done: "queue.Queue[Tuple[str, List[str], Optional[BaseException]]]" = queue.Queue()
+
+    def run_task(kind: str, task: Callable, *args):
+        names = [t["name"] for t in args[0]] if kind == "router" else [args[0]["name"]]
+        try:
+            task(*args)
+            done.put((kind, names, None))
+        except Exception as e:
+            done.put((kind, names, e))
+
+    tasks = [("router", router_task, router_targets) for router_targets in routers.values()]
+    tasks += [("rdp", rdp_task, target) for target in to_probe]
+    for kind, task, arg in tasks:
+        threading.Thread(target=run_task, args=(kind, task, arg), name=f"status-{kind}", daemon=True).start()
+
+    for _ in range(len(tasks)):
+        remaining = deadline - (time.monotonic() - start)
+        if remaining <= 0:
+            break
+        try:
+            kind, names, error = done.get(timeout=remaining)
+        except queue.Empty:
+            break
+        for name in names:
+            if error:
+                statuses[name].error = "; ".join(filter(None, [statuses[name].error, f"{kind}: {error}"]))
+            pending_parts[name] -= 1
+            if pending_parts[name] == 0:
+                complete(statuses[name])
+
+    for name, parts in pending_parts.items():
+        if parts > 0:
+            statuses[name].error = statuses[name].error or "timeout"
+            complete(statuses[name])
+    return results
+
+
+def precheck_target(target: dict, cache: StateCache, probe_timeout: float = 0.5) -> Optional[TargetStatus]:
+    """
+    Fast check whether a target is already up (reconnect path)
+
+    A fresh entry in the state cache is trusted as is, whether the RDP port
+    was open ("up") or the target was down; otherwise the RDP endpoints get
+    one short TCP probe (raced if there are several) and the result is
+    stored for other processes.
+
+    Args:
+        target: Target config
+        cache: Shared state cache
+        probe_timeout: Seconds for the TCP probe
+
+    Returns:
+        Status if the RDP port is reachable (cached_age set if taken from the cache), otherwise None (wake needed)
+    """
+    name = target["name"]
+    entry = cache.get(name, max_age=LINK_MAX_AGE)
+    cached = entry if entry and entry["age"] <= cache.ttl else None
+    status = TargetStatus.from_dict(name, dict(cached.get("status", {}), age=cached["age"])) if cached else TargetStatus(name)
+    if cached and status.rdp_open:
+        return status
+    if cached and not status.is_up:
+        return None
+    status.cached_age = None
+    if entry and not cached:
+        # Keep the last link value seen (RDP profile selection) across stale entries
+        status.link = entry.get("status", {}).get("link")
+    winner = probe_any(rdp_endpoints(target["rdp"]), timeout=probe_timeout)
+    status.rdp_seconds = winner[1] if winner else None
+    status.rdp_open = status.rdp_seconds is not None
+    cache.put(name, status=status.to_dict())
+    return status if status.rdp_open else None
+
+
+def record_link(cache: StateCache, name: str, link: str):
+    """
+    Remember the router link value seen while a target came up
+
+    Args:
+        cache: Shared state cache
+        name: Target name
+        link: Router link value of the target's LAN port (e.g., "1000f")
+    """
+    cached = cache.get(name, max_age=LINK_MAX_AGE)
+    status = TargetStatus.from_dict(name, cached.get("status", {}) if cached else {})
+    status.link = link
+    status.link_up = IPTimeWOL._link_value_is_up(link)
+    status.error = None
+    if status.rdp_open is False:
+        # Measured before the machine came up
+        status.rdp_open = status.rdp_seconds = status.handshake = None
+    cache.put(name, status=status.to_dict())
+
+
+def record_connected(target: dict, cache: StateCache):
+    """Remember that a Remote Desktop session to the target was just established"""
+    cached = cache.get(target["name"], max_age=LINK_MAX_AGE)
+    status = TargetStatus.from_dict(target["name"], cached.get("status", {}) if cached else {})
+    status.rdp_open = True
+    status.error = None
+    cache.put(target["name"], status=status.to_dict())
+
+
+def known_link(cache: StateCache, name: str) -> Optional[str]:
+    """Last router link value seen for a target within LINK_MAX_AGE (e.g., "100f"), None if unknown"""
+    cached = cache.get(name, max_age=LINK_MAX_AGE)
+    return cached.get("status", {}).get("link") if cached else None
+
+
+def format_status_header() -> str:
+    return f"{'Target':<16} {'Link':<8} {'RDP':<10} {'Handshake':<10} Note"
+
+
+def format_status_row(status: TargetStatus) -> str:
+    """
+    Format one status as a table row
+
+    Args:
+        status: Target status
+
+    Returns:
+        Row text
+    """
+    if status.link_up is None:
+        link = "-"
+    else:
+        link = status.link if status.link_up else "down"
+    if status.rdp_open is None:
+        rdp = "-"
+    else:
+        rdp = f"{status.rdp_seconds * 1000:.0f} ms" if status.rdp_open else "closed"
+    shake = "-" if status.handshake is None else ("ok" if status.handshake else "failed")
+    notes = []
+    if status.cached_age is not None:
+        notes.append(f"cached {status.cached_age:.0f}s ago")
+    if status.error:
+        notes.append(status.error)
+    return f"{status.name:<16} {link:<8} {rdp:<10} {shake:<10} {', '.join(notes)}"
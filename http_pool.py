@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP connection pool module
+Process-wide keep-alive connection pools per router, shared by all router clients
+"""
+
+import threading
+from typing import Dict
+
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from metrics import ROUTER_CONNECTIONS_OPENED
+
+# One router host per pool; a few connections cover the status poller,
+# retries and concurrent wakes against the same router
+DEFAULT_POOL_MAXSIZE = 4
+
+
+class RouterAdapter(HTTPAdapter):
+    """HTTPAdapter that counts requests and newly opened connections"""
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_MAXSIZE):
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self._stats_lock = threading.Lock()
+        super().__init__(pool_connections=1, pool_maxsize=pool_maxsize, pool_block=False)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+
+        def counting(base):
+            class CountingPool(base):
+                def _new_conn(self):
+                    with adapter._stats_lock:
+                        adapter.connections_opened += 1
+                    ROUTER_CONNECTIONS_OPENED.inc()
+                    return super()._new_conn()
+            return CountingPool
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": counting(HTTPConnectionPool),
+            "https": counting(HTTPSConnectionPool),
+        }
+
+    def send(self, request, **kwargs):
+        with self._stats_lock:
+            self.requests_sent += 1
+        return super().send(request, **kwargs)
+
+
+_adapters: Dict[str, RouterAdapter] = {}
+_adapters_lock = threading.Lock()
+
+
+def _key(router_url: str) -> str:
+    return router_url.rstrip('/').lower()
+
+
+def get_adapter(router_url: str) -> RouterAdapter:
+    """
+    Get the process-wide adapter (connection pool) for a router
+
+    Args:
+        router_url: Router URL (e.g., http://192.168.0.1:80)
+    """
+    key = _key(router_url)
+    with _adapters_lock:
+        if key not in _adapters:
+            _adapters[key] = RouterAdapter()
+        return _adapters[key]
+
+
+def mount_shared_pool(session, router_url: str):
+    """
+    Route a session's requests to the router through the shared pool
+
+    The session keeps its own cookies (router login); only the TCP
+    connections are shared.
+
+    Args:
+        session: requests.Session-like object (left alone if it has no mount())
+        router_url: Router URL
+    """
+    if hasattr(session, "mount"):
+        session.mount(router_url.rstrip('/') + '/', get_adapter(router_url))
+
+
+def pool_stats() -> Dict[str, dict]:
+    """
+    Connection reuse per router
+
+    Returns:
+        Router URL -> {"requests": n, "connections": n, "reused": n}
+    """
+    with _adapters_lock:
+        adapters = dict(_adapters)
+    return {
+        url: {
+            "requests": a.requests_sent,
+            "connections": a.connections_opened,
+            "reused": max(0, a.requests_sent - a.connections_opened),
+        }
+        for url, a in adapters.items()
+    }
+
+
+def reset_pools():
+    """Close and forget every shared pool"""
+    with _adapters_lock:
+        for adapter in _adapters.values():
+            adapter.close()
+        _adapters.clear()
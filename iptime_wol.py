@@ -7,24 +7,111 @@ Login to IPTIME router and send WOL packets
 
 import requests
 import json
+import time
 from typing import Optional
 
+from http_pool import mount_shared_pool
+from metrics import ROUTER_REQUEST_SECONDS, ROUTER_REQUEST_FAILURES, ROUTER_RELOGINS
+from rate_limiter import TokenBucket, get_router_limiter
+
+
+# Factory for the HTTP session of new IPTimeWOL instances
+# (replaced e.g. by router_trace.enable_recording)
+_session_factory = requests.Session
+
+
+def set_session_factory(factory):
+    """
+    Set the factory used to create HTTP sessions for new IPTimeWOL instances
+
+    Args:
+        factory: Callable returning a requests.Session-like object (None restores the default)
+    """
+    global _session_factory
+    _session_factory = factory or requests.Session
+
 
 class IPTimeWOL:
     """IPTIME router WOL class"""
     
-    def __init__(self, router_url: str, router_id: str, router_pw: str):
+    def __init__(self, router_url: str, router_id: str, router_pw: str,
+                 rate_limiter: Optional[TokenBucket] = None, timeout: float = 10, verbose: bool = True,
+                 session: Optional[requests.Session] = None):
         """
         Args:
             router_url: Router URL (e.g., http://192.168.0.1:80)
             router_id: Router login ID
             router_pw: Router login password
+            rate_limiter: Request rate limiter (default: shared limiter for this router URL)
+            timeout: Request timeout in seconds
+            verbose: Print progress messages
+            session: HTTP session (default: from the session factory; e.g., a trace replay session)
         """
         self.router_url = router_url.rstrip('/')
         self.router_id = router_id
         self.router_pw = router_pw
-        self.session = requests.Session()
+        self.session = session or _session_factory()
+        # Connections come from the router's shared pool; cookies stay per client
+        mount_shared_pool(self.session, self.router_url)
         self.session_id: Optional[str] = None
+        self.logged_in = False
+        self.rate_limiter = rate_limiter or get_router_limiter(self.router_url)
+        self.timeout = timeout
+        self.verbose = verbose
+    
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+    
+    def _headers(self, referer_path: str) -> dict:
+        """Browser-like request headers expected by the router UI API"""
+        return {
+            'Accept': '*/*',
+            'Accept-Language': 'ko;q=0.7',
+            'Cache-Control': 'no-store',
+            'Connection': 'keep-alive',
+            'Content-Type': 'application/json; charset=utf-8',
+            'Origin': self.router_url,
+            'Referer': f'{self.router_url}{referer_path}',
+            'Sec-GPC': '1',
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36'
+        }
+    
+    def _post(self, data: dict, referer_path: str = '/ui/') -> requests.Response:
+        """
+        POST a request to /cgi/service.cgi (rate limited per router)
+        
+        Args:
+            data: Request body ({"method": ..., "params": ...})
+            referer_path: UI page the request appears to come from
+            
+        Returns:
+            Response (status already checked)
+            
+        Raises:
+            requests.exceptions.RequestException: Connection or HTTP error
+        """
+        self.rate_limiter.acquire()
+        method = data.get("method", "")
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                f"{self.router_url}/cgi/service.cgi",
+                headers=self._headers(referer_path),
+                json=data,
+                verify=False,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response
+        except requests.exceptions.Timeout:
+            ROUTER_REQUEST_FAILURES.inc(method=method, reason="timeout")
+            raise
+        except requests.exceptions.RequestException:
+            ROUTER_REQUEST_FAILURES.inc(method=method, reason="error")
+            raise
+        finally:
+            ROUTER_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method)
     
     def login(self) -> bool:
         """
@@ -36,19 +123,8 @@ class IPTimeWOL:
         Raises:
             Exception: Login failed
         """
-        url = f"{self.router_url}/cgi/service.cgi"
-        
-        headers = {
-            'Accept': '*/*',
-            'Accept-Language': 'ko;q=0.7',
-            'Cache-Control': 'no-store',
-            'Connection': 'keep-alive',
-            'Content-Type': 'application/json; charset=utf-8',
-            'Origin': self.router_url,
-            'Referer': f'{self.router_url}/ui/',
-            'Sec-GPC': '1',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36'
-        }
+        if self.logged_in:
+            ROUTER_RELOGINS.inc()
         
         data = {
             "method": "session/login",
@@ -59,26 +135,20 @@ class IPTimeWOL:
         }
         
         try:
-            response = self.session.post(
-                url,
-                headers=headers,
-                json=data,
-                verify=False,
-                timeout=10
-            )
-            
-            response.raise_for_status()
+            response = self._post(data, '/ui/')
             
             # Extract session ID from cookies
             if 'efm_session_id' in self.session.cookies:
                 self.session_id = self.session.cookies['efm_session_id']
-                print(f"✅ Router login successful (session: {self.session_id[:6]}...)")
+                self._log(f"✅ Router login successful (session: {self.session_id[:6]}...)")
+                self.logged_in = True
                 return True
             else:
                 # Check response body
                 result = response.json()
                 if result.get('result') == 'success' or result.get('error') is None:
-                    print("✅ Router login successful")
+                    self._log("✅ Router login successful")
+                    self.logged_in = True
                     return True
                 else:
                     raise Exception(f"Login failed: {result}")
@@ -101,41 +171,19 @@ class IPTimeWOL:
         Raises:
             Exception: WOL transmission failed
         """
-        url = f"{self.router_url}/cgi/service.cgi"
-        
-        headers = {
-            'Accept': '*/*',
-            'Accept-Language': 'ko;q=0.7',
-            'Cache-Control': 'no-store',
-            'Connection': 'keep-alive',
-            'Content-Type': 'application/json; charset=utf-8',
-            'Origin': self.router_url,
-            'Referer': f'{self.router_url}/ui/wol',
-            'Sec-GPC': '1',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36'
-        }
-        
         data = {
             "method": "wol/signal",
             "params": [mac_address]
         }
         
         try:
-            response = self.session.post(
-                url,
-                headers=headers,
-                json=data,
-                verify=False,
-                timeout=10
-            )
-            
-            response.raise_for_status()
+            response = self._post(data, '/ui/wol')
             
             result = response.json()
             
             # Check success
             if result.get('result') == 'success' or result.get('error') is None:
-                print(f"✅ WOL packet sent successfully (MAC: {mac_address})")
+                self._log(f"✅ WOL packet sent successfully (MAC: {mac_address})")
                 return True
             else:
                 raise Exception(f"WOL transmission failed: {result}")
@@ -155,13 +203,13 @@ class IPTimeWOL:
         Raises:
             Exception: Login or WOL transmission failed
         """
-        print(f"📡 Connecting to router... ({self.router_url})")
+        self._log(f"📡 Connecting to router... ({self.router_url})")
         
         # Login
         self.login()
         
         # Send WOL
-        print(f"📤 Sending WOL packet... (MAC: {mac_address})")
+        self._log(f"📤 Sending WOL packet... (MAC: {mac_address})")
         self.send_wol(mac_address)
 
     def get_port_link_status(self):
@@ -171,33 +219,12 @@ class IPTimeWOL:
             List of port status dicts as returned by the router, e.g.
             [{"type":"wan","port":1,"link":"1000f"}, {"type":"lan","port":4,"link":"100f"}, ...]
         """
-        url = f"{self.router_url}/cgi/service.cgi"
-
-        headers = {
-            'Accept': '*/*',
-            'Accept-Language': 'ko;q=0.5',
-            'Cache-Control': 'no-store',
-            'Connection': 'keep-alive',
-            'Content-Type': 'application/json; charset=utf-8',
-            'Origin': self.router_url,
-            'Referer': f'{self.router_url}/ui/port_setup',
-            'Sec-GPC': '1',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36'
-        }
-
         data = {
             "method": "port/link/status"
         }
 
         try:
-            response = self.session.post(
-                url,
-                headers=headers,
-                json=data,
-                verify=False,
-                timeout=10
-            )
-            response.raise_for_status()
+            response = self._post(data, '/ui/port_setup')
             result = response.json()
             return result.get('result', [])
         except requests.exceptions.RequestException as e:
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Port link watch module
+Poll router port link status continuously and emit up/down/speed-change events
+"""
+
+import json
+import sys
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+from iptime_wol import IPTimeWOL
+from rate_limiter import router_limiter_for
+from router_drivers import best_router_url
+
+
+def encode_link(link_value: Optional[str]) -> int:
+    """
+    Encode a router link value as an integer
+
+    Args:
+        link_value: Router link value (e.g., "1000f", "100h", "" for down)
+
+    Returns:
+        Speed in Mbps (positive: full duplex, negative: half duplex), 0 if down
+    """
+    if not link_value:
+        return 0
+    lv = str(link_value).strip().lower()
+    try:
+        speed = int(lv[:-1])
+    except ValueError:
+        return 0
+    if lv.endswith('f'):
+        return speed
+    if lv.endswith('h'):
+        return -speed
+    return 0
+
+
+def decode_link(code: int) -> str:
+    """Inverse of encode_link ("" for down)"""
+    if code == 0:
+        return ""
+    return f"{abs(code)}{'f' if code > 0 else 'h'}"
+
+
+class LinkHistory:
+    """Fixed-size ring buffer of (timestamp, link code) samples backed by arrays"""
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Maximum number of samples kept (oldest are overwritten)
+        """
+        self.capacity = capacity
+        self._times = array('d', bytes(8 * capacity))
+        self._codes = array('i', bytes(4 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def append(self, timestamp: float, code: int):
+        self._times[self._next] = timestamp
+        self._codes[self._next] = code
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> List[Tuple[float, int]]:
+        """Samples in chronological order"""
+        start = (self._next - self._count) % self.capacity
+        return [(self._times[(start + i) % self.capacity], self._codes[(start + i) % self.capacity])
+                for i in range(self._count)]
+
+    def last(self) -> Optional[Tuple[float, int]]:
+        if not self._count:
+            return None
+        i = (self._next - 1) % self.capacity
+        return self._times[i], self._codes[i]
+
+
+class LinkWatcher:
+    """Watch one or more routers and report link changes"""
+
+    def __init__(self, routers: Dict[str, object], interval: float = 2.0, history_size: int = 1024,
+                 on_event: Optional[Callable[[dict], None]] = None, port_names: Optional[Dict[tuple, str]] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            routers: Router label -> IPTimeWOL-like client
+            interval: Seconds between polls of each router
+            history_size: Ring buffer capacity per port (link changes kept)
+            on_event: Callback called with each event dict
+            port_names: (router label, port type, port) -> target name, added to events
+            clock: Time source for event timestamps
+        """
+        self.routers = routers
+        self.interval = interval
+        self.history_size = history_size
+        self.on_event = on_event
+        self.port_names = port_names or {}
+        self.clock = clock
+        self.history: Dict[tuple, LinkHistory] = {}
+        self._last: Dict[str, Dict[tuple, int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _emit(self, event: dict):
+        if self.on_event:
+            with self._lock:
+                self.on_event(event)
+
+    def poll_once(self, label: str) -> List[dict]:
+        """
+        Poll one router, diff against its previous snapshot and emit events
+
+        The first poll of a router only records a baseline. A failed poll,
+        or one without any port (an error body or an expired session),
+        triggers one re-login and emits an "error" event; the previous
+        snapshot stays the baseline. A port missing from a later snapshot
+        counts as down.
+
+        Args:
+            label: Router label
+
+        Returns:
+            Events emitted by this poll
+        """
+        client = self.routers[label]
+        now = self.clock()
+        try:
+            status_list = client.get_port_link_status()
+            snapshot = {}
+            for item in status_list or []:
+                try:
+                    snapshot[(item.get('type'), int(item.get('port')))] = encode_link(item.get('link'))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+            if not snapshot:
+                raise ValueError(f"no port status in router response: {status_list!r}")
+        except Exception as e:
+            event = {"ts": now, "router": label, "event": "error", "error": str(e)}
+            self._emit(event)
+            try:
+                client.login()
+            except Exception:
+                pass
+            return [event]
+
+        previous = self._last.get(label)
+        self._last[label] = snapshot
+        events = []
+        keys = list(snapshot) + [key for key in (previous or {}) if key not in snapshot]
+        for key in keys:
+            code = snapshot.get(key, 0)
+            history_key = (label,) + key
+            history = self.history.get(history_key)
+            if history is None:
+                history = self.history[history_key] = LinkHistory(self.history_size)
+            old = previous.get(key, 0) if previous is not None else None
+            if old is None:
+                history.append(now, code)
+                continue
+            if old == code:
+                continue
+            history.append(now, code)
+            if old <= 0 < code:
+                kind = "up"
+            elif code <= 0 < old:
+                kind = "down"
+            else:
+                kind = "speed"
+            event = {"ts": now, "router": label, "type": key[0], "port": key[1], "event": kind,
+                     "from": decode_link(old), "to": decode_link(code)}
+            name = self.port_names.get(history_key)
+            if name:
+                event["target"] = name
+            events.append(event)
+            self._emit(event)
+        return events
+
+    def _run_router(self, label: str, max_polls: Optional[int]):
+        polls = 0
+        while not self._stop.is_set() and (max_polls is None or polls < max_polls):
+            started = time.monotonic()
+            self.poll_once(label)
+            polls += 1
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def run(self, max_polls: Optional[int] = None):
+        """
+        Poll every router on its own thread until stop() (or max_polls polls each)
+
+        Args:
+            max_polls: Stop each router after this many polls (None: run until stopped)
+        """
+        threads = [threading.Thread(target=self._run_router, args=(label, max_polls), daemon=True)
+                   for label in self.routers]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(0.5)
+        finally:
+            self._stop.set()
+
+    def stop(self):
+        self._stop.set()
+
+
+def build_watcher(targets: List[dict], credentials: Dict[str, dict], interval: float = 2.0,
+                  on_event: Optional[Callable[[dict], None]] = None) -> LinkWatcher:
+    """
+    Create a watcher for every router used by the configured targets
+
+    Args:
+        targets: Target configs
+        credentials: Credentials per target name
+        interval: Seconds between polls of each router
+        on_event: Event callback
+
+    Returns:
+        LinkWatcher (routers already logged in where possible)
+    """
+    routers = {}
+    port_names = {}
+    for target in targets:
+        cred = credentials.get(target["name"])
+        if not cred:
+            continue
+        label = target["router"]["url"].rstrip('/')
+        if label not in routers:
+            client = IPTimeWOL(router_url=best_router_url(target["router"]), router_id=cred["router_id"], router_pw=cred["router_pw"],
+                               rate_limiter=router_limiter_for(target["router"]), verbose=False)
+            try:
+                client.login()
+            except Exception as e:
+                print(f"⚠️  Router login failed for {label}: {e}", file=sys.stderr)
+            routers[label] = client
+        lan_port = target.get("wol", {}).get("lan_port", 0)
+        if lan_port > 0:
+            port_names[(label, "lan", int(lan_port))] = target["name"]
+    return LinkWatcher(routers, interval=interval, on_event=on_event, port_names=port_names)
+
+
+def print_json_event(event: dict):
+    """Write an event as one JSON line to stdout"""
+    sys.stdout.write(json.dumps(event, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Live wake console module
+Show wake progress on one status line and react to keys while waiting
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+from typing import Callable, Optional, TextIO
+
+from magic_packet import choose_wake_path
+from router_drivers import RouterDriver, create_driver
+from wake_engine import fallback_path, wake_target
+from wol_api import WakeResult, wake
+
+# Key -> action while waiting
+KEYS = {"c": "connect", "w": "resend", "a": "abort", "s": "switch"}
+HELP = "[c] connect now  [w] re-send WOL  [a] abort  [s] switch target"
+CANCEL_JOIN_SECONDS = 1.0  # After a key ends the wait, how long the wake worker gets to stop
+
+
+class KeyReader:
+    """Non-blocking single key reads from the console (msvcrt on Windows, termios elsewhere)
+
+    Use as a context manager; on POSIX the terminal is switched to cbreak
+    mode (no line buffering, no echo) until exit. If stdin is not a
+    terminal, read_key() only waits and never returns a key.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdin
+        self._fd: Optional[int] = None
+        self._saved = None
+        try:
+            self.interactive = self.stream.isatty()
+        except (AttributeError, ValueError):
+            self.interactive = False
+
+    def __enter__(self) -> "KeyReader":
+        if self.interactive and os.name != "nt":
+            import termios
+            import tty
+            self._fd = self.stream.fileno()
+            self._saved = termios.tcgetattr(self._fd)
+            tty.setcbreak(self._fd)
+        return self
+
+    def __exit__(self, *exc):
+        if self._saved is not None:
+            import termios
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved)
+            self._saved = None
+
+    def read_key(self, timeout: float) -> Optional[str]:
+        """
+        Wait up to timeout seconds for a key press
+
+        Returns:
+            The key (lower case), or None if no key was pressed
+        """
+        if not self.interactive:
+            time.sleep(timeout)
+            return None
+        if os.name == "nt":
+            import msvcrt
+            deadline = time.monotonic() + timeout
+            while True:
+                if msvcrt.kbhit():
+                    key = msvcrt.getwch()
+                    if key in ("\x00", "\xe0"):  # Function/arrow key prefix
+                        msvcrt.getwch()
+                        return None
+                    return key.lower()
+                if time.monotonic() >= deadline:
+                    return None
+                time.sleep(0.02)
+        import select
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return None
+        return os.read(self._fd, 1).decode(errors="ignore").lower() or None
+
+
+class LiveWait:
+    """Wake one target in the background while the console shows live status
+
+    The wake (wol_api.wake, with its WOL re-sends) runs in a worker thread.
+    The console redraws one status line with the phase, elapsed time and
+    WOL attempt, and reads keys:
+
+        c: stop waiting and connect now
+        w: send the WOL again right away
+        a: abort this target
+        s: stop and pick another target
+
+    run() returns the WakeResult and the action that ended the wait
+    ("ready" if the wake finished on its own). The key help is printed
+    once; the status line stays shorter than the console width so each
+    redraw overwrites it.
+    """
+
+    def __init__(self, target: dict, cred: dict, ready_timeout: float = 30.0, cache=None,
+                 driver: Optional[RouterDriver] = None, keys: Optional[KeyReader] = None,
+                 out: Optional[TextIO] = None, refresh: float = 0.25,
+                 wake_func: Callable[..., WakeResult] = wake):
+        self.target = target
+        self.cred = cred
+        self.ready_timeout = ready_timeout
+        self.cache = cache
+        self.driver = driver
+        self.keys = keys or KeyReader()
+        self.out = out or sys.stdout
+        self.refresh = refresh
+        self.wake_func = wake_func
+        self.cancel = threading.Event()
+        self.attempt = 0
+        self.manual_sends = 0
+        self.note = ""
+        self._lock = threading.Lock()
+        self._width = 0
+
+    def phase(self) -> str:
+        """Human readable phase of the wake"""
+        if self.attempt == 0:
+            return "sending WOL"
+        lan_port = self.target.get("wol", {}).get("lan_port", 0)
+        waiting = f"waiting for port {lan_port} link" if lan_port > 0 else "waiting for RDP port"
+        sends = self.attempt + self.manual_sends
+        return f"{waiting} (WOL x{sends})" if sends > 1 else waiting
+
+    def status_line(self, elapsed: float) -> str:
+        with self._lock:
+            note = self.note
+        line = f"⏳ [{self.target['name']}] {self.phase()} {elapsed:4.0f}s/{self.ready_timeout:.0f}s"
+        return f"{line}  {note}" if note else line
+
+    def _draw(self, text: str):
+        # A line that wraps can no longer be overwritten with "\r"
+        text = text[:shutil.get_terminal_size().columns - 1]
+        # Pad to the previous width so shorter lines fully overwrite it
+        self.out.write("\r" + text.ljust(self._width))
+        self.out.flush()
+        self._width = max(self._width, len(text))
+
+    def _on_attempt(self, attempt: int):
+        with self._lock:
+            self.attempt = attempt
+
+    def _resend(self):
+        def send():
+            try:
+                wake_target(self.target, self.driver, fallback_path(choose_wake_path(self.target)))
+                with self._lock:
+                    self.manual_sends += 1
+                    self.note = "WOL re-sent"
+            except Exception as e:
+                with self._lock:
+                    self.note = f"re-send failed: {e}"
+
+        with self._lock:
+            self.note = "re-sending WOL..."
+        threading.Thread(target=send, daemon=True).start()
+
+    def run(self):
+        """
+        Wake the target and wait for it or for a key
+
+        Returns:
+            (WakeResult, action) where action is "ready" (the wake finished),
+            "connect", "abort" or "switch"; a wake that does not stop within
+            CANCEL_JOIN_SECONDS of the key (e.g. inside a router request) is
+            left to finish in the background and reported as cancelled
+        """
+        if self.driver is None:
+            self.driver = create_driver(self.target["router"], self.cred, verbose=False)
+        box = {}
+
+        def worker():
+            box["result"] = self.wake_func(self.target, self.cred, ready_timeout=self.ready_timeout,
+                                           cancel=self.cancel, cache=self.cache, driver=self.driver,
+                                           on_attempt=self._on_attempt)
+
+        thread = threading.Thread(target=worker, name=f"wake-{self.target['name']}", daemon=True)
+        start = time.monotonic()
+        action = "ready"
+        self.out.write(f"   {HELP}\n")
+        with self.keys:
+            thread.start()
+            while thread.is_alive():
+                self._draw(self.status_line(time.monotonic() - start))
+                key = self.keys.read_key(self.refresh)
+                chosen = KEYS.get(key) if key else None
+                if chosen == "resend":
+                    self._resend()
+                elif chosen:
+                    action = chosen
+                    self.cancel.set()
+                    break
+            thread.join(CANCEL_JOIN_SECONDS if self.cancel.is_set() else None)
+        self._draw("")
+        self.out.write("\r")
+        self.out.flush()
+        result = box.get("result")
+        if result is None:
+            result = WakeResult(self.target["name"])
+            result.status = "cancelled"
+            result.total_seconds = time.monotonic() - start
+        return result, action
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Magic packet module
+Send Wake-on-LAN magic packets directly over UDP and choose the wake path
+"""
+
+import ipaddress
+import re
+import socket
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+DEFAULT_WOL_PORT = 9
+DEFAULT_REPEATS = 3
+WAKE_PATHS = ("auto", "direct", "router", "race")
+LOCAL_SUBNET_TTL = 30.0  # seconds
+
+
+def build_magic_packet(mac_address: str) -> bytes:
+    """
+    Build a magic packet (6 x 0xFF followed by the MAC 16 times)
+
+    Args:
+        mac_address: MAC address (e.g., 1F:2F:3F:4F:5F:6F, 1F-2F-..., 1F2F3F4F5F6F)
+
+    Raises:
+        ValueError: Invalid MAC address
+    """
+    digits = re.sub(r'[:\-.]', '', mac_address)
+    if not re.fullmatch(r'[0-9A-Fa-f]{12}', digits):
+        raise ValueError(f"Invalid MAC address: {mac_address}")
+    return b'\xff' * 6 + bytes.fromhex(digits) * 16
+
+
+def send_magic_packet(mac_address: str, broadcast: str = "255.255.255.255", port: int = DEFAULT_WOL_PORT,
+                      repeats: int = DEFAULT_REPEATS, interval: float = 0.05):
+    """
+    Send a magic packet as a UDP (directed) broadcast
+
+    Args:
+        mac_address: MAC address of PC to wake
+        broadcast: Broadcast address (e.g., 192.168.0.255)
+        port: UDP port (usually 9 or 7)
+        repeats: Number of copies to send (UDP may drop one)
+        interval: Seconds between copies
+
+    Raises:
+        OSError: Packet could not be sent
+    """
+    packet = build_magic_packet(mac_address)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        for i in range(max(1, repeats)):
+            if i:
+                time.sleep(interval)
+            sock.sendto(packet, (broadcast, port))
+
+
+def target_subnet(target: dict) -> Optional[ipaddress.IPv4Network]:
+    """
+    LAN subnet of a target from wol.subnet (e.g., "192.168.0.0/24")
+
+    Not guessed from RDP addresses: private ranges such as IPTIME's
+    default 192.168.0.0/24 repeat at every site, so a guess would send the
+    magic packet on the wrong LAN.
+
+    Returns:
+        Network, or None if not configured
+    """
+    subnet = target.get("wol", {}).get("subnet")
+    return ipaddress.ip_network(subnet, strict=False) if subnet else None
+
+
+_local_subnets: Dict[ipaddress.IPv4Network, Tuple[float, bool]] = {}
+_local_subnets_lock = threading.Lock()
+
+
+def is_local_subnet(network: ipaddress.IPv4Network, max_age: float = LOCAL_SUBNET_TTL) -> bool:
+    """
+    Whether this machine has an address on the network
+
+    Asks the OS which source address it would use to reach the network
+    (a UDP connect sends nothing). Answers are reused for max_age seconds
+    only, so long-running modes notice when this machine changes networks.
+    """
+    now = time.monotonic()
+    with _local_subnets_lock:
+        cached = _local_subnets.get(network)
+    if cached and now - cached[0] < max_age:
+        return cached[1]
+    probe = network.network_address + 1 if network.num_addresses > 2 else network.network_address
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect((str(probe), DEFAULT_WOL_PORT))
+            local = ipaddress.ip_address(sock.getsockname()[0]) in network
+    except OSError:
+        local = False
+    with _local_subnets_lock:
+        _local_subnets[network] = (now, local)
+    return local
+
+
+def choose_wake_path(target: dict) -> str:
+    """
+    Resolve the wake path for a target
+
+    wol.path is "direct", "router", "race" (send both) or "auto" (default):
+    direct when wol.subnet is set and this machine is on it, router
+    otherwise. A direct send is not a confirmed wake; callers fall back to
+    the router if the machine does not come up (see wake_engine.fallback_path).
+
+    Returns:
+        "direct", "router" or "race"
+    """
+    path = target.get("wol", {}).get("path", "auto")
+    if path not in WAKE_PATHS:
+        raise ValueError(f"Invalid wol.path: {path} (expected one of {', '.join(WAKE_PATHS)})")
+    if path != "auto":
+        return path
+    network = target_subnet(target)
+    return "direct" if network is not None and is_local_subnet(network) else "router"
+
+
+def send_direct(target: dict):
+    """
+    Send the target's magic packet on the LAN
+
+    Uses wol.broadcast (default: the subnet's broadcast address, or
+    255.255.255.255), wol.udp_port and wol.repeats.
+
+    Raises:
+        OSError: Packet could not be sent
+    """
+    wol = target.get("wol", {})
+    broadcast = wol.get("broadcast")
+    if not broadcast:
+        network = target_subnet(target)
+        broadcast = str(network.broadcast_address) if network is not None else "255.255.255.255"
+    send_magic_packet(wol["mac_address"], broadcast=broadcast, port=wol.get("udp_port", DEFAULT_WOL_PORT),
+                      repeats=wol.get("repeats", DEFAULT_REPEATS))
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Metrics module
+Counters and histograms exposed in Prometheus text format (file or local HTTP)
+"""
+
+import atexit
+import bisect
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds (router requests, launches)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Wake buckets in seconds (link up, RDP ready)
+WAKE_BUCKETS = (1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(v)}" for key, v in items]
+
+
+class Histogram:
+    """Cumulative bucket histogram with optional labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels.get(n, "")) for n in self.labelnames))
+        return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), series):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, ("le", _format_number(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+ROUTER_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "wol_router_request_seconds", "Router API request latency by method", LATENCY_BUCKETS, ["method"]))
+ROUTER_REQUEST_FAILURES = REGISTRY.register(Counter(
+    "wol_router_request_failures_total", "Failed router API requests by method and reason", ["method", "reason"]))
+ROUTER_RELOGINS = REGISTRY.register(Counter(
+    "wol_router_relogins_total", "Router logins on a client that was already logged in"))
+ROUTER_CONNECTIONS_OPENED = REGISTRY.register(Counter(
+    "wol_router_connections_opened_total", "New TCP connections to router APIs (the rest reused a pooled one)"))
+LINK_UP_SECONDS = REGISTRY.register(Histogram(
+    "wol_time_to_link_up_seconds", "Time from WOL to router port link up", WAKE_BUCKETS))
+RDP_READY_SECONDS = REGISTRY.register(Histogram(
+    "wol_time_to_rdp_ready_seconds", "Time from WOL to RDP port reachable", WAKE_BUCKETS))
+WAKE_ATTEMPTS = REGISTRY.register(Counter(
+    "wol_wake_attempts_total", "Confirmed wakes by the WOL attempt that woke the machine (1 = first send)", ["attempt"]))
+WAKE_TIMEOUTS = REGISTRY.register(Counter(
+    "wol_wake_timeouts_total", "Wakes that were not confirmed in time, by phase", ["phase"]))
+LAUNCH_CONNECT_SECONDS = REGISTRY.register(Histogram(
+    "wol_launch_connect_seconds", "Time from client launch to established RDP connection", LATENCY_BUCKETS))
+LAUNCHES = REGISTRY.register(Counter(
+    "wol_launches_total", "Remote Desktop launches by result", ["result"]))
+STARTUP_SECONDS = REGISTRY.register(Histogram(
+    "wol_cold_start_seconds", "Time from process start until the program is loaded", LATENCY_BUCKETS))
+CREDENTIAL_LOOKUP_SECONDS = REGISTRY.register(Histogram(
+    "wol_credential_lookup_seconds", "Master password lookup time by backend", LATENCY_BUCKETS, ["backend"]))
+
+
+def write_metrics_file(path: Path, registry: Registry = REGISTRY):
+    """
+    Write metrics to a file atomically (e.g., for node_exporter's textfile collector)
+
+    Args:
+        path: Output file (.prom)
+        registry: Metrics registry
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent or ".", prefix=".metrics_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(registry.render())
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def start_http_server(port: int, address: str = "127.0.0.1", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Serve /metrics on a local HTTP port in a background thread
+
+    Args:
+        port: TCP port (0 picks a free port)
+        address: Bind address (local only by default)
+        registry: Metrics registry
+
+    Returns:
+        The running server (server.server_address has the bound port)
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((address, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http").start()
+    return server
+
+
+def start_metrics_export(path: Optional[Path] = None, port: Optional[int] = None, interval: float = 15.0):
+    """
+    Export metrics for long-running modes
+
+    Args:
+        path: Rewrite this file every interval seconds and at exit
+        port: Serve /metrics on this local port
+        interval: Seconds between file writes
+    """
+    if port is not None:
+        server = start_http_server(port)
+        print(f"📈 Metrics served on http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    if path is not None:
+        stop = threading.Event()
+
+        def writer():
+            while not stop.wait(interval):
+                try:
+                    write_metrics_file(path)
+                except OSError:
+                    pass
+
+        threading.Thread(target=writer, daemon=True, name="metrics-file").start()
+
+        def final_write():
+            stop.set()
+            try:
+                write_metrics_file(path)
+            except OSError:
+                pass
+
+        atexit.register(final_write)
@@ -6,26 +6,174 @@ Execute Windows Remote Desktop Connection
 """
 
 import os
+import hashlib
 import subprocess
 import tempfile
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Union
+
+from endpoint_race import get_endpoint_memory
+from rdp_clients import RDPClient, get_client
+from rdp_probe import probe_any
+from rdp_profiles import RDP_PROFILES, resolve_profile
+
+
+# Cached .rdp files kept in rdp_dir; older ones are pruned when a new file is written.
+# Files younger than RDP_FILE_MIN_AGE seconds are never pruned (a client may be opening them).
+RDP_FILES_KEPT = 32
+RDP_FILE_MIN_AGE = 60.0
+
+# Default RDP settings as (name, type, value).
+# Per-target overrides are applied on top of these (see MSTSCConnector).
+DEFAULT_RDP_SETTINGS = [
+    ("screen mode id", "i", 2),  # Full screen
+    ("desktopwidth", "i", 1920),
+    ("desktopheight", "i", 1080),
+    ("session bpp", "i", 32),  # 색상 깊이
+    ("compression", "i", 1),
+    ("keyboardhook", "i", 2),
+    ("audiocapturemode", "i", 0),
+    ("videoplaybackmode", "i", 1),
+    ("connection type", "i", 7),
+    ("networkautodetect", "i", 1),
+    ("bandwidthautodetect", "i", 1),
+    ("displayconnectionbar", "i", 1),
+    ("enableworkspacereconnect", "i", 0),
+    ("disable wallpaper", "i", 0),
+    ("allow font smoothing", "i", 1),
+    ("allow desktop composition", "i", 1),
+    ("disable full window drag", "i", 0),
+    ("disable menu anims", "i", 0),
+    ("disable themes", "i", 0),
+    ("disable cursor setting", "i", 0),
+    ("bitmapcachepersistenable", "i", 1),
+    ("full address", "s", ""),
+    ("audiomode", "i", 0),
+    ("redirectprinters", "i", 0),
+    ("redirectcomports", "i", 0),
+    ("redirectsmartcards", "i", 0),
+    ("redirectclipboard", "i", 1),
+    ("redirectposdevices", "i", 0),
+    ("autoreconnection enabled", "i", 1),
+    ("authentication level", "i", 0),
+    ("prompt for credentials", "i", 0),
+    ("negotiate security layer", "i", 1),
+    ("remoteapplicationmode", "i", 0),
+    ("alternate shell", "s", ""),
+    ("shell working directory", "s", ""),
+    ("gatewayhostname", "s", ""),
+    ("gatewayusagemethod", "i", 0),
+    ("gatewaycredentialssource", "i", 0),
+    ("gatewayprofileusagemethod", "i", 0),
+    ("promptcredentialonce", "i", 0),
+    ("gatewaybrokeringtype", "i", 0),
+    ("use redirection server name", "i", 0),
+    ("rdgiskdcproxy", "i", 0),
+    ("kdcproxyname", "s", ""),
+]
+
+# Precompiled template: setting name -> (type, value), in file order
+RDP_TEMPLATE = {name: (kind, value) for name, kind, value in DEFAULT_RDP_SETTINGS}
+
+
+def render_rdp_settings(overrides: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Render RDP file content from the template plus overrides
+
+    Args:
+        overrides: Setting name -> value (e.g., {"desktopwidth": 2560, "gatewayhostname": "gw.example.com"}).
+            Unknown names are appended; their type is 'i' for ints and 's' otherwise.
+
+    Returns:
+        RDP file content
+    """
+    settings = dict(RDP_TEMPLATE)
+    for name, value in (overrides or {}).items():
+        if name in settings:
+            kind = settings[name][0]
+        else:
+            kind = "i" if isinstance(value, (bool, int)) else "s"
+        if kind == "i":
+            value = int(value)
+        settings[name] = (kind, value)
+    return '\n'.join(f"{name}:{kind}:{value}" for name, (kind, value) in settings.items())
+
+
+def prune_rdp_files(rdp_dir: Path, keep: Optional[Path] = None, max_files: int = RDP_FILES_KEPT,
+                    min_age: float = RDP_FILE_MIN_AGE) -> int:
+    """
+    Delete cached RDP files beyond the newest max_files, and leftover temp files
+
+    Args:
+        rdp_dir: Directory of the cached files
+        keep: File that is never deleted (the one just written)
+        max_files: Number of newest .rdp files kept
+        min_age: Files modified within this many seconds are kept
+
+    Returns:
+        Number of files deleted
+    """
+    def mtime(path: Path) -> float:
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    files = sorted(rdp_dir.glob("wol_mstsc_*.rdp"), key=mtime, reverse=True)
+    candidates = [f for f in files[max_files:] if f != keep] + list(rdp_dir.glob(".wol_mstsc_*.tmp"))
+    deleted = 0
+    cutoff = time.time() - min_age
+    for path in candidates:
+        if mtime(path) > cutoff:
+            continue
+        try:
+            path.unlink()
+            deleted += 1
+        except OSError:
+            pass  # Open in a running client (Windows) or already gone
+    return deleted
 
 
 class MSTSCConnector:
     """MSTSC connection class"""
     
-    def __init__(self, server: str, username: Optional[str] = None, password: Optional[str] = None):
+    def __init__(self, server: str, username: Optional[str] = None, password: Optional[str] = None,
+                 settings: Optional[Dict[str, Any]] = None, rdp_dir: Optional[Path] = None,
+                 client: Union[str, RDPClient] = "mstsc", profile: Optional[str] = None,
+                 link: Optional[str] = None, servers: Optional[List[str]] = None):
         """
         Args:
             server: Server address (e.g., 192.168.0.100:3389 or domain.com:3389)
             username: Username (optional)
             password: Password (optional)
+            settings: Per-target RDP setting overrides (config.json "rdp.settings", optional)
+            rdp_dir: Directory for cached RDP files (default: <temp>/wol_mstsc)
+            client: Client launcher name (mstsc, xfreerdp, fake) or RDPClient instance
+            profile: RDP performance profile (lan, broadband, wan), "auto" to pick one from
+                the measured RTT and link, or None for the default settings
+            link: Router link value of the target's port (e.g., "100f"), used by "auto"
+            servers: Alternative endpoints of the same machine (LAN IP, VPN address, ...);
+                the fastest reachable one is used (see select_endpoint)
         """
-        self.server = server
         self.username = username
         self.password = password
+        self.settings = settings or {}
+        self.rdp_dir = Path(rdp_dir) if rdp_dir else Path(tempfile.gettempdir()) / "wol_mstsc"
+        self.client = get_client(client) if isinstance(client, str) else client
+        self.profile = profile
+        self.link = link
+        self.rtt_ms: Optional[float] = None
+        self._resolved_profile: Optional[str] = None
+        self._profile_resolved = False
         
+        self.endpoints = list(dict.fromkeys([server] + list(servers or [])))
+        self.endpoint_selected = len(self.endpoints) == 1
+        self.use_server(server)
+    
+    def use_server(self, server: str):
+        """Connect to this endpoint (one of self.endpoints)"""
+        self.server = server
         # Separate server address and port
         if ':' in server:
             self.host, port_str = server.rsplit(':', 1)
@@ -34,115 +182,124 @@ class MSTSCConnector:
             self.host = server
             self.port = 3389  # Default RDP port
     
+    def select_endpoint(self, timeout: float = 1.0) -> Optional[float]:
+        """
+        Race all endpoints and switch to the fastest reachable one
+        
+        The winner is recorded in the endpoint memory (endpoint_state.json).
+        
+        Returns:
+            Connect time of the winner in seconds, or None (endpoint unchanged)
+        """
+        winner = probe_any(self.endpoints, timeout=timeout)
+        if winner is None:
+            return None
+        self.use_server(winner[0])
+        self.endpoint_selected = True
+        if len(self.endpoints) > 1:
+            get_endpoint_memory().remember("rdp:" + self.endpoints[0].lower(), *winner)
+        return winner[1]
+    
+    def resolved_profile(self) -> Optional[str]:
+        """Profile in effect (measured once for "auto")"""
+        if not self._profile_resolved:
+            self._resolved_profile, self.rtt_ms = resolve_profile(self.profile, self.host, self.port, self.link)
+            self._profile_resolved = True
+        return self._resolved_profile
+    
     def create_rdp_file(self) -> Path:
         """
         Create RDP connection file
         
+        Files are named after a hash of their content, so each distinct
+        target/settings combination gets its own file. An existing file is
+        reused as-is and only a changed configuration writes a new one,
+        which keeps parallel launches from overwriting each other. Writing
+        a new file prunes old ones (see prune_rdp_files).
+        
         Returns:
             Path to created RDP file
         """
-        # Create temporary RDP file
-        temp_dir = Path(tempfile.gettempdir())
-        rdp_file = temp_dir / "wol_mstsc_temp.rdp"
-        
-        # Write RDP file content
-        rdp_content = [
-            "screen mode id:i:2",  # Full screen
-            f"desktopwidth:i:1920",
-            f"desktopheight:i:1080",
-            "session bpp:i:32",  # 색상 깊이
-            "compression:i:1",
-            "keyboardhook:i:2",
-            "audiocapturemode:i:0",
-            "videoplaybackmode:i:1",
-            "connection type:i:7",
-            "networkautodetect:i:1",
-            "bandwidthautodetect:i:1",
-            "displayconnectionbar:i:1",
-            "enableworkspacereconnect:i:0",
-            "disable wallpaper:i:0",
-            "allow font smoothing:i:1",
-            "allow desktop composition:i:1",
-            "disable full window drag:i:0",
-            "disable menu anims:i:0",
-            "disable themes:i:0",
-            "disable cursor setting:i:0",
-            "bitmapcachepersistenable:i:1",
-            f"full address:s:{self.host}:{self.port}",
-            "audiomode:i:0",
-            "redirectprinters:i:0",
-            "redirectcomports:i:0",
-            "redirectsmartcards:i:0",
-            "redirectclipboard:i:1",
-            "redirectposdevices:i:0",
-            "autoreconnection enabled:i:1",
-            "authentication level:i:0",
-            "prompt for credentials:i:0",
-            "negotiate security layer:i:1",
-            "remoteapplicationmode:i:0",
-            "alternate shell:s:",
-            "shell working directory:s:",
-            "gatewayhostname:s:",
-            "gatewayusagemethod:i:0",
-            "gatewaycredentialssource:i:0",
-            "gatewayprofileusagemethod:i:0",
-            "promptcredentialonce:i:0",
-            "gatewaybrokeringtype:i:0",
-            "use redirection server name:i:0",
-            "rdgiskdcproxy:i:0",
-            "kdcproxyname:s:",
-        ]
-        
+        # Profile first, so per-target settings still win
+        profile = self.resolved_profile()
+        overrides = dict(RDP_PROFILES[profile]) if profile else {}
+        overrides.update(self.settings)
+        overrides["full address"] = f"{self.host}:{self.port}"
         # Add username if provided
         if self.username:
-            rdp_content.append(f"username:s:{self.username}")
+            overrides["username"] = self.username
+        content = render_rdp_settings(overrides)
+        
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+        rdp_file = self.rdp_dir / f"wol_mstsc_{digest}.rdp"
+        if rdp_file.exists():
+            return rdp_file
         
-        # Write file
-        with open(rdp_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(rdp_content))
+        # Write to a unique temp file, then move into place atomically
+        self.rdp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.rdp_dir, prefix=".wol_mstsc_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, rdp_file)
+        except OSError:
+            # Another launch may have written (and opened) the same file first
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if not rdp_file.exists():
+                raise
+        prune_rdp_files(self.rdp_dir, keep=rdp_file)
         
         return rdp_file
     
-    def connect(self):
+    def connect(self) -> subprocess.Popen:
         """
         Execute Remote Desktop connection
         
+        Returns:
+            Handle of the launched client process
+        
         Raises:
             Exception: Connection failed
         """
         try:
             print(f"🖥️  Preparing Remote Desktop connection...")
+            if not self.endpoint_selected:
+                seconds = self.select_endpoint()
+                if seconds is not None:
+                    print(f"   Fastest of {len(self.endpoints)} endpoints: {self.server} ({seconds * 1000:.0f} ms)")
             print(f"   Server: {self.host}:{self.port}")
             if self.username:
                 print(f"   User: {self.username}")
+            profile = self.resolved_profile()
+            if profile:
+                rtt = f", RTT {self.rtt_ms:.1f} ms" if self.rtt_ms is not None else ""
+                link = f", link {self.link}" if self.link else ""
+                print(f"   Profile: {profile}{rtt}{link}")
             
             # Create RDP file
             rdp_file = self.create_rdp_file()
             print(f"   RDP file created: {rdp_file}")
             
-            # Execute MSTSC
-            # /v: Specify server address
-            # /f: Full screen
-            # Pass RDP file as argument
-            
-            cmd = ['mstsc', str(rdp_file)]
+            cmd = self.client.command(self, rdp_file)
             
             print(f"   Executing command: {' '.join(cmd)}")
             
             # Run in background (async)
-            subprocess.Popen(
+            process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
-                creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+                **self.client.popen_kwargs()
             )
             
             print("✅ Remote Desktop client launched")
             print("   💡 Will auto-login if saved credentials exist")
             print("   💡 Otherwise, please login manually")
+            return process
             
         except FileNotFoundError:
-            raise Exception("MSTSC not found. Please check if Windows Remote Desktop is installed")
+            raise Exception(f"{self.client.name} not found. {self.client.install_hint}")
         except Exception as e:
             raise Exception(f"Remote Desktop connection failed: {e}")
     
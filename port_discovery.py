@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LAN port discovery module
+Find which router LAN port a machine is on by watching link transitions after WOL
+"""
+
+import time
+from typing import Callable, Dict, List, Optional
+
+from iptime_wol import IPTimeWOL
+from router_drivers import RouterDriver
+from state_cache import StateCache
+from wake_engine import send_wol
+
+# Consecutive wakes where the machine came up but its configured port did not
+MAX_PORT_MISSES = 2
+
+
+class DiscoveryResult:
+    """Outcome of one port discovery"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.port: Optional[int] = None  # Proposed lan_port
+        self.candidates: List[int] = []  # Ports that came up after the WOL
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "port": self.port, "candidates": self.candidates,
+                "seconds": self.seconds, "error": self.error}
+
+
+def _up_ports(links: Dict[int, str]) -> set:
+    return {port for port, link in links.items() if IPTimeWOL._link_value_is_up(link)}
+
+
+def discover_lan_port(name: str, driver: RouterDriver, mac_address: str, timeout: float = 60.0,
+                      interval: float = 1.0, settle: float = 2.0,
+                      sleep: Callable[[float], None] = time.sleep) -> DiscoveryResult:
+    """
+    Snapshot the LAN ports, send WOL and see which port comes up
+
+    The machine must be off (its port down) when discovery starts. If
+    several ports come up at once (another machine booted), polling
+    continues for `settle` seconds and the result lists all candidates
+    without a proposal.
+
+    Args:
+        name: Target name (for the result)
+        driver: Router driver
+        mac_address: MAC of the machine
+        timeout: Seconds to wait for a port to come up
+        interval: Seconds between port status polls
+        settle: Extra seconds to watch after the first transition
+        sleep: Sleep function
+
+    Returns:
+        DiscoveryResult (port set if exactly one port came up)
+    """
+    result = DiscoveryResult(name)
+    try:
+        driver.ensure_login()
+        before = _up_ports(driver.port_links())
+        send_wol(driver, [mac_address])
+    except Exception as e:
+        result.error = str(e)
+        return result
+
+    start = time.monotonic()
+    first_seen: Optional[float] = None
+    while True:
+        elapsed = time.monotonic() - start
+        try:
+            new_up = sorted(_up_ports(driver.port_links()) - before)
+        except Exception:
+            new_up = []
+        if new_up and first_seen is None:
+            first_seen = elapsed
+            result.seconds = elapsed
+        if new_up:
+            result.candidates = new_up
+        if first_seen is not None and elapsed - first_seen >= settle:
+            break
+        if first_seen is None and elapsed + interval > timeout:
+            break
+        sleep(interval)
+
+    if len(result.candidates) == 1:
+        result.port = result.candidates[0]
+    elif result.candidates:
+        result.error = f"several ports came up ({', '.join(map(str, result.candidates))}); retry when the LAN is quiet"
+    else:
+        result.error = (f"no LAN port came up within {timeout:.0f} seconds "
+                        "(is the machine already on, or connected through a switch?)")
+    return result
+
+
+def _health_key(name: str) -> str:
+    return "port:" + name
+
+
+def record_link_check(cache: StateCache, name: str, correlated: bool) -> bool:
+    """
+    Track whether a target's configured lan_port follows its wakes
+
+    Args:
+        cache: Shared state cache
+        name: Target name
+        correlated: True if the port came up, False if the machine came up
+            (RDP reachable) but its configured port did not
+
+    Returns:
+        True if the mapping should be discovered again
+    """
+    # Kept in its own entry so the target's status freshness is not touched
+    entry = cache.get(_health_key(name), max_age=float('inf')) or {}
+    misses = 0 if correlated else entry.get("misses", 0) + 1
+    cache.put(_health_key(name), misses=misses)
+    return misses >= MAX_PORT_MISSES
+
+
+def mapping_suspect(cache: StateCache, name: str) -> bool:
+    """True if the target's lan_port stopped matching its wakes (see record_link_check)"""
+    entry = cache.get(_health_key(name), max_age=float('inf')) or {}
+    return entry.get("misses", 0) >= MAX_PORT_MISSES
+
+
+def reset_link_checks(cache: StateCache, name: str):
+    """Forget mismatches after the target's lan_port was discovered again"""
+    cache.invalidate(_health_key(name))
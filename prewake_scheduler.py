@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pre-wake scheduler module
+Wake targets ahead of planned sessions (cron-like schedule per target)
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import LINK_UP_SECONDS, RDP_READY_SECONDS, WAKE_TIMEOUTS
+from rdp_probe import probe_any, rdp_endpoints
+from router_drivers import create_driver
+from wake_engine import fallback_path, poll_ports, wake_target
+from wake_retry import expected_window
+
+
+class CronSchedule:
+    """Minimal 5-field cron expression: minute hour day-of-month month day-of-week"""
+
+    _RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expr: str):
+        """
+        Args:
+            expr: Cron expression (e.g., "30 8 * * 1-5"). Fields support *, lists, ranges and steps.
+
+        Raises:
+            ValueError: Invalid expression
+        """
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: '{expr}'")
+        self.expr = expr
+        parsed = [self._parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, self._RANGES)]
+        self.minutes, self.hours, self.days, self.months, dows = parsed
+        self.dows = {d % 7 for d in dows}  # 0 and 7 are both Sunday
+        self._dom_restricted = fields[2] != "*"
+        self._dow_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, lo: int, hi: int) -> set:
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_str = part.split('/', 1)
+                step = int(step_str)
+            if part == '*':
+                start, end = lo, hi
+            elif '-' in part:
+                start, end = (int(x) for x in part.split('-', 1))
+            else:
+                start = end = int(part)
+                if step != 1:
+                    end = hi
+            if start < lo or end > hi or start > end or step < 1:
+                raise ValueError(f"Cron field out of range: '{field}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom_ok = dt.day in self.days
+        dow_ok = (dt.weekday() + 1) % 7 in self.dows
+        if self._dom_restricted and self._dow_restricted:
+            return dom_ok or dow_ok
+        return dom_ok and dow_ok
+
+    def next_after(self, dt: datetime) -> datetime:
+        """
+        Next matching time strictly after dt
+
+        Args:
+            dt: Reference time
+
+        Returns:
+            Next matching datetime (minute resolution)
+        """
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression never matches: '{self.expr}'")
+
+
+class SystemClock:
+    """Wall clock"""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class SimulatedClock:
+    """Clock for tests: sleep() advances time instantly"""
+
+    def __init__(self, start: datetime):
+        self.current = start
+
+    def now(self) -> datetime:
+        return self.current
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            self.current += timedelta(seconds=seconds)
+
+
+def prewake_target(target: dict, cred: dict, clock, ready_timeout: float = 120.0,
+                   check_interval: float = 2.0) -> Tuple[bool, Optional[float]]:
+    """
+    Send WOL for a target and confirm it is up
+
+    Readiness is the router LAN port link when lan_port is configured,
+    otherwise the RDP port answering. If the WOL went out as a LAN
+    broadcast and the machine misses its expected window, it is sent once
+    more through the router.
+
+    Args:
+        target: Target config
+        cred: Target credentials
+        clock: Clock used for waiting
+        ready_timeout: Maximum seconds to wait for readiness
+        check_interval: Seconds between readiness checks
+
+    Returns:
+        (ready, seconds until ready or None)
+
+    Raises:
+        Exception: WOL transmission failed
+    """
+    driver = create_driver(target["router"], cred)
+    path = wake_target(target, driver)
+
+    lan_port = target.get("wol", {}).get("lan_port", 0)
+    servers = rdp_endpoints(target["rdp"])
+    fallback_after = expected_window(target, "link" if lan_port > 0 else "rdp")
+    start = clock.now()
+    while True:
+        try:
+            if lan_port > 0:
+                ready = poll_ports(driver, [lan_port])[lan_port]
+            else:
+                ready = probe_any(servers, timeout=min(check_interval, 2.0)) is not None
+        except Exception:
+            ready = False
+        elapsed = (clock.now() - start).total_seconds()
+        if ready:
+            (LINK_UP_SECONDS if lan_port > 0 else RDP_READY_SECONDS).observe(elapsed)
+            return True, elapsed
+        if elapsed >= ready_timeout:
+            WAKE_TIMEOUTS.inc(phase="link" if lan_port > 0 else "rdp")
+            return False, None
+        if path == "direct" and elapsed >= fallback_after:
+            # The LAN broadcast was not confirmed: try the router once
+            path = fallback_path(path)
+            try:
+                wake_target(target, driver, path)
+            except Exception:
+                pass
+        clock.sleep(check_interval)
+
+
+class PreWakeScheduler:
+    """Run scheduled pre-wakes inside one long-lived process"""
+
+    def __init__(self, targets: List[dict], credentials: Dict[str, dict], clock=None,
+                 wake_func: Optional[Callable] = None, history_path: Optional[Path] = None,
+                 start_worker: Optional[Callable[[Callable[[], None]], None]] = None):
+        """
+        Args:
+            targets: Target configs; those with a "prewake" section are scheduled, e.g.
+                {"prewake": {"schedule": "0 9 * * 1-5", "lead_minutes": 10}}
+                ("schedule" may also be a list of expressions)
+            credentials: Credentials per target name
+            clock: SystemClock (default) or SimulatedClock
+            wake_func: Callable(target, cred, clock) -> (ready, seconds); default prewake_target
+            history_path: Optional JSON lines file to append each pre-wake record to
+            start_worker: Callable(job) that runs a pre-wake job (default: a daemon thread per job)
+        """
+        self.clock = clock or SystemClock()
+        self.wake_func = wake_func or prewake_target
+        self.history_path = Path(history_path) if history_path else None
+        self.start_worker = start_worker or (lambda job: threading.Thread(target=job, name="prewake", daemon=True).start())
+        self.history: List[dict] = []
+        self.entries = []  # (target, cred, [CronSchedule], lead)
+        self._last_session: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._running = 0
+        for target in targets:
+            prewake = target.get("prewake")
+            if not prewake:
+                continue
+            cred = credentials.get(target["name"])
+            if cred is None:
+                print(f"⚠️  No credentials for target '{target['name']}', pre-wake disabled")
+                continue
+            exprs = prewake["schedule"]
+            if isinstance(exprs, str):
+                exprs = [exprs]
+            lead = timedelta(minutes=prewake.get("lead_minutes", 10))
+            self.entries.append((target, cred, [CronSchedule(e) for e in exprs], lead))
+
+    def upcoming(self) -> List[Tuple[datetime, datetime, dict]]:
+        """
+        Planned pre-wakes, earliest first
+
+        A session that starts within the lead time is still woken (immediately).
+        After a target's first pre-wake, its next session follows the last
+        planned one, so slots that passed while the process was busy or
+        suspended stay in the plan (and are recorded as missed).
+
+        Returns:
+            List of (wake_at, session_at, target)
+        """
+        now = self.clock.now()
+        plan = []
+        for target, cred, schedules, lead in self.entries:
+            after = self._last_session.get(target["name"], now)
+            session_at = min(s.next_after(after) for s in schedules)
+            plan.append((session_at - lead, session_at, target))
+        return sorted(plan, key=lambda p: p[0])
+
+    def _record(self, record: dict):
+        with self._lock:
+            self.history.append(record)
+            if self.history_path:
+                with open(self.history_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _prewake(self, target: dict, cred: dict, session_at: datetime, record: dict):
+        print(f"\n📡 Pre-waking target '{target['name']}' for session at {session_at:%H:%M}...")
+        try:
+            ready, seconds = self.wake_func(target, cred, self.clock)
+            record["success"] = ready
+            record["ready_seconds"] = seconds
+            if ready:
+                print(f"✅ '{target['name']}' is ready ({seconds:.0f}s after WOL)")
+            else:
+                record["error"] = "not ready before timeout"
+                print(f"❌ '{target['name']}' did not become ready")
+        except Exception as e:
+            record["error"] = str(e)
+            print(f"❌ Pre-wake failed for '{target['name']}': {e}")
+        finally:
+            self._record(record)
+            with self._idle:
+                self._running -= 1
+                self._idle.notify_all()
+
+    def run_once(self) -> Optional[dict]:
+        """
+        Sleep until the next planned pre-wake and start it on a worker
+
+        Pre-wakes wait up to their ready timeout, so each one runs on its
+        own worker and a target due meanwhile is not held up. A slot whose
+        session already started is recorded as a missed (failed) pre-wake
+        and not woken.
+
+        Returns:
+            History record of the pre-wake (completed by the worker when it
+            finishes), or None if nothing is scheduled
+        """
+        plan = self.upcoming()
+        if not plan:
+            return None
+        wake_at, session_at, target = plan[0]
+        wait = (wake_at - self.clock.now()).total_seconds()
+        if wait > 0:
+            print(f"⏰ Next pre-wake: '{target['name']}' at {wake_at:%Y-%m-%d %H:%M} (session {session_at:%H:%M})")
+            self.clock.sleep(wait)
+        cred = next(e[1] for e in self.entries if e[0] is target)
+
+        started_at = self.clock.now()
+        record = {
+            "target": target["name"],
+            "session_at": session_at.isoformat(),
+            "wake_at": wake_at.isoformat(),
+            "started_at": started_at.isoformat(),
+            "success": False,
+            "ready_seconds": None,
+            "error": None,
+        }
+        # Never wake the same session twice
+        self._last_session[target["name"]] = session_at
+        if started_at >= session_at:
+            record["error"] = f"missed: session started before the pre-wake ran ({started_at:%H:%M})"
+            print(f"❌ Pre-wake missed for '{target['name']}' (session at {session_at:%Y-%m-%d %H:%M})")
+            self._record(record)
+            return record
+        with self._idle:
+            self._running += 1
+        self.start_worker(lambda: self._prewake(target, cred, session_at, record))
+        return record
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no pre-wake is running
+
+        Returns:
+            True if idle, False on timeout
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._running == 0, timeout)
+
+    def run(self, max_runs: Optional[int] = None):
+        """
+        Run pre-wakes until interrupted (or max_runs pre-wakes have run)
+
+        Args:
+            max_runs: Stop after this many pre-wakes (None: run forever); the
+                last ones started are waited for
+        """
+        runs = 0
+        while max_runs is None or runs < max_runs:
+            if self.run_once() is None:
+                print("ℹ️  No targets have a pre-wake schedule")
+                return
+            runs += 1
+        self.wait_idle()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profiling module
+Opt-in cProfile / tracemalloc / sampling hooks for the CLI and long-running modes
+"""
+
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class StackSampler:
+    """Periodically sample the stacks of all threads (low overhead, works across threads)"""
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.samples = 0
+        self.leaf = Counter()  # function where time is spent
+        self.inclusive = Counter()  # function anywhere on the stack
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _label(code) -> str:
+        return f"{Path(code.co_filename).name}:{code.co_firstlineno}({code.co_name})"
+
+    def _sample(self):
+        # Skip the profiler's own helper threads
+        own = {t.ident for t in threading.enumerate() if t.name.startswith("profile-")}
+        with self._lock:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in own:
+                    continue
+                self.samples += 1
+                self.leaf[self._label(frame.f_code)] += 1
+                seen = set()
+                while frame is not None:
+                    label = self._label(frame.f_code)
+                    if label not in seen:
+                        seen.add(label)
+                        self.inclusive[label] += 1
+                    frame = frame.f_back
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="profile-sampler")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def summary(self, top: int = 15) -> str:
+        with self._lock:
+            total = max(1, self.samples)
+            lines = [f"Stack samples: {self.samples} (every {self.interval * 1000:.0f} ms)",
+                     "  Self time:"]
+            lines += [f"    {n / total:6.1%}  {label}" for label, n in self.leaf.most_common(top)]
+            lines.append("  Inclusive time:")
+            lines += [f"    {n / total:6.1%}  {label}" for label, n in self.inclusive.most_common(top)]
+        return '\n'.join(lines)
+
+
+class Profiler:
+    """Profiling session for one CLI run
+
+    Nothing is wrapped or started unless a profiling option is enabled,
+    so with profiling off the normal code paths are untouched.
+    """
+
+    def __init__(self, profile_path: Optional[Path] = None, trace_malloc: bool = False,
+                 snapshot_interval: Optional[float] = None, top: int = 15, out=None):
+        """
+        Args:
+            profile_path: Write cProfile stats here (.prof) and a text summary next to it (.txt)
+            trace_malloc: Track allocations with tracemalloc
+            snapshot_interval: Also sample stacks and rewrite a snapshot summary every N seconds
+                (for long-running modes; covers all threads)
+            top: Number of entries in summaries
+            out: Stream for the final summary (default: stderr)
+        """
+        self.profile_path = Path(profile_path) if profile_path else None
+        self.trace_malloc = trace_malloc
+        self.snapshot_interval = snapshot_interval
+        self.top = top
+        self.out = out or sys.stderr
+        self.phases: Dict[str, List[float]] = {}  # name -> [calls, total seconds]
+        self._phase_lock = threading.Lock()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._snapshot_stop = threading.Event()
+        self._startup_cpu = 0.0
+        self._started = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.profile_path or self.trace_malloc or self.snapshot_interval)
+
+    def wrap(self, func: Callable, name: Optional[str] = None) -> Callable:
+        """
+        Time calls of func as a named phase (returns func unchanged when disabled)
+
+        Args:
+            func: Function to wrap
+            name: Phase name (default: qualified function name)
+
+        Returns:
+            Wrapped function
+        """
+        if not self.enabled:
+            return func
+        name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._phase_lock:
+                    phase = self.phases.setdefault(name, [0, 0.0])
+                    phase[0] += 1
+                    phase[1] += elapsed
+        return wrapper
+
+    def instrument(self, targets: List[Tuple[object, str]]):
+        """
+        Replace attributes with phase-timed wrappers
+
+        Args:
+            targets: (module or class, attribute name) pairs
+        """
+        if not self.enabled:
+            return
+        for owner, attr in targets:
+            func = getattr(owner, attr, None)
+            if callable(func):
+                label = f"{getattr(owner, '__name__', owner)}.{attr}"
+                setattr(owner, attr, self.wrap(func, label))
+
+    def start(self):
+        if not self.enabled:
+            return
+        # CPU time already used by interpreter start-up and imports
+        self._startup_cpu = time.process_time()
+        self._started = time.perf_counter()
+        if self.trace_malloc:
+            tracemalloc.start(10)
+        if self.snapshot_interval:
+            self._sampler = StackSampler()
+            self._sampler.start()
+            threading.Thread(target=self._snapshot_loop, daemon=True, name="profile-snapshots").start()
+        if self.profile_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def _snapshot_loop(self):
+        while not self._snapshot_stop.wait(self.snapshot_interval):
+            self._write_snapshot()
+
+    def _snapshot_file(self) -> Path:
+        base = self.profile_path or Path("wol_mstsc_profile")
+        return base.with_name(base.name + ".snapshot.txt")
+
+    def _write_snapshot(self):
+        text = f"Snapshot at {time.strftime('%Y-%m-%d %H:%M:%S')} " \
+               f"({time.perf_counter() - self._started:.0f}s into the run)\n\n"
+        text += self._sampler.summary(self.top) + "\n"
+        if tracemalloc.is_tracing():
+            text += "\n" + self._malloc_summary() + "\n"
+        try:
+            self._snapshot_file().write_text(text, encoding='utf-8')
+        except OSError:
+            pass
+
+    def _malloc_summary(self) -> str:
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Allocations: current {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB"]
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size / 1024:8.1f} KiB {stat.count:6d} blocks  "
+                         f"{Path(frame.filename).name}:{frame.lineno}")
+        return '\n'.join(lines)
+
+    def summary(self) -> str:
+        lines = ["=" * 60, "Profile summary", "=" * 60,
+                 f"Start-up CPU time (interpreter + imports): {self._startup_cpu:.3f}s",
+                 f"Wall time profiled: {time.perf_counter() - self._started:.3f}s"]
+        if self.phases:
+            lines.append("Phases (calls, total wall time):")
+            for name, (calls, total) in sorted(self.phases.items(), key=lambda p: -p[1][1]):
+                lines.append(f"  {total:8.3f}s {calls:5d}x  {name}")
+        if self._cprofile:
+            stream = io.StringIO()
+            pstats.Stats(self._cprofile, stream=stream).sort_stats('cumulative').print_stats(self.top)
+            lines.append("Hot spots (cumulative):")
+            lines.extend("  " + l for l in stream.getvalue().strip().splitlines()
+                         if l.strip() and not l.lstrip().startswith(("Ordered by", "List reduced")))
+        if self._sampler:
+            lines.append(self._sampler.summary(self.top))
+        if tracemalloc.is_tracing():
+            lines.append(self._malloc_summary())
+        return '\n'.join(lines)
+
+    def stop(self):
+        """Stop profiling and write the profile file and summary"""
+        if not self.enabled:
+            return
+        if self._cprofile:
+            self._cprofile.disable()
+        self._snapshot_stop.set()
+        if self._sampler:
+            self._sampler.stop()
+        text = self.summary()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if self.profile_path:
+            self._cprofile.dump_stats(str(self.profile_path))
+            summary_path = self.profile_path.with_name(self.profile_path.name + ".txt")
+            summary_path.write_text(text + "\n", encoding='utf-8')
+            text += f"\nProfile written to {self.profile_path} (summary: {summary_path})"
+        print(text, file=self.out)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rate limiting module
+Token buckets that keep router requests and machine power-on within safe rates
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+# Default router request rate (requests per second) and burst size
+DEFAULT_ROUTER_RATE = 5.0
+DEFAULT_ROUTER_BURST = 5
+
+
+class TokenBucket:
+    """Thread-safe token bucket"""
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (requests allowed back-to-back)
+            clock: Monotonic time source (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def configure(self, rate: Optional[float] = None, burst: Optional[int] = None):
+        """
+        Change rate and/or burst in place
+
+        Tokens already earned are kept (capped at the new burst); changing
+        the settings never grants a fresh burst.
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if rate is not None:
+                self.rate = float(rate)
+            if burst is not None:
+                self.burst = max(1, int(burst))
+            self._tokens = min(self._tokens, self.burst)
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        Take tokens now, possibly going into debt
+
+        Returns:
+            Seconds the caller must wait before using the tokens
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Block until tokens are available
+
+        Returns:
+            Seconds waited
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+
+_router_limiters: Dict[str, TokenBucket] = {}
+_router_limiters_lock = threading.Lock()
+
+
+def get_router_limiter(router_url: str, rate: Optional[float] = None, burst: Optional[int] = None) -> TokenBucket:
+    """
+    Get the process-wide limiter for a router (one bucket per router URL)
+
+    Args:
+        router_url: Router URL (e.g., http://192.168.0.1:80)
+        rate: Requests per second (used when the limiter is first created; a
+            different value reconfigures the shared bucket in place)
+        burst: Burst size
+
+    Returns:
+        Shared TokenBucket for the router (always the same object for a URL)
+    """
+    key = router_url.rstrip('/').lower()
+    with _router_limiters_lock:
+        limiter = _router_limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucket(rate or DEFAULT_ROUTER_RATE, burst or DEFAULT_ROUTER_BURST)
+            _router_limiters[key] = limiter
+        elif (rate is not None and rate != limiter.rate) or (burst is not None and burst != limiter.burst):
+            limiter.configure(rate, burst)
+        return limiter
+
+
+def router_limiter_for(router_config: dict) -> TokenBucket:
+    """
+    Get the shared limiter for a target's router section
+
+    Args:
+        router_config: config.json "router" section; an optional
+            "rate_limit": {"rate": 5, "burst": 5} overrides the defaults
+
+    Returns:
+        Shared TokenBucket for the router
+    """
+    limits = router_config.get("rate_limit", {})
+    return get_router_limiter(router_config["url"], rate=limits.get("rate"), burst=limits.get("burst"))
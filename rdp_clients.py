@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Remote Desktop client module
+Pluggable client commands (mstsc, xfreerdp, fake client for tests)
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Type
+
+
+class RDPClient:
+    """Base class for Remote Desktop client launchers"""
+
+    name = ""
+    install_hint = ""
+
+    def command(self, connector, rdp_file: Path) -> List[str]:
+        """
+        Build the command line for a connection
+
+        Args:
+            connector: MSTSCConnector with host/port/username
+            rdp_file: Generated RDP file
+
+        Returns:
+            Command as argument list
+        """
+        raise NotImplementedError
+
+    def popen_kwargs(self) -> dict:
+        """Extra keyword arguments for subprocess.Popen"""
+        return {}
+
+
+class MstscClient(RDPClient):
+    """Windows Remote Desktop Connection (mstsc.exe)"""
+
+    name = "mstsc"
+    install_hint = "Please check if Windows Remote Desktop is installed"
+
+    def command(self, connector, rdp_file: Path) -> List[str]:
+        # Pass RDP file as argument
+        return ['mstsc', str(rdp_file)]
+
+    def popen_kwargs(self) -> dict:
+        # Run in background, detached from this console (Windows only flags)
+        flags = getattr(subprocess, 'DETACHED_PROCESS', 0) | getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+        return {"creationflags": flags} if flags else {}
+
+
+class XFreeRDPClient(RDPClient):
+    """FreeRDP client (Linux/macOS)"""
+
+    name = "xfreerdp"
+    install_hint = "Please install FreeRDP (e.g., apt install freerdp2-x11)"
+
+    def command(self, connector, rdp_file: Path) -> List[str]:
+        # FreeRDP reads .rdp files directly
+        return ['xfreerdp', str(rdp_file)]
+
+
+# Fake client: optionally connects to host:port, stays alive, then exits with a code
+_FAKE_CLIENT_SCRIPT = """
+import socket, sys, time
+host, port, connect, hold, code = sys.argv[1], int(sys.argv[2]), sys.argv[3] == '1', float(sys.argv[4]), int(sys.argv[5])
+sock = socket.create_connection((host, port), timeout=5) if connect else None
+time.sleep(hold)
+sys.exit(code)
+"""
+
+
+class FakeRDPClient(RDPClient):
+    """Stand-in client for tests: a Python child process instead of a real RDP client"""
+
+    name = "fake"
+
+    def __init__(self, connect: bool = True, hold: float = 1.0, exit_code: int = 0):
+        """
+        Args:
+            connect: Open a TCP connection to the target host:port like a real client
+            hold: Seconds the process stays alive
+            exit_code: Process exit code
+        """
+        self.connect = connect
+        self.hold = hold
+        self.exit_code = exit_code
+
+    def command(self, connector, rdp_file: Path) -> List[str]:
+        return [sys.executable, '-c', _FAKE_CLIENT_SCRIPT, connector.host, str(connector.port),
+                '1' if self.connect else '0', str(self.hold), str(self.exit_code)]
+
+
+RDP_CLIENTS: Dict[str, Type[RDPClient]] = {
+    MstscClient.name: MstscClient,
+    XFreeRDPClient.name: XFreeRDPClient,
+    FakeRDPClient.name: FakeRDPClient,
+}
+
+
+def get_client(name: str = "mstsc") -> RDPClient:
+    """
+    Get a client launcher by name
+
+    Args:
+        name: Client name (mstsc, xfreerdp, fake)
+
+    Returns:
+        RDPClient instance
+
+    Raises:
+        Exception: Unknown client name
+    """
+    try:
+        return RDP_CLIENTS[name]()
+    except KeyError:
+        raise Exception(f"Unknown RDP client: {name} (available: {', '.join(RDP_CLIENTS)})")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RDP reachability probe module
+TCP checks against Remote Desktop endpoints
+"""
+
+import ipaddress
+import os
+import socket
+import subprocess
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from endpoint_race import race
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+DEFAULT_RDP_PORT = 3389
+
+
+def parse_server(server: str, default_port: int = DEFAULT_RDP_PORT) -> Tuple[str, int]:
+    """
+    Split a server address into host and port
+
+    Args:
+        server: Server address (e.g., 192.168.0.100:3389 or domain.com)
+        default_port: Port used when the address has none
+
+    Returns:
+        (host, port)
+    """
+    if ':' in server:
+        host, port_str = server.rsplit(':', 1)
+        return host, int(port_str)
+    return server, default_port
+
+
+def tcp_probe(host: str, port: int, timeout: float = 1.0) -> Optional[float]:
+    """
+    Try a TCP connection to host:port
+
+    Args:
+        host: Host name or IP
+        port: TCP port
+        timeout: Connect timeout in seconds
+
+    Returns:
+        Connect time in seconds, or None if unreachable
+    """
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return time.perf_counter() - start
+    except OSError:
+        return None
+
+
+def rdp_endpoints(rdp_config: dict) -> List[str]:
+    """
+    RDP endpoints of a target: "server" plus optional alternatives in "servers"
+
+    Args:
+        rdp_config: config.json "rdp" section (e.g., {"server": "home.example.com:13389",
+            "servers": ["192.168.0.10", "10.8.0.10"]})
+
+    Returns:
+        Endpoints in configured order, without duplicates
+    """
+    return list(dict.fromkeys([rdp_config["server"]] + list(rdp_config.get("servers", []))))
+
+
+def probe_server(server: str, timeout: float = 1.0) -> Optional[float]:
+    """TCP connect time to a server address (host[:port]), None if unreachable"""
+    host, port = parse_server(server)
+    return tcp_probe(host, port, timeout=timeout)
+
+
+def probe_any(servers: Sequence[str], timeout: float = 1.0) -> Optional[Tuple[str, float]]:
+    """
+    Race a TCP connect to every server
+
+    Returns:
+        (first server that answered, connect seconds), or None
+    """
+    if len(servers) == 1:
+        seconds = probe_server(servers[0], timeout)
+        return (servers[0], seconds) if seconds is not None else None
+    return race(servers, probe_server, timeout)
+
+
+def wait_for_any_port(servers: Sequence[str], timeout: float = 60.0, interval: float = 1.0,
+                      cancel: Optional[threading.Event] = None) -> Optional[Tuple[str, float]]:
+    """
+    Poll several endpoints of one machine until any accepts TCP connections
+
+    Args:
+        servers: Server addresses (host[:port])
+        timeout: Maximum time to wait in seconds
+        interval: Delay between rounds in seconds
+        cancel: Optional event that stops waiting when set
+
+    Returns:
+        (fastest reachable server, seconds waited), or None on timeout/cancel
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (cancel and cancel.is_set()):
+            return None
+        winner = probe_any(servers, timeout=min(interval, remaining))
+        if winner is not None:
+            return winner[0], time.monotonic() - start
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        if cancel:
+            if cancel.wait(min(interval, remaining)):
+                return None
+        else:
+            time.sleep(min(interval, remaining))
+
+
+def wait_for_port(host: str, port: int, timeout: float = 60.0, interval: float = 1.0,
+                  cancel: Optional[threading.Event] = None) -> Optional[float]:
+    """
+    Poll host:port until it accepts TCP connections
+
+    Args:
+        host: Host name or IP
+        port: TCP port
+        timeout: Maximum time to wait in seconds
+        interval: Delay between attempts in seconds
+        cancel: Optional event that stops waiting when set
+
+    Returns:
+        Seconds waited until the port was reachable, or None on timeout/cancel
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (cancel and cancel.is_set()):
+            return None
+        if tcp_probe(host, port, timeout=min(interval, remaining)) is not None:
+            return time.monotonic() - start
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        if cancel:
+            if cancel.wait(min(interval, remaining)):
+                return None
+        else:
+            time.sleep(min(interval, remaining))
+
+
+# ============================================================================
+# Established connection detection (client process supervision)
+# ============================================================================
+
+def _resolve_addresses(host: str, port: int) -> set:
+    """Resolve host to the set of IP addresses a client would connect to"""
+    try:
+        return {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except OSError:
+        return {host}
+
+
+def _proc_socket_inodes(pid: int) -> Optional[set]:
+    """Socket inodes owned by a process (Linux /proc), or None if unreadable"""
+    fd_dir = f"/proc/{pid}/fd"
+    try:
+        inodes = set()
+        for fd in os.listdir(fd_dir):
+            try:
+                link = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            if link.startswith("socket:["):
+                inodes.add(link[8:-1])
+        return inodes
+    except OSError:
+        return None
+
+
+def _proc_net_tcp_established(addresses: set, port: int, pid: Optional[int]) -> bool:
+    """Check /proc/net/tcp{,6} for an ESTABLISHED connection to one of addresses:port"""
+    inodes = _proc_socket_inodes(pid) if pid else None
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, 'r') as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    remote, state, inode = fields[2], fields[3], fields[9]
+                    if state != "01":  # TCP_ESTABLISHED
+                        continue
+                    ip_hex, port_hex = remote.split(':')
+                    if int(port_hex, 16) != port:
+                        continue
+                    raw = bytes.fromhex(ip_hex)
+                    # Kernel prints each 32-bit word in host (little-endian) order
+                    raw = b''.join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+                    ip = ipaddress.ip_address(raw)
+                    if getattr(ip, 'ipv4_mapped', None):
+                        ip = ip.ipv4_mapped
+                    if str(ip) not in addresses:
+                        continue
+                    if inodes is not None and inode not in inodes:
+                        continue
+                    return True
+        except (OSError, StopIteration, ValueError):
+            continue
+    return False
+
+
+def _netstat_established(addresses: set, port: int, pid: Optional[int]) -> bool:
+    """Check `netstat -ano` output (Windows) for an ESTABLISHED connection"""
+    try:
+        output = subprocess.run(['netstat', '-ano', '-p', 'TCP'], capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return False
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) < 5 or fields[3].upper() != "ESTABLISHED":
+            continue
+        remote_host, _, remote_port = fields[2].rpartition(':')
+        if remote_port != str(port) or remote_host.strip('[]') not in addresses:
+            continue
+        if pid and fields[4] != str(pid):
+            continue
+        return True
+    return False
+
+
+def has_established_connection(host: str, port: int, pid: Optional[int] = None) -> bool:
+    """
+    Check whether a TCP connection to host:port is established
+
+    Args:
+        host: Remote host name or IP
+        port: Remote port
+        pid: Only count connections owned by this process (when the platform allows)
+
+    Returns:
+        True if an established connection exists
+    """
+    addresses = _resolve_addresses(host, port)
+    if PSUTIL_AVAILABLE:
+        try:
+            conns = psutil.Process(pid).net_connections(kind='tcp') if pid else psutil.net_connections(kind='tcp')
+            return any(c.status == psutil.CONN_ESTABLISHED and c.raddr and c.raddr.port == port
+                       and c.raddr.ip in addresses for c in conns)
+        except (psutil.Error, AttributeError):
+            pass
+    if os.path.exists("/proc/net/tcp"):
+        return _proc_net_tcp_established(addresses, port, pid)
+    return _netstat_established(addresses, port, pid)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RDP profile module
+Pick RDP performance settings from the measured RTT and the router link speed
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from link_watch import encode_link
+from rdp_probe import tcp_probe
+
+
+# Profile name -> RDP setting overrides (applied before per-target settings).
+# "connection type" values: 2 low-speed broadband, 4 high-speed broadband, 6 LAN;
+# the client only honours a fixed connection type with network/bandwidth auto-detection off
+RDP_PROFILES: Dict[str, Dict[str, Any]] = {
+    "lan": {
+        "connection type": 6,
+        "networkautodetect": 0,
+        "bandwidthautodetect": 0,
+        "session bpp": 32,
+        "compression": 1,
+        "bitmapcachepersistenable": 1,
+    },
+    "broadband": {
+        "connection type": 4,
+        "networkautodetect": 0,
+        "bandwidthautodetect": 0,
+        "session bpp": 24,
+        "compression": 1,
+        "bitmapcachepersistenable": 1,
+        "disable wallpaper": 1,
+        "disable full window drag": 1,
+        "disable menu anims": 1,
+        "allow desktop composition": 0,
+    },
+    "wan": {
+        "connection type": 2,
+        "networkautodetect": 0,
+        "bandwidthautodetect": 0,
+        "session bpp": 16,
+        "compression": 1,
+        "bitmapcachepersistenable": 1,
+        "disable wallpaper": 1,
+        "disable full window drag": 1,
+        "disable menu anims": 1,
+        "disable themes": 1,
+        "allow font smoothing": 0,
+        "allow desktop composition": 0,
+        "videoplaybackmode": 0,
+    },
+}
+
+# Upper RTT bounds in milliseconds for the faster profiles
+LAN_MAX_RTT_MS = 5.0
+BROADBAND_MAX_RTT_MS = 40.0
+
+
+def measure_rtt(host: str, port: int, samples: int = 3, timeout: float = 0.5) -> Optional[float]:
+    """
+    Round-trip time to the RDP server (best TCP connect time)
+
+    Args:
+        host: Host name or IP
+        port: RDP port
+        samples: Number of TCP connects
+        timeout: Connect timeout per sample in seconds
+
+    Returns:
+        RTT in milliseconds, or None if the server did not answer
+    """
+    times = [t for t in (tcp_probe(host, port, timeout=timeout) for _ in range(samples)) if t is not None]
+    return min(times) * 1000 if times else None
+
+
+def select_profile(rtt_ms: Optional[float], link: Optional[str] = None) -> Optional[str]:
+    """
+    Pick the profile for a link
+
+    Args:
+        rtt_ms: Measured RTT (None: unknown)
+        link: Router link value of the target's port (e.g., "1000f", "100h"; None,
+            down or unparseable: unknown)
+
+    Returns:
+        Profile name, or None if nothing is known (keep the default settings)
+    """
+    speed = encode_link(link) or None  # 0: down or unparseable, says nothing about the path
+    if rtt_ms is None and speed is None:
+        return None
+    # Half duplex or 10 Mbps ports cap the session whatever the RTT is
+    if speed is not None and (speed < 0 or 0 < speed <= 10):
+        return "wan"
+    if rtt_ms is None:
+        return "lan" if speed >= 1000 else "broadband"
+    if rtt_ms <= LAN_MAX_RTT_MS and (speed is None or speed >= 100):
+        return "lan"
+    if rtt_ms <= BROADBAND_MAX_RTT_MS:
+        return "broadband"
+    return "wan"
+
+
+def resolve_profile(profile: Optional[str], host: str, port: int,
+                    link: Optional[str] = None) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Resolve a configured profile ("auto" measures the link)
+
+    Args:
+        profile: Profile name, "auto" or None (no profile)
+        host: RDP host
+        port: RDP port
+        link: Router link value if known
+
+    Returns:
+        (profile name or None, measured RTT in ms or None)
+
+    Raises:
+        ValueError: Unknown profile name
+    """
+    if profile is None:
+        return None, None
+    if profile == "auto":
+        rtt_ms = measure_rtt(host, port)
+        return select_profile(rtt_ms, link), rtt_ms
+    if profile not in RDP_PROFILES:
+        raise ValueError(f"Unknown RDP profile: {profile} (available: auto, {', '.join(RDP_PROFILES)})")
+    return profile, None
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Router driver module
+Driver interface, capability flags and registry keyed by config.json router.type
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Type
+from urllib.parse import urlsplit
+
+import requests
+
+from endpoint_race import get_endpoint_memory, pick_endpoint
+from iptime_wol import IPTimeWOL
+from rate_limiter import TokenBucket, get_router_limiter
+from rdp_probe import tcp_probe
+
+
+def router_endpoints(router_config: dict) -> List[str]:
+    """
+    Router URLs of a target: "url" plus optional alternatives in "urls"
+
+    "url" stays the router's identity (rate limiter, grouping); "urls" may
+    list e.g. a static IP or VPN address next to a DDNS name.
+    """
+    urls = [router_config["url"]] + list(router_config.get("urls", []))
+    return list(dict.fromkeys(u.rstrip('/') for u in urls))
+
+
+def router_endpoint_key(router_config: dict) -> str:
+    return "router:" + router_config["url"].rstrip('/').lower()
+
+
+def probe_router_url(url: str, timeout: float) -> Optional[float]:
+    """TCP connect time to a router URL's host and port (cheapest request that proves the path)"""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return tcp_probe(parts.hostname or "", port, timeout=timeout)
+
+
+def best_router_url(router_config: dict) -> str:
+    """
+    Router URL to use now
+
+    With several endpoints, the remembered winner is used while fresh;
+    otherwise they are raced with a TCP connect and the winner remembered
+    (endpoint_state.json). Falls back to "url" if none answers.
+    """
+    endpoints = router_endpoints(router_config)
+    return pick_endpoint(router_endpoint_key(router_config), endpoints, probe_router_url) or endpoints[0]
+
+
+class RouterDriver:
+    """Base class for router drivers
+
+    Capability flags let the wake/detection engine pick the cheapest
+    strategy per router (see wake_engine).
+    """
+
+    type_name = ""
+    batch_wol = False         # One request can wake several MAC addresses
+    bulk_port_status = False  # One request returns the link state of every port
+    session_reuse = False     # A login stays valid for later requests
+    default_rate_limit: Tuple[float, int] = (5.0, 5)  # (requests per second, burst)
+
+    def __init__(self, router_config: dict, cred: dict, verbose: bool = True):
+        """
+        Args:
+            router_config: config.json "router" section
+            cred: Target credentials (router_id, router_pw)
+            verbose: Print progress messages
+        """
+        self.router_config = router_config
+        self.cred = cred
+        self.verbose = verbose
+        self.logged_in = False
+        self._login_lock = threading.Lock()
+
+    @classmethod
+    def rate_limiter_for(cls, router_config: dict) -> TokenBucket:
+        """Shared limiter for the router (config "rate_limit" overrides the driver default)"""
+        limits = router_config.get("rate_limit", {})
+        return get_router_limiter(router_config["url"], rate=limits.get("rate", cls.default_rate_limit[0]),
+                                  burst=limits.get("burst", cls.default_rate_limit[1]))
+
+    def login(self):
+        """Log in to the router. Raises Exception on failure."""
+        raise NotImplementedError
+
+    def send_wol(self, mac_addresses: List[str]):
+        """Send WOL to the given MACs (one request only if batch_wol). Raises Exception on failure."""
+        raise NotImplementedError
+
+    def port_links(self, ports: Optional[List[int]] = None) -> Dict[int, str]:
+        """
+        Link values of LAN ports (e.g., {4: "1000f", 3: ""})
+
+        Args:
+            ports: Ports of interest (drivers without bulk_port_status query only these)
+        """
+        raise NotImplementedError
+
+    def ensure_login(self):
+        """Log in unless a reusable session already exists"""
+        with self._login_lock:
+            if not (self.session_reuse and self.logged_in):
+                self.login()
+                self.logged_in = True
+
+
+class IPTimeDriver(RouterDriver):
+    """IPTIME routers (JSON API at /cgi/service.cgi)"""
+
+    type_name = "iptime"
+    # wol/signal takes a list, but multi-MAC requests are unverified on real firmware
+    batch_wol = False
+    bulk_port_status = True
+    session_reuse = True
+    default_rate_limit = (5.0, 5)
+
+    def __init__(self, router_config: dict, cred: dict, verbose: bool = True, client: Optional[IPTimeWOL] = None):
+        super().__init__(router_config, cred, verbose)
+        self.endpoints = router_endpoints(router_config)
+        self._client = client
+        self._failed: set = set()
+
+    def _new_client(self, url: str) -> IPTimeWOL:
+        return IPTimeWOL(
+            router_url=url,
+            router_id=self.cred["router_id"],
+            router_pw=self.cred["router_pw"],
+            rate_limiter=self.rate_limiter_for(self.router_config),
+            verbose=self.verbose
+        )
+
+    @property
+    def client(self) -> IPTimeWOL:
+        """Client for the best endpoint (chosen on first use)"""
+        if self._client is None:
+            self._client = self._new_client(best_router_url(self.router_config))
+        return self._client
+
+    @staticmethod
+    def _unreachable(error: BaseException) -> bool:
+        """True if the error (or one it was raised from) is a connection failure or timeout"""
+        while error is not None:
+            if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+                return True
+            error = error.__cause__ or error.__context__
+        return False
+
+    def _with_failover(self, operation):
+        """Run a router operation, moving to the next endpoint if the current one is unreachable
+
+        Rejected logins and protocol errors are raised as they are: another
+        endpoint of the same router would answer the same way.
+        """
+        relogin = False
+        switched = False
+        while True:
+            start = time.perf_counter()
+            try:
+                if relogin:
+                    self.client.login()
+                result = operation()
+                if switched:
+                    # Remember the endpoint that worked so other processes skip the failed one
+                    get_endpoint_memory().remember(router_endpoint_key(self.router_config), self.client.router_url,
+                                                   time.perf_counter() - start)
+                return result
+            except Exception as e:
+                current = self.client.router_url
+                remaining = [e for e in self.endpoints if e != current and e not in self._failed]
+                if not remaining or not self._unreachable(e):
+                    raise
+                self._failed.add(current)
+                key = router_endpoint_key(self.router_config)
+                get_endpoint_memory().forget(key)
+                url = pick_endpoint(key, remaining, probe_router_url) or remaining[0]
+                if self.verbose:
+                    print(f"⚠️  Router endpoint {current} failed, switching to {url}")
+                self._client = self._new_client(url)
+                relogin = self.logged_in
+                switched = True
+
+    def login(self):
+        self._with_failover(lambda: self.client.login())
+
+    def send_wol(self, mac_addresses: List[str]):
+        def send():
+            for mac in mac_addresses:
+                self.client.send_wol(mac)
+        self._with_failover(send)
+
+    def port_links(self, ports: Optional[List[int]] = None) -> Dict[int, str]:
+        return self._with_failover(self._port_links)
+
+    def _port_links(self) -> Dict[int, str]:
+        links = {}
+        for item in self.client.get_port_link_status():
+            try:
+                if item.get('type') == 'lan':
+                    links[int(item.get('port'))] = item.get('link') or ""
+            except (TypeError, ValueError):
+                continue
+        return links
+
+
+class FakeRouterDriver(RouterDriver):
+    """In-memory router for tests and benchmarks
+
+    config "router" section:
+        {"type": "fake", "url": "fake://r1", "ports": {"AA:BB:...": 4}, "boot_polls": 2,
+         "capabilities": {"batch_wol": true, ...}}
+    A port comes up after boot_polls status requests following the WOL for its MAC.
+    Routers with the same URL share state, like a real router would.
+    """
+
+    type_name = "fake"
+    batch_wol = True
+    bulk_port_status = True
+    session_reuse = True
+    default_rate_limit = (1000.0, 1000)
+
+    _routers: Dict[str, dict] = {}
+    _routers_lock = threading.Lock()
+
+    def __init__(self, router_config: dict, cred: dict, verbose: bool = True):
+        super().__init__(router_config, cred, verbose)
+        for flag, value in router_config.get("capabilities", {}).items():
+            if flag in ("batch_wol", "bulk_port_status", "session_reuse"):
+                setattr(self, flag, bool(value))
+        with self._routers_lock:
+            self.state = self._routers.setdefault(router_config["url"], {
+                "ports": {mac.upper(): int(p) for mac, p in router_config.get("ports", {}).items()},
+                "boot_polls": router_config.get("boot_polls", 0),
+                "booting": {},  # port -> polls left
+                "up": set(),
+                "calls": [],
+                "lock": threading.Lock(),
+            })
+
+    @classmethod
+    def reset(cls):
+        """Forget all fake router state"""
+        with cls._routers_lock:
+            cls._routers.clear()
+
+    @property
+    def calls(self) -> List[str]:
+        return self.state["calls"]
+
+    def login(self):
+        with self.state["lock"]:
+            self.state["calls"].append("session/login")
+
+    def send_wol(self, mac_addresses: List[str]):
+        if not self.batch_wol and len(mac_addresses) > 1:
+            raise Exception("Driver does not support batch WOL")
+        if not self.session_reuse:
+            self.login()
+        with self.state["lock"]:
+            self.state["calls"].append("wol/signal")
+            for mac in mac_addresses:
+                port = self.state["ports"].get(mac.upper())
+                if port is not None and port not in self.state["up"]:
+                    self.state["booting"].setdefault(port, self.state["boot_polls"])
+
+    def _tick(self):
+        booting = self.state["booting"]
+        for port in list(booting):
+            if booting[port] <= 0:
+                self.state["up"].add(port)
+                del booting[port]
+            else:
+                booting[port] -= 1
+
+    def port_links(self, ports: Optional[List[int]] = None) -> Dict[int, str]:
+        if not self.session_reuse:
+            self.login()
+        with self.state["lock"]:
+            self.state["calls"].append("port/link/status")
+            self._tick()
+            all_ports = set(self.state["ports"].values())
+            wanted = all_ports if self.bulk_port_status or ports is None else set(ports)
+            return {p: ("1000f" if p in self.state["up"] else "") for p in wanted}
+
+
+DRIVERS: Dict[str, Type[RouterDriver]] = {}
+
+
+def register_driver(cls: Type[RouterDriver]) -> Type[RouterDriver]:
+    """Register a driver class under its type_name (usable as a decorator)"""
+    DRIVERS[cls.type_name] = cls
+    return cls
+
+
+register_driver(IPTimeDriver)
+register_driver(FakeRouterDriver)
+
+
+def create_driver(router_config: dict, cred: dict, verbose: bool = True) -> RouterDriver:
+    """
+    Create the driver for a target's router
+
+    Args:
+        router_config: config.json "router" section ("type" selects the driver, default iptime)
+        cred: Target credentials
+        verbose: Print progress messages
+
+    Returns:
+        RouterDriver instance
+
+    Raises:
+        Exception: Unknown router type
+    """
+    router_type = router_config.get("type", "iptime")
+    cls = DRIVERS.get(router_type)
+    if cls is None:
+        raise Exception(f"Unsupported router type: {router_type} (available: {', '.join(sorted(DRIVERS))})")
+    return cls(router_config, cred, verbose=verbose)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Router trace module
+Record router API traffic (credentials scrubbed) and replay it without a network
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+import iptime_wol
+from rate_limiter import TokenBucket
+
+
+SCRUBBED = "***"
+# Cookie carrying the router session (value is scrubbed in traces)
+SESSION_COOKIE = "efm_session_id"
+
+
+def scrub_request(data: Optional[dict]) -> Optional[dict]:
+    """
+    Remove credentials from a request body
+
+    Args:
+        data: Request body ({"method": ..., "params": ...})
+
+    Returns:
+        Copy with login id/pw replaced
+    """
+    if not isinstance(data, dict):
+        return data
+    data = json.loads(json.dumps(data))
+    params = data.get("params")
+    if isinstance(params, dict):
+        for key in ("id", "pw", "password", "passwd"):
+            if key in params:
+                params[key] = SCRUBBED
+    return data
+
+
+# Response fields that may carry session tokens or credentials: exact names, or names
+# whose last word is one of SECRET_WORDS (e.g., "access_token", "userPassword").
+# Whole words only, so fields like "ssid" or "authmode" stay intact for replay.
+SECRET_FIELDS = ("id", "pw", "auth", "authorization", "session", "sessionid", "session_id", "efm_session_id")
+SECRET_WORDS = ("token", "pw", "password", "passwd", "secret", "credential", "credentials", "cookie", "sid")
+
+
+def _is_secret_field(name: str) -> bool:
+    if name.lower() in SECRET_FIELDS:
+        return True
+    # "accessToken" / "access-token" -> ["access", "token"]
+    words = [w for w in re.split(r"[^a-z0-9]+", re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name).lower()) if w]
+    return bool(words) and (words[-1] in SECRET_WORDS or words[-2:] == ["session", "id"])
+
+
+def _scrub_value(value):
+    if isinstance(value, dict):
+        return {k: SCRUBBED if _is_secret_field(str(k)) else _scrub_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_scrub_value(v) for v in value]
+    return value
+
+
+def scrub_response(text: str) -> str:
+    """
+    Remove session tokens and credentials from a response body
+
+    Args:
+        text: Response body
+
+    Returns:
+        JSON body with secret fields replaced (at any depth); non-JSON bodies unchanged
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(_scrub_value(data), ensure_ascii=False)
+
+
+class TraceRecorder:
+    """Append trace entries to a JSON lines file"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, entry: dict):
+        entry = dict(entry, t=round(time.monotonic() - self.start, 6))
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+class RecordingSession:
+    """requests.Session wrapper that records every POST to the trace"""
+
+    def __init__(self, recorder: TraceRecorder, session: Optional[requests.Session] = None):
+        self.recorder = recorder
+        self.session = session or requests.Session()
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def post(self, url, json=None, **kwargs):
+        entry = {
+            "path": urlsplit(url).path,
+            "method": (json or {}).get("method", ""),
+            "request": scrub_request(json),
+        }
+        start = time.perf_counter()
+        try:
+            response = self.session.post(url, json=json, **kwargs)
+        except requests.exceptions.Timeout as e:
+            entry.update(elapsed=time.perf_counter() - start, error="timeout", message=str(e))
+            self.recorder.write(entry)
+            raise
+        except requests.exceptions.RequestException as e:
+            entry.update(elapsed=time.perf_counter() - start, error="connection", message=str(e))
+            self.recorder.write(entry)
+            raise
+        entry.update(
+            elapsed=time.perf_counter() - start,
+            status=response.status_code,
+            response=scrub_response(response.text),
+            cookies={name: SCRUBBED for name in response.cookies.keys()},
+        )
+        self.recorder.write(entry)
+        return response
+
+    def mount(self, prefix, adapter):
+        if hasattr(self.session, "mount"):
+            self.session.mount(prefix, adapter)
+
+
+def enable_recording(path: Path) -> TraceRecorder:
+    """
+    Record the traffic of every IPTimeWOL created from now on
+
+    Args:
+        path: Trace file (JSON lines, appended)
+
+    Returns:
+        The recorder
+    """
+    recorder = TraceRecorder(path)
+    iptime_wol.set_session_factory(lambda: RecordingSession(recorder))
+    return recorder
+
+
+def load_trace(path: Path) -> List[dict]:
+    """Read a trace file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayResponse:
+    """Minimal requests.Response stand-in"""
+
+    def __init__(self, status_code: int, text: str, url: str = ""):
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error (replayed)", response=self)
+
+
+class ReplaySession:
+    """Serve recorded responses to IPTimeWOL in place of a router
+
+    Responses are served per API method in recorded order; once a
+    method's entries are used up its last entry is repeated (a steady
+    state, e.g. the final port status). Recorded latencies are reproduced
+    divided by speed (speed 0: no delay).
+    """
+
+    def __init__(self, entries: List[dict], speed: float = 1.0, sleep=time.sleep):
+        """
+        Args:
+            entries: Trace entries (from load_trace)
+            speed: Replay speed factor (1: original timing, 10: ten times faster, 0: instant)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.speed = speed
+        self.sleep = sleep
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self._queues: Dict[str, List[dict]] = {}
+        self._last: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        for entry in entries:
+            self._queues.setdefault(entry.get("method", ""), []).append(entry)
+
+    def _next(self, method: str) -> dict:
+        with self._lock:
+            queue = self._queues.get(method)
+            if queue:
+                self._last[method] = queue.pop(0)
+            if method not in self._last:
+                raise requests.exceptions.ConnectionError(f"No recorded response for '{method}'")
+            return self._last[method]
+
+    def post(self, url, json=None, **kwargs):
+        entry = self._next((json or {}).get("method", ""))
+        if self.speed > 0 and entry.get("elapsed"):
+            self.sleep(entry["elapsed"] / self.speed)
+        if entry.get("error") == "timeout":
+            raise requests.exceptions.Timeout(f"Replayed timeout: {entry.get('message', '')}")
+        if entry.get("error"):
+            raise requests.exceptions.ConnectionError(f"Replayed connection error: {entry.get('message', '')}")
+        for name in entry.get("cookies", {}):
+            self.cookies.set(name, "replay")
+        return ReplayResponse(entry.get("status", 200), entry.get("response", ""), url)
+
+    def mount(self, prefix, adapter):
+        pass
+
+
+def replay_wake(trace_path: Path, mac_address: str, lan_port: int, speed: float = 1.0,
+                max_wait_seconds: float = 30.0, check_interval: float = 1.0) -> dict:
+    """
+    Run the wake flow (login, WOL, port polling) against a recorded trace
+
+    Args:
+        trace_path: Trace file
+        mac_address: MAC address passed to wol/signal
+        lan_port: LAN port to watch
+        speed: Replay speed factor (also scales the polling interval)
+        max_wait_seconds: Wake detection timeout (trace time)
+        check_interval: Seconds between port checks (trace time)
+
+    Returns:
+        {"woke": bool, "polls": int, "wake_seconds": float, "wall_seconds": float}
+    """
+    scale = 1.0 / speed if speed > 0 else 0.0
+    wol_obj = iptime_wol.IPTimeWOL("http://replay", "", "", session=ReplaySession(load_trace(trace_path), speed),
+                                   rate_limiter=TokenBucket(1e6, 1000), verbose=False)
+    start = time.monotonic()
+    wol_obj.send_wol_packet(mac_address)
+    polls = 0
+    woke = False
+    for _ in range(int(max_wait_seconds / check_interval)):
+        polls += 1
+        try:
+            if wol_obj.is_lan_port_up(lan_port):
+                woke = True
+                break
+        except Exception:
+            pass
+        time.sleep(check_interval * scale)
+    wall = time.monotonic() - start
+    return {"woke": woke, "polls": polls, "wake_seconds": wall / scale if scale else None, "wall_seconds": wall}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay a recorded router trace through the wake flow')
+    parser.add_argument('trace', help='Trace file recorded with wol_mstsc.py --record-trace')
+    parser.add_argument('--mac', default='00:00:00:00:00:00', help='MAC address for wol/signal')
+    parser.add_argument('--lan-port', type=int, required=True, help='LAN port to watch')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay speed factor (0: no delays)')
+    args = parser.parse_args()
+    print(json.dumps(replay_wake(Path(args.trace), args.mac, args.lan_port, args.speed)))
+    sys.exit(0)
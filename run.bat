@@ -8,19 +8,13 @@ echo WOL-MSTSC Program Start
 echo ================================
 echo.
 
-:: Check and install required packages
-echo Checking required packages...
-python -c "import cryptography, requests" >nul 2>&1
-if errorlevel 1 (
-    echo.
-    echo [INSTALL] Installing required Python packages...
-    echo.
-    python -m pip install -r requirements.txt
-    echo.
+:: Run main program (single-file build from build_zipapp.py if present, otherwise the sources).
+:: Required packages are installed on first start; later starts only read the install marker.
+if exist "%~dp0wol_mstsc.pyz" (
+    python "%~dp0wol_mstsc.pyz" %*
+) else (
+    python "%~dp0bootstrap.py" %*
 )
-
-:: Run main program
-python wol_mstsc.py
 set EXIT_CODE=%errorlevel%
 
 echo.
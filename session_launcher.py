@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-session launcher module
+Open several Remote Desktop sessions at once, each as soon as its target is ready
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional
+
+from metrics import RDP_READY_SECONDS, WAKE_TIMEOUTS, LAUNCHES, LAUNCH_CONNECT_SECONDS
+from rdp_probe import wait_for_any_port, wait_for_port, has_established_connection
+
+
+class LaunchJob:
+    """One target to wake (optionally) and connect"""
+
+    def __init__(self, name: str, connector, wake: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            name: Target name
+            connector: MSTSCConnector for the target
+            wake: Optional callable that wakes the target (e.g., sends WOL)
+        """
+        self.name = name
+        self.connector = connector
+        self.wake = wake
+
+
+class LaunchResult:
+    """Per-launch status report"""
+
+    def __init__(self, name: str):
+        self.name = name
+        # pending/waking/waiting/launched/relaunching/connected/unconfirmed/exited/not_ready/failed
+        self.status = "pending"
+        self.ready_seconds: Optional[float] = None
+        self.connect_seconds: Optional[float] = None  # client launch -> TCP connection established
+        self.total_seconds: Optional[float] = None
+        self.attempts = 0
+        self.exit_code: Optional[int] = None
+        self.error: Optional[str] = None
+        self.process = None
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "ready_seconds": self.ready_seconds,
+            "connect_seconds": self.connect_seconds,
+            "total_seconds": self.total_seconds,
+            "attempts": self.attempts,
+            "exit_code": self.exit_code,
+            "error": self.error,
+        }
+
+
+class ClientSupervisor:
+    """Watch a launched client until its connection is established, relaunching quick failures"""
+
+    def __init__(self, connect_timeout: float = 30.0, quick_fail_seconds: float = 5.0, max_relaunches: int = 2,
+                 backoff: float = 1.0, poll_interval: float = 0.25, connection_check: Optional[Callable] = None):
+        """
+        Args:
+            connect_timeout: Seconds to wait for the client's TCP connection to host:port
+            quick_fail_seconds: An exit within this many seconds of launch counts as a quick failure
+            max_relaunches: Maximum relaunches after quick failures
+            backoff: Delay before the first relaunch in seconds (doubled on each further relaunch)
+            poll_interval: Seconds between process/connection checks
+            connection_check: Callable(host, port, pid) -> bool (default: has_established_connection)
+        """
+        self.connect_timeout = connect_timeout
+        self.quick_fail_seconds = quick_fail_seconds
+        self.max_relaunches = max_relaunches
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self.connection_check = connection_check or has_established_connection
+
+    def supervise(self, connector, result: LaunchResult, on_status: Optional[Callable[[str], None]] = None,
+                  cancel: Optional[threading.Event] = None,
+                  launch_slots: Optional[threading.Semaphore] = None) -> LaunchResult:
+        """
+        Launch the client and follow it until connected, exited or timed out
+
+        Args:
+            connector: MSTSCConnector to launch
+            result: Result object to fill in (status, attempts, connect_seconds, exit_code)
+            on_status: Callback called with each new status
+            cancel: Optional event that stops supervision (and relaunches) when set
+            launch_slots: Optional semaphore held only while a client process is being started
+
+        Returns:
+            The updated result
+        """
+        def set_status(status: str):
+            result.status = status
+            if status in ("connected", "unconfirmed", "exited"):
+                LAUNCHES.inc(result=status)
+            if on_status:
+                on_status(status)
+
+        delay = self.backoff
+        while True:
+            result.attempts += 1
+            if launch_slots is not None:
+                with launch_slots:
+                    result.process = connector.connect()
+            else:
+                result.process = connector.connect()
+            launched_at = time.monotonic()
+            set_status("launched")
+
+            exit_code = None
+            while time.monotonic() - launched_at < self.connect_timeout:
+                if cancel and cancel.is_set():
+                    result.error = "cancelled"
+                    set_status("unconfirmed")
+                    return result
+                exit_code = result.process.poll()
+                if exit_code is not None:
+                    break
+                if self.connection_check(connector.host, connector.port, result.process.pid):
+                    result.connect_seconds = time.monotonic() - launched_at
+                    LAUNCH_CONNECT_SECONDS.observe(result.connect_seconds)
+                    set_status("connected")
+                    return result
+                time.sleep(self.poll_interval)
+            else:
+                result.error = f"Connection not confirmed within {self.connect_timeout:.0f} seconds"
+                set_status("unconfirmed")
+                return result
+
+            result.exit_code = exit_code
+            lifetime = time.monotonic() - launched_at
+            result.error = f"Client exited with code {exit_code} after {lifetime:.1f} seconds"
+            if lifetime >= self.quick_fail_seconds or result.attempts > self.max_relaunches:
+                set_status("exited")
+                return result
+            set_status("relaunching")
+            if cancel:
+                if cancel.wait(delay):
+                    set_status("exited")
+                    return result
+            else:
+                time.sleep(delay)
+            delay *= 2
+
+
+class SessionLauncher:
+    """Launch Remote Desktop clients for several targets in parallel"""
+
+    def __init__(self, max_concurrent: int = 4, ready_timeout: float = 60.0, poll_interval: float = 1.0,
+                 ready_check: Optional[Callable] = None, supervisor: Optional[ClientSupervisor] = None,
+                 on_status: Optional[Callable[[LaunchResult], None]] = None):
+        """
+        Args:
+            max_concurrent: Maximum number of clients being started at the same time
+            ready_timeout: Seconds to wait for each target's RDP port
+            poll_interval: Seconds between readiness checks
+            ready_check: Callable(connector, timeout, cancel) -> seconds waited or None
+                (default: TCP check on the connector's host:port)
+            supervisor: Client supervisor (default: ClientSupervisor())
+            on_status: Callback called whenever a job changes status
+        """
+        self.max_concurrent = max_concurrent
+        self.ready_timeout = ready_timeout
+        self.poll_interval = poll_interval
+        self.ready_check = ready_check or self._wait_for_rdp_port
+        self.supervisor = supervisor or ClientSupervisor()
+        self.on_status = on_status
+        self.cancel_event = threading.Event()
+        self._launch_slots = threading.BoundedSemaphore(max_concurrent)
+
+    def _wait_for_rdp_port(self, connector, timeout: float, cancel: threading.Event) -> Optional[float]:
+        endpoints = getattr(connector, "endpoints", None)
+        if not endpoints or len(endpoints) == 1:
+            return wait_for_port(connector.host, connector.port, timeout=timeout,
+                                 interval=self.poll_interval, cancel=cancel)
+        # Several endpoints: the first one to answer is the one the client connects to
+        ready = wait_for_any_port(endpoints, timeout=timeout, interval=self.poll_interval, cancel=cancel)
+        if ready is None:
+            return None
+        connector.select_endpoint()
+        return ready[1]
+
+    def _set_status(self, result: LaunchResult, status: str):
+        result.status = status
+        if self.on_status:
+            self.on_status(result)
+
+    def _launch_client(self, job: LaunchJob, result: LaunchResult):
+        """Start and supervise the client process (a launch slot is held only while the process starts)"""
+        self.supervisor.supervise(job.connector, result, on_status=lambda status: self._set_status(result, status),
+                                  cancel=self.cancel_event, launch_slots=self._launch_slots)
+
+    def _run_job(self, job: LaunchJob) -> LaunchResult:
+        result = LaunchResult(job.name)
+        start = time.monotonic()
+        try:
+            if job.wake:
+                self._set_status(result, "waking")
+                job.wake()
+            self._set_status(result, "waiting")
+            waited = self.ready_check(job.connector, self.ready_timeout, self.cancel_event)
+            if waited is None:
+                if self.cancel_event.is_set():
+                    result.error = "cancelled"
+                else:
+                    result.error = f"RDP port not reachable after {self.ready_timeout:.0f} seconds"
+                    WAKE_TIMEOUTS.inc(phase="rdp")
+                self._set_status(result, "not_ready")
+                return result
+            result.ready_seconds = waited
+            if job.wake:
+                RDP_READY_SECONDS.observe(waited)
+            self._launch_client(job, result)
+        except Exception as e:
+            result.error = str(e)
+            self._set_status(result, "failed")
+        finally:
+            result.total_seconds = time.monotonic() - start
+        return result
+
+    def launch_all(self, jobs: List[LaunchJob]) -> List[LaunchResult]:
+        """
+        Wake, wait for and launch every job independently
+
+        Args:
+            jobs: Targets to launch
+
+        Returns:
+            Results in completion order
+        """
+        results = []
+        if not jobs:
+            return results
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="launch") as executor:
+            futures = [executor.submit(self._run_job, job) for job in jobs]
+            for future in as_completed(futures):
+                results.append(future.result())
+        return results
+
+    def cancel(self):
+        """Stop waiting for targets that are not ready yet"""
+        self.cancel_event.set()
+
+
+def format_launch_report(results: List[LaunchResult]) -> str:
+    """
+    Format launch results as a text table
+
+    Args:
+        results: Results from SessionLauncher.launch_all
+
+    Returns:
+        Report text
+    """
+    def seconds(value):
+        return f"{value:.1f}" if value is not None else "-"
+
+    lines = [f"{'Target':<16} {'Status':<12} {'Ready(s)':>8} {'Connect(s)':>10} {'Total(s)':>8} {'Tries':>5}  Error"]
+    for r in results:
+        lines.append(f"{r.name:<16} {r.status:<12} {seconds(r.ready_seconds):>8} {seconds(r.connect_seconds):>10} "
+                     f"{seconds(r.total_seconds):>8} {r.attempts:>5}  {r.error or ''}")
+    return '\n'.join(lines)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Target state cache module
+Small JSON state file with TTL, shared between processes
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from bootstrap import app_dir
+
+
+DEFAULT_STATE_FILE = "target_state.json"
+DEFAULT_TTL = 30.0  # seconds
+
+
+class StateCache:
+    """Per-target state entries with timestamps, persisted to a JSON file"""
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            path: State file (default: target_state.json next to this module)
+            ttl: Default maximum age in seconds for get()
+        """
+        self.path = Path(path) if path else app_dir() / DEFAULT_STATE_FILE
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, data: dict):
+        # Atomic replace so other processes never read a half-written file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".target_state_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get(self, name: str, max_age: Optional[float] = None) -> Optional[dict]:
+        """
+        Get a target's state if it is fresh enough
+
+        Args:
+            name: Target name
+            max_age: Maximum age in seconds (default: the cache TTL)
+
+        Returns:
+            State dict (with "updated" epoch seconds and "age"), or None if missing/stale
+        """
+        entry = self._read().get(name)
+        if not entry:
+            return None
+        age = time.time() - entry.get("updated", 0)
+        if age > (self.ttl if max_age is None else max_age):
+            return None
+        return dict(entry, age=age)
+
+    def put(self, name: str, **fields) -> dict:
+        """
+        Merge fields into a target's state and stamp it with the current time
+
+        Args:
+            name: Target name
+            **fields: State fields (JSON serializable)
+
+        Returns:
+            Updated state entry
+        """
+        with self._lock:
+            data = self._read()
+            entry = data.get(name, {})
+            entry.update(fields)
+            entry["updated"] = time.time()
+            data[name] = entry
+            self._write(data)
+            return entry
+
+    def invalidate(self, name: str):
+        """Forget a target's state"""
+        with self._lock:
+            data = self._read()
+            if data.pop(name, None) is not None:
+                self._write(data)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test asyncio router client against a local fake router
+"""
+
+import asyncio
+import json
+import sys
+
+from async_iptime_wol import AsyncIPTimeWOL
+from rate_limiter import TokenBucket
+
+
+class FakeRouterServer:
+    """Minimal keep-alive HTTP server speaking the router's JSON API"""
+
+    def __init__(self, delay=0.0, drop_after=None):
+        self.delay = delay
+        self.drop_after = drop_after  # Requests per connection before the next one is dropped unanswered
+        self.connections = 0
+        self.methods = []
+        self.server = None
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        served = 0
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode().partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = json.loads(await reader.readexactly(int(headers["content-length"])))
+                if self.drop_after is not None and served >= self.drop_after:
+                    break
+                served += 1
+                self.methods.append((body["method"], headers.get("cookie")))
+                await asyncio.sleep(self.delay)
+                extra = ""
+                if body["method"] == "session/login":
+                    result = {"result": "success"}
+                    extra = "Set-Cookie: efm_session_id=s3ss10n; Path=/\r\n"
+                elif body["method"] == "wol/signal":
+                    result = {"result": "success"}
+                else:
+                    result = {"result": [{"type": "lan", "port": 4, "link": "1000f"}]}
+                payload = json.dumps(result).encode()
+                writer.write(f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n{extra}"
+                             f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def test_keep_alive_and_cookies():
+    async def scenario():
+        fake = FakeRouterServer()
+        port = await fake.start()
+        async with AsyncIPTimeWOL(f"http://127.0.0.1:{port}", "admin", "pw",
+                                  rate_limiter=TokenBucket(1000, 100), max_connections=1) as router:
+            await router.send_wol_packet("10:FF:E0:38:F4:D5")
+            results = await asyncio.gather(*[router.is_lan_port_up(4) for _ in range(20)])
+        await fake.stop()
+        return fake, router, results
+
+    fake, router, results = asyncio.run(scenario())
+    assert all(results)
+    assert router.session_id == "s3ss10n"
+    assert fake.connections == 1 and router.connections_opened == 1
+    assert len(fake.methods) == 22
+    assert fake.methods[1] == ("wol/signal", "efm_session_id=s3ss10n")
+
+
+def test_stale_keep_alive_connection_is_retried():
+    async def scenario():
+        fake = FakeRouterServer(drop_after=1)
+        port = await fake.start()
+        async with AsyncIPTimeWOL(f"http://127.0.0.1:{port}", "admin", "pw",
+                                  rate_limiter=TokenBucket(1000, 100), max_connections=1) as router:
+            await router.login()
+            links = await router.get_port_link_status()
+        await fake.stop()
+        return fake, router, links
+
+    fake, router, links = asyncio.run(scenario())
+    assert links == [{"type": "lan", "port": 4, "link": "1000f"}]
+    assert fake.connections == 2 and router.connections_opened == 2
+    assert [m for m, _ in fake.methods] == ["session/login", "port/link/status"]
+
+
+def test_deadline_and_cancellation():
+    async def scenario():
+        fake = FakeRouterServer(delay=1.0)
+        port = await fake.start()
+        router = AsyncIPTimeWOL(f"http://127.0.0.1:{port}", "admin", "pw", timeout=0.2,
+                                rate_limiter=TokenBucket(1000, 100))
+        try:
+            await router.get_port_link_status()
+            timed_out = False
+        except Exception as e:
+            timed_out = "timed out" in str(e)
+
+        router.timeout = 5
+        task = asyncio.create_task(router.get_port_link_status())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+            cancelled = False
+        except asyncio.CancelledError:
+            cancelled = True
+        await router.close()
+        await fake.stop()
+        return timed_out, cancelled, router
+
+    timed_out, cancelled, router = asyncio.run(scenario())
+    assert timed_out and cancelled
+    assert router._idle == []
+
+
+if __name__ == "__main__":
+    test_keep_alive_and_cookies()
+    test_stale_keep_alive_connection_is_retried()
+    test_deadline_and_cancellation()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the install marker, cold start log and zipapp build
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from bootstrap import (STARTUP_ONLY_ENV, MARKER_FILE, ensure_dependencies, format_startup_report,
+                       load_startup_records, marker_content, process_start_time, record_startup, requirements)
+from build_zipapp import build, program_modules
+
+
+def test_marker_installs_once():
+    base = Path(tempfile.mkdtemp())
+    installs = []
+
+    def installer(lines):
+        installs.append(lines)
+        return 0
+
+    assert ensure_dependencies(base, installer)
+    assert ensure_dependencies(base, installer)
+    assert len(installs) == 1 and "requests>=2.31.0" in installs[0]
+    assert (base / MARKER_FILE).read_text(encoding="utf-8") == marker_content(requirements())
+
+    # Stale marker (other requirements) reinstalls; a failed install writes no marker
+    (base / MARKER_FILE).write_text("old\n", encoding="utf-8")
+    assert not ensure_dependencies(base, lambda lines: 1)
+    assert (base / MARKER_FILE).read_text(encoding="utf-8") == "old\n"
+
+
+def test_startup_log():
+    base = Path(tempfile.mkdtemp())
+    for seconds in (0.3, 0.2, 0.4):
+        record_startup(seconds, base)
+    records = load_startup_records(base)
+    assert [r["seconds"] for r in records] == [0.3, 0.2, 0.4]
+    assert records[0]["mode"] == "source"
+    report = format_startup_report(records)
+    assert "source" in report and "300ms" in report and "zipapp" not in report
+    start = process_start_time()
+    assert start is None or 0 < start <= time.time()
+
+
+def test_zipapp_build_and_start():
+    base = Path(tempfile.mkdtemp())
+    archive = build(base / "wol_mstsc.pyz")
+    names = set(zipfile.ZipFile(archive).namelist())
+    assert {"__main__.py", "requirements.txt"} <= names
+    for module in program_modules():
+        assert module.stem + ".pyc" in names
+    assert not any(n.startswith("test_") for n in names)
+
+    (base / MARKER_FILE).write_text(marker_content(requirements()), encoding="utf-8")
+    env = dict(os.environ, **{STARTUP_ONLY_ENV: "1"})
+    subprocess.run([sys.executable, str(archive)], env=env, check=True, cwd=base)
+    records = load_startup_records(base)
+    assert len(records) == 1 and records[0]["mode"] == "zipapp"
+
+
+if __name__ == "__main__":
+    test_marker_installs_once()
+    test_startup_log()
+    test_zipapp_build_and_start()
+    print("✅ All tests passed!")
+    sys.exit(0)
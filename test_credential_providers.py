@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test master password providers and per-process caching
+"""
+
+import os
+import sys
+
+import crypto_utils
+from credential_providers import (CredentialChain, EnvProvider, KeyringProvider, NullProvider,
+                                  PASSWORD_ENV_VAR, PASSWORD_FD_ENV_VAR)
+
+
+class MemoryKeyring:
+    """In-memory keyring backend that counts lookups"""
+
+    def __init__(self):
+        self.store = {}
+        self.gets = 0
+
+    def get_password(self, service, account):
+        self.gets += 1
+        return self.store.get((service, account))
+
+    def set_password(self, service, account, password):
+        self.store[(service, account)] = password
+
+    def delete_password(self, service, account):
+        del self.store[(service, account)]
+
+
+def test_keyring_looked_up_once():
+    backend = MemoryKeyring()
+    crypto_utils.set_keyring_backend(backend)
+    try:
+        chain = CredentialChain([NullProvider(), KeyringProvider()])
+        assert chain.lookup() == (None, None)
+        keyring_provider = chain.provider("keyring")
+        assert keyring_provider.get() is None
+        assert backend.gets == 1
+
+        assert keyring_provider.store("secret")
+        password, provider = chain.lookup()
+        assert password == "secret" and provider.name == "keyring"
+        assert backend.gets == 1
+        assert set(chain.timings()) == {"null", "keyring"}
+
+        assert keyring_provider.delete()
+        assert chain.lookup() == (None, None)
+
+        crypto_utils.set_keyring_backend(None)
+        assert not crypto_utils.is_keyring_available()
+        assert not KeyringProvider().available()
+    finally:
+        crypto_utils.set_keyring_backend(crypto_utils._UNLOADED)
+
+
+def test_failed_delete_keeps_the_cached_password():
+    class LockedKeyring(MemoryKeyring):
+        def delete_password(self, service, account):
+            raise RuntimeError("access denied")
+
+    backend = LockedKeyring()
+    crypto_utils.set_keyring_backend(backend)
+    try:
+        keyring_provider = CredentialChain([KeyringProvider()]).provider("keyring")
+        assert keyring_provider.store("secret")
+        assert not keyring_provider.delete()
+        assert keyring_provider.get() == "secret"
+    finally:
+        crypto_utils.set_keyring_backend(crypto_utils._UNLOADED)
+
+
+def test_env_and_fd():
+    saved = {k: os.environ.pop(k, None) for k in (PASSWORD_ENV_VAR, PASSWORD_FD_ENV_VAR)}
+    try:
+        assert not EnvProvider().available()
+        os.environ[PASSWORD_ENV_VAR] = "from-env"
+        assert EnvProvider().get() == "from-env"
+        del os.environ[PASSWORD_ENV_VAR]
+
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"from-fd\n")
+        os.close(write_fd)
+        os.environ[PASSWORD_FD_ENV_VAR] = str(read_fd)
+        assert CredentialChain([EnvProvider()]).lookup()[0] == "from-fd"
+    finally:
+        for k, v in saved.items():
+            os.environ.pop(k, None)
+            if v is not None:
+                os.environ[k] = v
+
+
+if __name__ == "__main__":
+    test_keyring_looked_up_once()
+    test_failed_delete_keeps_the_cached_password()
+    test_env_and_fd()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test concurrent fleet status sweep and TTL cache
+"""
+
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from fleet_status import precheck_target, record_connected, status_sweep
+from state_cache import StateCache
+
+
+class FakeRouter:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.status_calls = 0
+
+    def login(self):
+        return True
+
+    def get_port_link_status(self):
+        self.status_calls += 1
+        time.sleep(self.delay)
+        return [{"type": "lan", "port": 1, "link": "1000f"}, {"type": "lan", "port": 2, "link": ""}]
+
+
+def _targets(rdp_port):
+    return [
+        {"name": "up", "router": {"url": "http://r1"}, "wol": {"mac_address": "m1", "lan_port": 1},
+         "rdp": {"server": f"127.0.0.1:{rdp_port}"}},
+        {"name": "down", "router": {"url": "http://r1"}, "wol": {"mac_address": "m2", "lan_port": 2},
+         "rdp": {"server": "127.0.0.1:1"}},
+    ]
+
+
+def test_sweep_uses_one_status_call_per_router_and_caches():
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    router = FakeRouter()
+    credentials = {"up": {"router_id": "admin", "router_pw": "pw"}, "down": {"router_id": "admin", "router_pw": "pw"}}
+    cache = StateCache(Path(tempfile.mkdtemp()) / "state.json", ttl=30)
+
+    results = {r.name: r for r in status_sweep(_targets(server.getsockname()[1]), credentials, deadline=3,
+                                               cache=cache, client_factory=lambda t, c: router)}
+    assert router.status_calls == 1
+    assert results["up"].link_up and results["up"].rdp_open and results["up"].is_up
+    assert results["down"].link_up is False and results["down"].rdp_open is False
+
+    # A second sweep within the TTL is answered from the cache file
+    again = {r.name: r for r in status_sweep(_targets(server.getsockname()[1]), credentials, deadline=3,
+                                             cache=cache, max_age=30, client_factory=lambda t, c: router)}
+    assert router.status_calls == 1
+    assert again["up"].cached_age is not None and again["up"].is_up
+    server.close()
+
+
+def test_second_sweep_within_ttl_makes_no_network_call():
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    targets = _targets(server.getsockname()[1])
+    router = FakeRouter()
+    logins = []
+    credentials = {"up": {"router_id": "admin", "router_pw": "pw"}, "down": {"router_id": "admin", "router_pw": "pw"}}
+    cache = StateCache(Path(tempfile.mkdtemp()) / "state.json", ttl=30)
+
+    def factory(target, cred):
+        logins.append(target["name"])
+        return router
+
+    status_sweep(targets, credentials, deadline=3, cache=cache, client_factory=factory)
+    assert len(logins) == 1
+    # Closed port: a probe would now report the target down
+    server.close()
+    again = {r.name: r for r in status_sweep(targets, credentials, deadline=3, cache=cache, client_factory=factory)}
+    assert len(logins) == 1 and router.status_calls == 1
+    assert again["up"].rdp_open and again["up"].cached_age is not None
+    assert again["down"].cached_age is not None
+
+
+def test_sweep_respects_deadline():
+    router = FakeRouter(delay=2.0)
+    credentials = {"up": {"router_id": "admin", "router_pw": "pw"}, "down": {"router_id": "admin", "router_pw": "pw"}}
+    start = time.monotonic()
+    results = status_sweep(_targets(1), credentials, deadline=0.5, client_factory=lambda t, c: router)
+    assert time.monotonic() - start < 1.5
+    assert {r.error for r in results} == {"timeout"}
+    # Workers still stuck in the router call do not keep the process alive
+    assert all(t.daemon for t in threading.enumerate() if t.name.startswith("status"))
+
+
+def test_errors_are_labelled_by_task():
+    class BrokenRouter(FakeRouter):
+        def get_port_link_status(self):
+            raise Exception("session expired")
+
+    targets = _targets(1)
+    targets[1]["rdp"] = {}  # No RDP server configured: the RDP check fails
+    credentials = {"up": {"router_id": "admin", "router_pw": "pw"}, "down": {"router_id": "admin", "router_pw": "pw"}}
+    results = {r.name: r for r in status_sweep(targets, credentials, deadline=2,
+                                               client_factory=lambda t, c: BrokenRouter())}
+    assert results["up"].error == "router: session expired"
+    assert "router: session expired" in results["down"].error and "rdp: " in results["down"].error
+
+
+def test_precheck_reconnect_path():
+    """Reachable RDP port skips the wake; a fresh down entry skips the probe"""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    target = _targets(server.getsockname()[1])[0]
+    path = Path(tempfile.mkdtemp()) / "state.json"
+    cache = StateCache(path, ttl=30)
+
+    start = time.monotonic()
+    status = precheck_target(target, cache)
+    assert status is not None and status.rdp_open
+    assert time.monotonic() - start < 0.5
+    # Shared with other processes through the state file
+    assert StateCache(path).get("up")["status"]["rdp_open"] is True
+
+    # A fresh "up" entry is trusted without a probe
+    server.close()
+    cached = precheck_target(target, cache)
+    assert cached is not None and cached.cached_age is not None
+    cache.invalidate("up")
+    assert precheck_target(target, cache) is None
+    assert StateCache(path).get("up")["status"]["rdp_open"] is False
+    record_connected(target, cache)
+    assert cache.get("up")["status"]["rdp_open"] is True
+
+
+if __name__ == "__main__":
+    test_sweep_uses_one_status_call_per_router_and_caches()
+    test_second_sweep_within_ttl_makes_no_network_call()
+    test_sweep_respects_deadline()
+    test_errors_are_labelled_by_task()
+    test_precheck_reconnect_path()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test shared router connection pools
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_pool import get_adapter, pool_stats, reset_pools
+from iptime_wol import IPTimeWOL
+from rate_limiter import TokenBucket
+
+
+class RouterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"result": [{"type": "lan", "port": 1, "link": "1000f"}]
+                           if request["method"] == "port/link/status" else "success"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if request["method"] == "session/login":
+            self.send_header("Set-Cookie", f"efm_session_id=s{threading.get_ident()}; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_clients_share_connections():
+    """Fresh clients for the same router reuse one keep-alive connection"""
+    reset_pools()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RouterHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for _ in range(3):
+            client = IPTimeWOL(url, "admin", "pw", rate_limiter=TokenBucket(1000, 1000), verbose=False)
+            client.send_wol_packet("1F:2F:3F:4F:5F:6F")
+            assert client.is_lan_port_up(1)
+            assert client.session_id is not None
+        stats = pool_stats()[url.lower()]
+        assert stats == {"requests": 9, "connections": 1, "reused": 8}, stats
+        assert get_adapter(url + "/") is get_adapter(url)
+    finally:
+        server.shutdown()
+        server.server_close()
+        reset_pools()
+
+
+if __name__ == "__main__":
+    test_clients_share_connections()
+    print("✅ All tests passed!")
+    sys.exit(0)
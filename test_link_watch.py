@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test port link watch mode (change events and ring buffer history)
+"""
+
+import sys
+
+from link_watch import LinkHistory, LinkWatcher, encode_link, decode_link
+
+
+class ScriptedRouter:
+    """Returns a scripted sequence of port/link/status results"""
+
+    def __init__(self, snapshots):
+        self.snapshots = list(snapshots)
+        self.logins = 0
+
+    def login(self):
+        self.logins += 1
+
+    def get_port_link_status(self):
+        snapshot = self.snapshots.pop(0)
+        if isinstance(snapshot, Exception):
+            raise snapshot
+        return [{"type": "lan", "port": port, "link": link} for port, link in snapshot.items()]
+
+
+def test_encode_decode():
+    assert encode_link("1000f") == 1000
+    assert encode_link("100h") == -100
+    assert encode_link("") == 0
+    assert decode_link(encode_link("100f")) == "100f"
+
+
+def test_ring_buffer_keeps_last_samples():
+    history = LinkHistory(capacity=3)
+    for i in range(5):
+        history.append(float(i), i * 10)
+    assert len(history) == 3
+    assert history.items() == [(2.0, 20), (3.0, 30), (4.0, 40)]
+    assert history.last() == (4.0, 40)
+
+
+def test_watcher_emits_only_changes():
+    router = ScriptedRouter([
+        {1: "", 4: "1000f"},
+        {1: "", 4: "1000f"},
+        {1: "1000f", 4: "100f"},
+        Exception("session expired"),
+        {1: "1000f", 4: ""},
+    ])
+    events = []
+    ticks = iter(range(100))
+    watcher = LinkWatcher({"r1": router}, on_event=events.append, port_names={("r1", "lan", 1): "office"},
+                          clock=lambda: float(next(ticks)))
+    for _ in range(5):
+        watcher.poll_once("r1")
+
+    kinds = [(e["event"], e.get("port")) for e in events]
+    assert kinds == [("up", 1), ("speed", 4), ("error", None), ("down", 4)]
+    assert events[0]["target"] == "office"
+    assert events[1]["from"] == "1000f" and events[1]["to"] == "100f"
+    assert router.logins == 1
+    assert [code for _, code in watcher.history[("r1", "lan", 4)].items()] == [1000, 100, 0]
+
+
+def test_empty_result_keeps_the_baseline():
+    router = ScriptedRouter([
+        {1: "1000f", 2: "100f", 3: "1000f"},
+        {},
+        {1: "1000f", 2: "100f"},
+    ])
+    events = []
+    watcher = LinkWatcher({"r1": router}, on_event=events.append, clock=lambda: 0.0)
+    for _ in range(3):
+        watcher.poll_once("r1")
+
+    # No false "up" for ports 1 and 2; port 3 dropped out of the result and is down
+    assert [(e["event"], e.get("port")) for e in events] == [("error", None), ("down", 3)]
+    assert router.logins == 1
+
+
+if __name__ == "__main__":
+    test_encode_decode()
+    test_ring_buffer_keeps_last_samples()
+    test_watcher_emits_only_changes()
+    test_empty_result_keeps_the_baseline()
+    print("✅ All tests passed!")
+    sys.exit(0)
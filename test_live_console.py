@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the live wake console
+"""
+
+import io
+import sys
+import time
+
+from live_console import KeyReader, LiveWait
+from router_drivers import FakeRouterDriver
+
+CRED = {"router_id": "admin", "router_pw": "pw"}
+
+
+class ScriptedKeys(KeyReader):
+    """Key reader that plays back keys, one per read"""
+
+    def __init__(self, keys):
+        super().__init__(io.StringIO())
+        self.keys = list(keys)
+
+    def read_key(self, timeout):
+        time.sleep(timeout)
+        return self.keys.pop(0) if self.keys else None
+
+
+def _target(boot_polls):
+    return {"name": "pc", "rdp": {"server": "127.0.0.1:1"},
+            "router": {"type": "fake", "url": "fake://live", "boot_polls": boot_polls,
+                       "ports": {"AA:00:00:00:00:01": 1}},
+            "wol": {"mac_address": "AA:00:00:00:00:01", "lan_port": 1, "path": "router", "retry": False}}
+
+
+def test_ready_without_keys():
+    FakeRouterDriver.reset()
+    result, action = LiveWait(_target(0), CRED, ready_timeout=5, keys=ScriptedKeys([]), out=io.StringIO(),
+                              refresh=0.01).run()
+    assert action == "ready" and result.status == "ready"
+
+
+def test_resend_then_connect_now():
+    FakeRouterDriver.reset()
+    out = io.StringIO()
+    live = LiveWait(_target(100000), CRED, ready_timeout=30, keys=ScriptedKeys([None, "w", None, None, "c"]),
+                    out=out, refresh=0.05)
+    start = time.monotonic()
+    result, action = live.run()
+    assert action == "connect" and result.status == "cancelled"
+    assert time.monotonic() - start < 5
+    assert live.manual_sends == 1 and live.driver.calls.count("wol/signal") == 2
+    assert "WOL x2" in out.getvalue()
+    assert out.getvalue().count("[a] abort") == 1
+    assert all(len(line) < 80 for line in out.getvalue().replace("\r", "\n").splitlines())
+
+
+def test_abort_and_switch():
+    for key, expected in (("a", "abort"), ("s", "switch")):
+        FakeRouterDriver.reset()
+        live = LiveWait(_target(100000), CRED, keys=ScriptedKeys([key]), out=io.StringIO(), refresh=0.01)
+        result, action = live.run()
+        assert action == expected and result.status == "cancelled"
+    assert not KeyReader(io.StringIO()).interactive
+
+
+def test_abort_does_not_wait_for_a_stuck_wake():
+    def stuck_wake(target, cred, **kwargs):
+        time.sleep(5)  # e.g. a router request that ignores the cancel event
+
+    live = LiveWait(_target(0), CRED, keys=ScriptedKeys(["a"]), out=io.StringIO(), refresh=0.01,
+                    driver=FakeRouterDriver(_target(0)["router"], CRED), wake_func=stuck_wake)
+    start = time.monotonic()
+    result, action = live.run()
+    assert action == "abort" and result.status == "cancelled"
+    assert time.monotonic() - start < 3
+
+
+if __name__ == "__main__":
+    test_ready_without_keys()
+    test_resend_then_connect_now()
+    test_abort_and_switch()
+    test_abort_does_not_wait_for_a_stuck_wake()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test direct magic packets and wake path selection
+"""
+
+import ipaddress
+import socket
+import sys
+
+from magic_packet import build_magic_packet, choose_wake_path, send_magic_packet, target_subnet
+from router_drivers import FakeRouterDriver, create_driver
+from wake_engine import wake_target
+from wol_api import wake
+
+MAC = "1F:2F:3F:4F:5F:6F"
+
+
+def _listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(2)
+    return sock
+
+
+def _target(path, udp_port, router_url="fake://lan"):
+    return {"name": "pc", "rdp": {"server": "192.168.0.10"},
+            "router": {"type": "fake", "url": router_url, "ports": {MAC: 1}},
+            "wol": {"mac_address": MAC, "lan_port": 1, "path": path, "broadcast": "127.0.0.1",
+                    "udp_port": udp_port, "repeats": 2}}
+
+
+def test_magic_packet_format():
+    packet = build_magic_packet("1f-2f-3f-4f-5f-6f")
+    assert len(packet) == 102
+    assert packet[:6] == b'\xff' * 6 and packet[6:12] == bytes.fromhex("1F2F3F4F5F6F")
+    try:
+        build_magic_packet("not-a-mac")
+        assert False, "invalid MAC accepted"
+    except ValueError:
+        pass
+
+
+def test_send_to_local_listener():
+    """Repeats arrive as separate datagrams"""
+    with _listener() as sock:
+        send_magic_packet(MAC, broadcast="127.0.0.1", port=sock.getsockname()[1], repeats=3, interval=0)
+        packets = [sock.recvfrom(1024)[0] for _ in range(3)]
+    assert packets == [build_magic_packet(MAC)] * 3
+
+
+def test_path_selection():
+    # A private RDP address is not a subnet: 192.168.0.0/24 exists at every IPTIME site
+    assert target_subnet({"rdp": {"server": "192.168.0.10:3389"}}) is None
+    assert choose_wake_path({"rdp": {"server": "192.168.0.10"}, "wol": {}}) == "router"
+    assert target_subnet({"wol": {"subnet": "192.168.7.0/24"}}) == ipaddress.ip_network("192.168.7.0/24")
+    assert choose_wake_path({"rdp": {"server": "x"}, "wol": {"subnet": "127.0.0.0/8"}}) == "direct"
+    assert choose_wake_path({"rdp": {"server": "x"}, "wol": {"subnet": "203.0.113.0/24"}}) == "router"
+    assert choose_wake_path({"rdp": {"server": "example.com:13389"}, "wol": {}}) == "router"
+    assert choose_wake_path({"rdp": {"server": "example.com"}, "wol": {"path": "race"}}) == "race"
+
+
+def test_wake_paths():
+    """Direct skips the router, race succeeds even when one path fails"""
+    FakeRouterDriver.reset()
+    with _listener() as sock:
+        port = sock.getsockname()[1]
+        target = _target("direct", port)
+        driver = create_driver(target["router"], {})
+        assert wake_target(target, driver) == "direct"
+        assert sock.recvfrom(1024)[0] == build_magic_packet(MAC)
+        assert driver.calls == []
+
+        broken = dict(_target("race", port), wol=dict(target["wol"], path="race", broadcast="invalid host"))
+        assert wake_target(broken, driver) == "router"
+        assert driver.calls == ["session/login", "wol/signal"]
+
+        # Both paths work: the race reports the router, whose answer confirms the WOL
+        assert wake_target(_target("race", port), driver) == "router"
+        assert sock.recvfrom(1024)[0] == build_magic_packet(MAC)
+
+
+def test_unconfirmed_direct_falls_back_to_router():
+    """The machine never hears the LAN broadcast; the re-send goes through the router"""
+    FakeRouterDriver.reset()
+    with _listener() as sock:
+        target = _target("direct", sock.getsockname()[1], router_url="fake://fallback")
+        target["wol"]["retry"] = {"window": 0.5}
+        target["rdp"] = {"server": "127.0.0.1:1"}
+        driver = create_driver(target["router"], {})
+        result = wake(target, {}, ready_timeout=10, poll_interval=0.05, driver=driver)
+    assert result.status == "ready" and result.path == "direct" and result.sends == 2
+    assert driver.calls.count("wol/signal") == 1
+
+
+if __name__ == "__main__":
+    test_magic_packet_format()
+    test_send_to_local_listener()
+    test_path_selection()
+    test_wake_paths()
+    test_unconfirmed_direct_falls_back_to_router()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test metrics registry and Prometheus text exposition
+"""
+
+import sys
+import tempfile
+import urllib.request
+from pathlib import Path
+
+from metrics import Counter, Histogram, Registry, start_http_server, write_metrics_file
+
+
+def _registry():
+    registry = Registry()
+    latency = registry.register(Histogram("router_seconds", "Router latency", (0.1, 1.0), ["method"]))
+    failures = registry.register(Counter("failures_total", "Failures", ["reason"]))
+    latency.observe(0.05, method="wol/signal")
+    latency.observe(0.5, method="wol/signal")
+    latency.observe(3.0, method="wol/signal")
+    failures.inc(reason="timeout")
+    failures.inc(2, reason="timeout")
+    return registry
+
+
+def test_prometheus_text_format():
+    text = _registry().render()
+    assert "# TYPE router_seconds histogram" in text
+    assert 'router_seconds_bucket{method="wol/signal",le="0.1"} 1' in text
+    assert 'router_seconds_bucket{method="wol/signal",le="1"} 2' in text
+    assert 'router_seconds_bucket{method="wol/signal",le="+Inf"} 3' in text
+    assert 'router_seconds_count{method="wol/signal"} 3' in text
+    assert 'router_seconds_sum{method="wol/signal"} 3.55' in text
+    assert 'failures_total{reason="timeout"} 3' in text
+
+
+def test_file_and_http_export():
+    registry = _registry()
+    path = Path(tempfile.mkdtemp()) / "wol.prom"
+    write_metrics_file(path, registry)
+    assert path.read_text(encoding='utf-8') == registry.render()
+
+    server = start_http_server(0, registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.read().decode('utf-8') == registry.render()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_prometheus_text_format()
+    test_file_and_http_export()
+    print("✅ All tests passed!")
+    sys.exit(0)
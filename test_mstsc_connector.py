@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test RDP file generation (per-target cached files)
+"""
+
+import socket
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from endpoint_race import EndpointMemory, set_endpoint_memory
+from mstsc_connector import RDP_FILES_KEPT, MSTSCConnector, render_rdp_settings
+from rdp_probe import wait_for_any_port
+from rdp_profiles import select_profile
+
+
+def test_render_overrides():
+    """Overrides replace template values and unknown keys are appended"""
+    content = render_rdp_settings({"desktopwidth": 2560, "gatewayhostname": "gw.example.com", "custom": 5})
+    lines = content.split('\n')
+    assert "desktopwidth:i:2560" in lines
+    assert "desktopwidth:i:1920" not in lines
+    assert "gatewayhostname:s:gw.example.com" in lines
+    assert lines[-1] == "custom:i:5"
+
+
+def test_rdp_file_cached_per_target():
+    """Same settings reuse one file, different targets/settings get their own"""
+    with tempfile.TemporaryDirectory() as tmp:
+        a = MSTSCConnector("10.0.0.1:3389", "alice", rdp_dir=Path(tmp))
+        b = MSTSCConnector("10.0.0.2:3389", "alice", rdp_dir=Path(tmp))
+        path_a = a.create_rdp_file()
+        mtime = path_a.stat().st_mtime_ns
+        assert a.create_rdp_file() == path_a
+        assert path_a.stat().st_mtime_ns == mtime
+        assert b.create_rdp_file() != path_a
+
+        a.settings = {"redirectprinters": 1}
+        path_a2 = a.create_rdp_file()
+        assert path_a2 != path_a
+        content = path_a2.read_text(encoding='utf-8')
+        assert "redirectprinters:i:1" in content
+        assert "full address:s:10.0.0.1:3389" in content
+        assert "username:s:alice" in content
+        assert len(list(Path(tmp).glob("*.rdp"))) == 3
+
+
+def test_old_rdp_files_are_pruned():
+    """Writing a new file keeps only the newest files; recent ones are never deleted"""
+    with tempfile.TemporaryDirectory() as tmp:
+        old = time.time() - 3600
+        for i in range(RDP_FILES_KEPT + 10):
+            path = Path(tmp) / f"wol_mstsc_{i:016x}.rdp"
+            path.write_text("old", encoding='utf-8')
+            os.utime(path, (old + i, old + i))
+        recent = Path(tmp) / "wol_mstsc_recent.rdp"
+        recent.write_text("recent", encoding='utf-8')
+
+        new = MSTSCConnector("10.0.0.1:3389", rdp_dir=Path(tmp)).create_rdp_file()
+        remaining = set(Path(tmp).glob("*.rdp"))
+        assert len(remaining) == RDP_FILES_KEPT
+        assert new in remaining and recent in remaining
+        assert Path(tmp) / f"wol_mstsc_{RDP_FILES_KEPT + 9:016x}.rdp" in remaining
+        assert Path(tmp) / f"wol_mstsc_{0:016x}.rdp" not in remaining
+
+
+def test_profile_selection():
+    assert select_profile(None, None) is None
+    assert select_profile(1.0, "1000f") == "lan"
+    assert select_profile(1.0, "100h") == "wan"
+    assert select_profile(20.0, None) == "broadband"
+    assert select_profile(120.0, "1000f") == "wan"
+    assert select_profile(None, "100f") == "broadband"
+    for unknown in ("0", "off", "down", ""):
+        assert select_profile(2.0, unknown) == "lan"
+    assert select_profile(None, "down") is None
+
+
+def test_profile_applied_before_target_settings():
+    rdp_dir = Path(tempfile.mkdtemp())
+    wan = MSTSCConnector("10.0.0.5", settings={"session bpp": 24}, rdp_dir=rdp_dir, profile="wan")
+    content = wan.create_rdp_file().read_text(encoding='utf-8').splitlines()
+    assert "connection type:i:2" in content and "disable themes:i:1" in content
+    assert "networkautodetect:i:0" in content and "bandwidthautodetect:i:0" in content
+    assert "session bpp:i:24" in content
+
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    auto = MSTSCConnector(f"127.0.0.1:{server.getsockname()[1]}", rdp_dir=rdp_dir, profile="auto", link="1000f")
+    content = auto.create_rdp_file().read_text(encoding='utf-8').splitlines()
+    server.close()
+    assert auto.resolved_profile() == "lan" and auto.rtt_ms is not None
+    assert "connection type:i:6" in content
+
+
+def test_fastest_rdp_endpoint_is_used():
+    """Only the reachable endpoint answers, so it wins and is recorded"""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    live = f"127.0.0.1:{server.getsockname()[1]}"
+    memory = EndpointMemory(Path(tempfile.mkdtemp()) / "endpoints.json")
+    set_endpoint_memory(memory)
+    try:
+        assert wait_for_any_port(["127.0.0.1:1", live], timeout=2, interval=0.1)[0] == live
+        connector = MSTSCConnector("127.0.0.1:1", servers=[live], rdp_dir=Path(tempfile.mkdtemp()))
+        assert connector.endpoints == ["127.0.0.1:1", live] and not connector.endpoint_selected
+        assert connector.select_endpoint() is not None
+        assert (connector.host, connector.port) == ("127.0.0.1", server.getsockname()[1])
+        assert f"full address:s:{live}" in connector.create_rdp_file().read_text(encoding='utf-8')
+        assert memory.preferred("rdp:127.0.0.1:1") == live
+    finally:
+        set_endpoint_memory(None)
+        server.close()
+
+
+if __name__ == "__main__":
+    test_render_overrides()
+    test_rdp_file_cached_per_target()
+    test_old_rdp_files_are_pruned()
+    test_profile_selection()
+    test_profile_applied_before_target_settings()
+    test_fastest_rdp_endpoint_is_used()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test LAN port discovery and mapping health checks
+"""
+
+import socket
+import sys
+import tempfile
+from pathlib import Path
+
+from port_discovery import discover_lan_port, mapping_suspect, record_link_check, reset_link_checks
+from router_drivers import FakeRouterDriver
+from state_cache import StateCache
+from wol_api import wake
+
+CRED = {"router_id": "admin", "router_pw": "pw"}
+PORTS = {"AA:00:00:00:00:01": 1, "AA:00:00:00:00:02": 2, "AA:00:00:00:00:03": 3}
+
+
+def _driver(url="fake://discover"):
+    return FakeRouterDriver({"type": "fake", "url": url, "boot_polls": 2, "ports": PORTS}, CRED)
+
+
+def test_discover_single_port():
+    FakeRouterDriver.reset()
+    driver = _driver()
+    driver.state["up"].add(1)  # Another machine already on
+    result = discover_lan_port("pc", driver, "aa:00:00:00:00:03", timeout=5, interval=0.01, settle=0.05)
+    assert result.port == 3 and result.candidates == [3]
+    assert result.error is None and result.seconds is not None
+    assert driver.calls.count("wol/signal") == 1
+
+
+def test_discover_ambiguous_and_nothing():
+    FakeRouterDriver.reset()
+    driver = _driver()
+    driver.send_wol(["AA:00:00:00:00:02"])  # Another machine booting at the same time
+    result = discover_lan_port("pc", driver, "AA:00:00:00:00:03", timeout=5, interval=0.01, settle=0.05)
+    assert result.port is None and result.candidates == [2, 3]
+    assert "several ports" in result.error
+
+    FakeRouterDriver.reset()
+    driver = _driver()
+    driver.state["up"].add(3)  # Already on: its port cannot transition
+    result = discover_lan_port("pc", driver, "AA:00:00:00:00:03", timeout=0.1, interval=0.01)
+    assert result.port is None and result.candidates == []
+    assert "already on" in result.error
+
+
+def test_mismatch_flags_mapping():
+    cache = StateCache(Path(tempfile.mkdtemp()) / "state.json")
+    assert not record_link_check(cache, "pc", correlated=False)
+    assert record_link_check(cache, "pc", correlated=False)
+    assert mapping_suspect(cache, "pc")
+    assert not record_link_check(cache, "pc", correlated=True)
+    assert not mapping_suspect(cache, "pc")
+
+    # Machine comes up on RDP but the configured port (moved cable) stays down
+    FakeRouterDriver.reset()
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(4)
+    target = {"name": "pc", "rdp": {"server": f"127.0.0.1:{server.getsockname()[1]}"},
+              "router": {"type": "fake", "url": "fake://moved", "ports": PORTS},
+              "wol": {"mac_address": "AA:00:00:00:00:03", "lan_port": 9, "path": "router"}}
+    for attempt in range(2):
+        cache.put("pc", status={"rdp_open": False})  # Fresh "down" entry: skip the precheck probe
+        result = wake(target, CRED, ready_timeout=0.1, poll_interval=0.01, cache=cache)
+        assert result.status == "ready" and result.port_mismatch
+    server.close()
+    assert mapping_suspect(cache, "pc")
+    assert cache.get("pc")["status"] == {"rdp_open": False}
+    reset_link_checks(cache, "pc")
+    assert not mapping_suspect(cache, "pc")
+
+
+if __name__ == "__main__":
+    test_discover_single_port()
+    test_discover_ambiguous_and_nothing()
+    test_mismatch_flags_mapping()
+    print("✅ All tests passed!")
+    sys.exit(0)
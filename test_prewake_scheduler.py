@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test pre-wake scheduler (simulated clock)
+"""
+
+import sys
+import threading
+from datetime import datetime
+
+from prewake_scheduler import CronSchedule, PreWakeScheduler, SimulatedClock
+
+
+def _inline(job):
+    job()
+
+
+def test_cron_next_after():
+    """Weekday shift start and step expressions"""
+    weekdays = CronSchedule("30 8 * * 1-5")
+    # 2026-10-16 is a Friday
+    assert weekdays.next_after(datetime(2026, 10, 16, 9, 0)) == datetime(2026, 10, 19, 8, 30)
+    assert weekdays.next_after(datetime(2026, 10, 19, 8, 29, 59)) == datetime(2026, 10, 19, 8, 30)
+    every_15 = CronSchedule("*/15 22-23 * * *")
+    assert every_15.next_after(datetime(2026, 10, 19, 22, 50)) == datetime(2026, 10, 19, 23, 0)
+    assert every_15.next_after(datetime(2026, 10, 19, 23, 45)) == datetime(2026, 10, 20, 22, 0)
+    month_start = CronSchedule("0 0 1 * *")
+    assert month_start.next_after(datetime(2026, 12, 15)) == datetime(2027, 1, 1)
+
+
+def test_prewake_runs_lead_time_before_session():
+    """Pre-wakes run lead_minutes early and record success/failure"""
+    clock = SimulatedClock(datetime(2026, 10, 19, 7, 0))
+    targets = [
+        {"name": "office", "prewake": {"schedule": "0 9 * * *", "lead_minutes": 10}},
+        {"name": "lab", "prewake": {"schedule": ["0 8 * * *"], "lead_minutes": 5}},
+        {"name": "manual"},
+    ]
+    credentials = {"office": {}, "lab": {}, "manual": {}}
+    calls = []
+
+    def fake_wake(target, cred, clk):
+        calls.append((target["name"], clk.now()))
+        clk.sleep(40)
+        if target["name"] == "lab":
+            raise Exception("Router connection failed")
+        return True, 40.0
+
+    scheduler = PreWakeScheduler(targets, credentials, clock=clock, wake_func=fake_wake, start_worker=_inline)
+    scheduler.run(max_runs=3)
+
+    assert calls == [
+        ("lab", datetime(2026, 10, 19, 7, 55)),
+        ("office", datetime(2026, 10, 19, 8, 50)),
+        ("lab", datetime(2026, 10, 20, 7, 55)),
+    ]
+    assert [r["success"] for r in scheduler.history] == [False, True, False]
+    assert scheduler.history[0]["error"] == "Router connection failed"
+    assert scheduler.history[1]["ready_seconds"] == 40.0
+
+
+def test_session_inside_lead_time_is_woken_immediately():
+    """Starting the scheduler 3 minutes before a session still wakes it, once"""
+    clock = SimulatedClock(datetime(2026, 10, 19, 8, 57))
+    targets = [{"name": "office", "prewake": {"schedule": "0 9 * * *", "lead_minutes": 10}}]
+    calls = []
+    scheduler = PreWakeScheduler(targets, {"office": {}}, clock=clock,
+                                 wake_func=lambda t, c, clk: calls.append(clk.now()) or (True, 0.0),
+                                 start_worker=_inline)
+    scheduler.run(max_runs=2)
+    assert calls == [datetime(2026, 10, 19, 8, 57), datetime(2026, 10, 20, 8, 50)]
+
+
+def test_due_prewake_is_not_held_up_by_a_running_one():
+    """A target due while another is still waiting for readiness starts on time"""
+    clock = SimulatedClock(datetime(2026, 10, 19, 7, 0))
+    targets = [
+        {"name": "lab", "prewake": {"schedule": "0 8 * * *", "lead_minutes": 5}},
+        {"name": "office", "prewake": {"schedule": "1 8 * * *", "lead_minutes": 5}},
+    ]
+    office_started = threading.Event()
+
+    def fake_wake(target, cred, clk):
+        if target["name"] == "office":
+            office_started.set()
+            return True, 1.0
+        # Only ready once the other pre-wake started: never with one pre-wake at a time
+        return office_started.wait(5), 1.0
+
+    scheduler = PreWakeScheduler(targets, {"lab": {}, "office": {}}, clock=clock, wake_func=fake_wake)
+    scheduler.run(max_runs=2)
+    records = {r["target"]: r for r in scheduler.history}
+    assert records["lab"]["success"] and records["office"]["success"]
+    assert records["office"]["started_at"] == "2026-10-19T07:56:00"
+
+
+def test_missed_slot_is_recorded_as_failed():
+    """A session that started while the process was held up is recorded, not skipped"""
+    clock = SimulatedClock(datetime(2026, 10, 19, 8, 0))
+    targets = [{"name": "office", "prewake": {"schedule": "0 9,10 * * *", "lead_minutes": 10}}]
+    calls = []
+
+    def fake_wake(target, cred, clk):
+        calls.append(clk.now())
+        clk.sleep(2 * 3600)  # e.g. the machine running the scheduler was suspended
+        return True, 1.0
+
+    scheduler = PreWakeScheduler(targets, {"office": {}}, clock=clock, wake_func=fake_wake, start_worker=_inline)
+    scheduler.run(max_runs=3)
+    assert calls == [datetime(2026, 10, 19, 8, 50), datetime(2026, 10, 20, 8, 50)]
+    missed = scheduler.history[1]
+    assert missed["session_at"] == "2026-10-19T10:00:00"
+    assert missed["success"] is False and missed["error"].startswith("missed")
+
+
+if __name__ == "__main__":
+    test_cron_next_after()
+    test_prewake_runs_lead_time_before_session()
+    test_session_inside_lead_time_is_woken_immediately()
+    test_due_prewake_is_not_held_up_by_a_running_one()
+    test_missed_slot_is_recorded_as_failed()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test router rate limiting and staggered wake plans
+"""
+
+import sys
+
+from rate_limiter import TokenBucket, get_router_limiter
+from router_drivers import FakeRouterDriver
+from wake_plan import plan_staggered_wake, execute_wake_plan, format_wake_timeline
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_burst_then_rate():
+    """Burst passes immediately, then one token per 1/rate seconds"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock.time, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(5)]
+    assert waits[:3] == [0, 0, 0]
+    assert clock.now == 1.0
+    clock.sleep(10)
+    assert bucket.acquire() == 0
+
+
+def test_router_limiter_shared_per_url():
+    assert get_router_limiter("http://10.9.9.1/") is get_router_limiter("http://10.9.9.1")
+    assert get_router_limiter("http://10.9.9.1") is not get_router_limiter("http://10.9.9.2")
+    assert get_router_limiter("http://10.9.9.3", rate=1).rate == 1
+
+
+def test_router_limiter_reconfigured_in_place():
+    """Different settings from another caller never replace the bucket or refill its burst"""
+    limiter = get_router_limiter("http://10.9.9.4", rate=5, burst=5)
+    for _ in range(5):
+        limiter.reserve()
+    other = get_router_limiter("http://10.9.9.4", rate=2, burst=3)
+    assert other is limiter and limiter.rate == 2 and limiter.burst == 3
+    assert limiter.reserve() > 0  # Still in debt: no fresh burst
+
+
+def test_staggered_plan_and_execution():
+    """Power-on is staggered and one router login/poll serves all machines"""
+    FakeRouterDriver.reset()
+    router_config = {"type": "fake", "url": "fake://r1", "ports": {f"mac{i}": i + 1 for i in range(4)}}
+    targets = [{"name": f"pc{i}", "router": router_config, "rdp": {"server": "127.0.0.1:1"},
+                "wol": {"mac_address": f"mac{i}", "lan_port": i + 1}} for i in range(4)]
+    plan = plan_staggered_wake(targets, power_on_rate=20, power_on_burst=2)
+    assert [e.planned_offset for e in plan] == [0, 0, 0.05, 0.1]
+
+    credentials = {t["name"]: {"router_id": "admin", "router_pw": "pw"} for t in targets}
+    drivers = []
+
+    def driver_factory(target, cred):
+        drivers.append(FakeRouterDriver(target["router"], cred))
+        return drivers[-1]
+
+    execute_wake_plan(plan, credentials, ready_timeout=5, poll_interval=0.02, driver_factory=driver_factory)
+    print(format_wake_timeline(plan))
+
+    assert all(e.status == "ready" for e in plan)
+    assert all(e.sent_offset >= e.planned_offset for e in plan)
+    assert all(e.ready_offset >= e.sent_offset for e in plan)
+    assert len(drivers) == 1
+    calls = drivers[0].calls
+    assert calls.count("session/login") == 1
+    # pc0 and pc1 share the first slot and go out as one batch WOL request
+    assert calls.count("wol/signal") == 3
+
+
+if __name__ == "__main__":
+    test_token_bucket_burst_then_rate()
+    test_router_limiter_shared_per_url()
+    test_router_limiter_reconfigured_in_place()
+    test_staggered_plan_and_execution()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test router driver registry and capability-based strategies
+"""
+
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+from endpoint_race import EndpointMemory, set_endpoint_memory
+from router_drivers import DRIVERS, FakeRouterDriver, IPTimeDriver, best_router_url, create_driver, router_endpoint_key
+import test_http_pool
+from wake_engine import poll_ports, send_wol, wait_for_ports
+
+CRED = {"router_id": "admin", "router_pw": "pw"}
+
+
+def _router(url, **capabilities):
+    return {"type": "fake", "url": url, "ports": {"AA:00": 1, "AA:01": 2, "AA:02": 3},
+            "capabilities": capabilities}
+
+
+def test_registry():
+    """router.type selects the driver; iptime is the default"""
+    assert DRIVERS["iptime"] is IPTimeDriver
+    assert isinstance(create_driver({"url": "http://192.168.0.1"}, CRED, verbose=False), IPTimeDriver)
+    assert isinstance(create_driver(_router("fake://reg"), CRED), FakeRouterDriver)
+    try:
+        create_driver({"type": "nope", "url": "http://x"}, CRED)
+        assert False, "unknown router type accepted"
+    except Exception as e:
+        assert "nope" in str(e)
+
+
+def test_cheapest_strategy():
+    """Batch/bulk capable routers need one request where others need one per machine"""
+    FakeRouterDriver.reset()
+    capable = create_driver(_router("fake://capable"), CRED)
+    send_wol(capable, ["AA:00", "AA:01", "AA:02"])
+    assert wait_for_ports(capable, [1, 2, 3], timeout=5, interval=0, sleep=lambda s: None).keys() == {1, 2, 3}
+    assert capable.calls == ["session/login", "wol/signal", "port/link/status"]
+
+    basic = create_driver(_router("fake://basic", batch_wol=False, bulk_port_status=False,
+                                  session_reuse=False), CRED)
+    send_wol(basic, ["AA:00", "AA:01", "AA:02"])
+    assert basic.calls.count("wol/signal") == 3
+    poll_ports(basic, [1, 2, 3])
+    assert basic.calls.count("port/link/status") == 3
+    assert basic.calls.count("session/login") == 1 + 3 + 3 + 1
+
+
+def test_wait_for_ports_timeout():
+    FakeRouterDriver.reset()
+    config = dict(_router("fake://slow"), boot_polls=100)
+    driver = create_driver(config, CRED)
+    send_wol(driver, ["AA:00"])
+    assert wait_for_ports(driver, [1], timeout=0.05, interval=0.01) == {}
+
+
+def test_router_endpoints_race_and_failover():
+    """The reachable endpoint wins the race; a failing remembered one fails over"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), test_http_pool.RouterHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    live = f"http://127.0.0.1:{server.server_address[1]}"
+    dead = "http://127.0.0.1:1"
+    config = {"url": dead, "urls": [live], "rate_limit": {"rate": 1000, "burst": 1000}}
+    memory = EndpointMemory(Path(tempfile.mkdtemp()) / "endpoints.json")
+    set_endpoint_memory(memory)
+    try:
+        assert best_router_url(config) == live
+        assert memory.preferred(router_endpoint_key(config)) == live
+
+        memory.remember(router_endpoint_key(config), dead, 0.001)
+        driver = create_driver(config, CRED, verbose=False)
+        driver.ensure_login()
+        assert driver.port_links() == {1: "1000f"}
+        assert driver.client.router_url == live
+        assert memory.preferred(router_endpoint_key(config)) == live
+    finally:
+        set_endpoint_memory(None)
+        server.shutdown()
+        server.server_close()
+
+
+class RejectingRouterHandler(test_http_pool.RouterHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"result": "fail", "error": {"message": "invalid password"}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_rejected_login_does_not_fail_over():
+    """Bad credentials are reported as they are; the remembered endpoint is kept"""
+    servers = [ThreadingHTTPServer(("127.0.0.1", 0), handler)
+               for handler in (RejectingRouterHandler, test_http_pool.RouterHandler)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    rejecting, live = (f"http://127.0.0.1:{server.server_address[1]}" for server in servers)
+    config = {"url": rejecting, "urls": [live], "rate_limit": {"rate": 1000, "burst": 1000}}
+    memory = EndpointMemory(Path(tempfile.mkdtemp()) / "endpoints.json")
+    set_endpoint_memory(memory)
+    try:
+        memory.remember(router_endpoint_key(config), rejecting, 0.001)
+        driver = create_driver(config, CRED, verbose=False)
+        try:
+            driver.login()
+            raised = None
+        except Exception as e:
+            raised = str(e)
+        assert raised is not None and "Login failed" in raised
+        assert driver.client.router_url == rejecting
+        assert memory.preferred(router_endpoint_key(config)) == rejecting
+    finally:
+        set_endpoint_memory(None)
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    test_registry()
+    test_cheapest_strategy()
+    test_wait_for_ports_timeout()
+    test_router_endpoints_race_and_failover()
+    test_rejected_login_does_not_fail_over()
+    print("✅ All tests passed!")
+    sys.exit(0)
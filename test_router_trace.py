@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test router traffic record/replay
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import requests
+
+from iptime_wol import IPTimeWOL
+from rate_limiter import TokenBucket
+from router_trace import RecordingSession, ReplaySession, TraceRecorder, load_trace, replay_wake
+
+
+class StubResponse:
+    def __init__(self, body, cookies=None):
+        self.status_code = 200
+        self.text = json.dumps(body)
+        self.cookies = requests.cookies.cookiejar_from_dict(cookies or {})
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        pass
+
+
+class StubRouterSession:
+    """Router that needs two polls before port 4 comes up"""
+
+    def __init__(self):
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self.polls = 0
+
+    def post(self, url, json=None, **kwargs):
+        method = json["method"]
+        if method == "session/login":
+            self.cookies.set("efm_session_id", "abcdef123456")
+            return StubResponse({"result": "success", "session_id": "abcdef123456",
+                                 "data": {"token": "tok987654", "id": "admin", "ssid": "office-wifi",
+                                          "authmode": "wpa2"}},
+                                {"efm_session_id": "abcdef123456"})
+        if method == "wol/signal":
+            return StubResponse({"result": "success"})
+        self.polls += 1
+        return StubResponse({"result": [{"type": "lan", "port": 4, "link": "1000f" if self.polls > 2 else ""}]})
+
+
+def _record(path):
+    session = RecordingSession(TraceRecorder(path), StubRouterSession())
+    wol_obj = IPTimeWOL("http://192.168.0.1", "admin", "secret", session=session,
+                        rate_limiter=TokenBucket(1000, 100), verbose=False)
+    wol_obj.send_wol_packet("10:FF:E0:38:F4:D5")
+    while not wol_obj.is_lan_port_up(4):
+        pass
+
+
+def test_recording_scrubs_credentials():
+    path = Path(tempfile.mkdtemp()) / "trace.jsonl"
+    _record(path)
+    text = path.read_text(encoding='utf-8')
+    assert "secret" not in text and "admin" not in text and "abcdef123456" not in text
+    entries = load_trace(path)
+    assert [e["method"] for e in entries] == ["session/login", "wol/signal"] + ["port/link/status"] * 3
+    assert entries[0]["request"]["params"] == {"id": "***", "pw": "***"}
+    assert all("elapsed" in e and "t" in e for e in entries)
+
+
+def test_recording_scrubs_login_response():
+    path = Path(tempfile.mkdtemp()) / "trace.jsonl"
+    _record(path)
+    assert "tok987654" not in path.read_text(encoding='utf-8')
+    login = json.loads(load_trace(path)[0]["response"])
+    # Whole field names only: "ssid" and "authmode" are kept for replay
+    assert login == {"result": "success", "session_id": "***",
+                     "data": {"token": "***", "id": "***", "ssid": "office-wifi", "authmode": "wpa2"}}
+
+
+def test_replay_feeds_iptime_wol():
+    path = Path(tempfile.mkdtemp()) / "trace.jsonl"
+    _record(path)
+    slept = []
+    wol_obj = IPTimeWOL("http://replay", "", "", session=ReplaySession(load_trace(path), speed=2, sleep=slept.append),
+                        rate_limiter=TokenBucket(1000, 100), verbose=False)
+    assert wol_obj.login()
+    assert wol_obj.session_id == "replay"
+    assert wol_obj.send_wol("10:FF:E0:38:F4:D5")
+    assert [wol_obj.is_lan_port_up(4) for _ in range(4)] == [False, False, True, True]
+    assert len(slept) == 6
+
+    result = replay_wake(path, "10:FF:E0:38:F4:D5", 4, speed=0)
+    assert result["woke"] and result["polls"] == 3
+
+
+def test_replayed_timeout():
+    entries = [{"method": "port/link/status", "elapsed": 10.0, "error": "timeout", "message": "read timed out"}]
+    wol_obj = IPTimeWOL("http://replay", "", "", session=ReplaySession(entries, speed=0),
+                        rate_limiter=TokenBucket(1000, 100), verbose=False)
+    try:
+        wol_obj.get_port_link_status()
+        assert False, "expected a timeout"
+    except Exception as e:
+        assert "Replayed timeout" in str(e)
+
+
+if __name__ == "__main__":
+    test_recording_scrubs_credentials()
+    test_recording_scrubs_login_response()
+    test_replay_feeds_iptime_wol()
+    test_replayed_timeout()
+    print("✅ All tests passed!")
+    sys.exit(0)
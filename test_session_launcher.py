@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test parallel multi-session launcher (fake RDP client)
+"""
+
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from mstsc_connector import MSTSCConnector
+from rdp_clients import FakeRDPClient
+from session_launcher import SessionLauncher, LaunchJob, LaunchResult, ClientSupervisor, format_launch_report
+
+
+def _listener():
+    """Local TCP listener standing in for an RDP server"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    return server
+
+
+def _unused_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_ready_targets_do_not_wait_for_slow_ones():
+    """A ready target launches while another is still waiting"""
+    fast = _listener()
+    slow_port = _unused_port()
+    tmp = tempfile.mkdtemp()
+    client = FakeRDPClient(connect=True, hold=0.5)
+    fast_conn = MSTSCConnector(f"127.0.0.1:{fast.getsockname()[1]}", rdp_dir=Path(tmp), client=client)
+    slow_conn = MSTSCConnector(f"127.0.0.1:{slow_port}", rdp_dir=Path(tmp), client=client)
+
+    slow_server = []
+
+    def start_slow_server():
+        time.sleep(0.6)
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.bind(("127.0.0.1", slow_port))
+        s.listen(8)
+        slow_server.append(s)
+
+    threading.Thread(target=start_slow_server, daemon=True).start()
+    launcher = SessionLauncher(max_concurrent=2, ready_timeout=5, poll_interval=0.1)
+    results = launcher.launch_all([LaunchJob("slow", slow_conn), LaunchJob("fast", fast_conn)])
+    print(format_launch_report(results))
+
+    assert [r.name for r in results] == ["fast", "slow"]
+    assert all(r.status == "connected" for r in results)
+    assert all(r.connect_seconds is not None and r.attempts == 1 for r in results)
+    assert results[0].total_seconds < results[1].ready_seconds
+    for r in results:
+        r.process.wait(timeout=5)
+    fast.close()
+    for s in slow_server:
+        s.close()
+
+
+def test_launch_slot_is_released_once_the_client_started():
+    """With one launch slot, a client still connecting does not block the next launch"""
+    server = _listener()
+    tmp = tempfile.mkdtemp()
+    client = FakeRDPClient(connect=False, hold=3)
+    conns = [MSTSCConnector(f"127.0.0.1:{server.getsockname()[1]}", rdp_dir=Path(tmp), client=client) for _ in range(2)]
+    launched = []
+    # Connected only once both clients run: impossible if the first held the slot while supervised
+    supervisor = ClientSupervisor(connect_timeout=2, poll_interval=0.05,
+                                  connection_check=lambda host, port, pid: len(launched) >= 2)
+    launcher = SessionLauncher(max_concurrent=1, ready_timeout=2, poll_interval=0.05, supervisor=supervisor,
+                               on_status=lambda r: r.status == "launched" and launched.append(r.name))
+    results = launcher.launch_all([LaunchJob("a", conns[0]), LaunchJob("b", conns[1])])
+    assert sorted(launched) == ["a", "b"]
+    assert all(r.status == "connected" for r in results)
+    for r in results:
+        r.process.kill()
+        r.process.wait()
+    server.close()
+
+
+def test_unreachable_and_failing_targets_are_reported():
+    """Timeouts and wake errors show up in the per-launch status"""
+    tmp = tempfile.mkdtemp()
+    conn = MSTSCConnector(f"127.0.0.1:{_unused_port()}", rdp_dir=Path(tmp), client=FakeRDPClient())
+
+    def bad_wake():
+        raise Exception("WOL transmission failed")
+
+    seen = []
+    launcher = SessionLauncher(ready_timeout=0.3, poll_interval=0.1, on_status=lambda r: seen.append((r.name, r.status)))
+    results = {r.name: r for r in launcher.launch_all([LaunchJob("down", conn), LaunchJob("bad", conn, wake=bad_wake)])}
+    assert results["down"].status == "not_ready"
+    assert results["bad"].status == "failed"
+    assert "WOL" in results["bad"].error
+    assert ("bad", "waking") in seen
+
+
+def test_quick_exit_is_relaunched_with_backoff():
+    """A client that dies at once is relaunched, then reported as exited"""
+    server = _listener()
+    tmp = tempfile.mkdtemp()
+    conn = MSTSCConnector(f"127.0.0.1:{server.getsockname()[1]}", rdp_dir=Path(tmp),
+                          client=FakeRDPClient(connect=False, hold=0, exit_code=3))
+    supervisor = ClientSupervisor(quick_fail_seconds=5, max_relaunches=2, backoff=0.05, poll_interval=0.05)
+    statuses = []
+    result = supervisor.supervise(conn, LaunchResult("crashy"), on_status=statuses.append)
+    assert result.status == "exited"
+    assert result.attempts == 3
+    assert result.exit_code == 3
+    assert statuses.count("relaunching") == 2
+    server.close()
+
+
+def test_running_client_without_connection_is_unconfirmed():
+    """A client that stays up but never connects is reported as unconfirmed"""
+    tmp = tempfile.mkdtemp()
+    conn = MSTSCConnector("127.0.0.1:1", rdp_dir=Path(tmp), client=FakeRDPClient(connect=False, hold=2))
+    supervisor = ClientSupervisor(connect_timeout=0.3, poll_interval=0.05)
+    result = supervisor.supervise(conn, LaunchResult("idle"))
+    assert result.status == "unconfirmed"
+    assert result.connect_seconds is None
+    result.process.kill()
+    result.process.wait()
+
+
+if __name__ == "__main__":
+    test_ready_targets_do_not_wait_for_slow_ones()
+    test_launch_slot_is_released_once_the_client_started()
+    test_unreachable_and_failing_targets_are_reported()
+    test_quick_exit_is_relaunched_with_backoff()
+    test_running_client_without_connection_is_unconfirmed()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test parallel vault rotation with rollback
+"""
+
+import json
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from crypto_utils import decrypt_data, encrypt_data
+from vault_rotation import rotate_vaults, write_atomic, format_rotation_report, format_rotation_outcome
+
+ITERATIONS = 1000
+
+
+def _vaults(count, password="old"):
+    tmp = Path(tempfile.mkdtemp())
+    paths = []
+    for i in range(count):
+        path = tmp / f"credentials{i}.enc"
+        path.write_text(json.dumps(encrypt_data(json.dumps({f"pc{i}": {"rdp_pw": "x"}}), password,
+                                                iterations=ITERATIONS)), encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def _decrypt(path, password):
+    vault = json.loads(path.read_text(encoding='utf-8'))
+    return json.loads(decrypt_data(vault["encrypted"], password, vault["salt"], vault["iterations"]))
+
+
+def test_rotate_in_process_pool():
+    paths = _vaults(3)
+    results = rotate_vaults(paths, "old", "new", max_workers=2)
+    print(format_rotation_report(results))
+    assert [r.status for r in results] == ["rotated"] * 3
+    assert _decrypt(paths[2], "new") == {"pc2": {"rdp_pw": "x"}}
+    assert json.loads(paths[0].read_text(encoding='utf-8'))["iterations"] == ITERATIONS
+    assert not list(paths[0].parent.glob("*.tmp"))
+
+    results = rotate_vaults(paths[:1], "new", "newer", iterations=2000, executor_factory=ThreadPoolExecutor)
+    assert results[0].status == "rotated"
+    assert json.loads(paths[0].read_text(encoding='utf-8'))["iterations"] == 2000
+
+
+def test_wrong_password_changes_nothing():
+    paths = _vaults(2) + _vaults(1, password="other")
+    before = [p.read_text(encoding='utf-8') for p in paths]
+    results = rotate_vaults(paths, "old", "new", executor_factory=ThreadPoolExecutor)
+    assert [r.status for r in results] == ["skipped", "skipped", "failed"]
+    assert [p.read_text(encoding='utf-8') for p in paths] == before
+
+
+def test_write_failure_rolls_back():
+    paths = _vaults(3)
+    before = [p.read_text(encoding='utf-8') for p in paths]
+    rotated_once = set()
+
+    def flaky_writer(path, content):
+        if path == paths[1] and path not in rotated_once:
+            rotated_once.add(path)
+            raise OSError("disk full")
+        write_atomic(path, content)
+
+    results = rotate_vaults(paths, "old", "new", executor_factory=ThreadPoolExecutor, writer=flaky_writer)
+    assert [r.status for r in results] == ["rolled_back", "failed", "skipped"]
+    assert [p.read_text(encoding='utf-8') for p in paths] == before
+
+
+def test_failed_rollback_is_reported():
+    paths = _vaults(2)
+
+    def writer(path, content):
+        if path == paths[1] or "rotated" in written:
+            raise OSError("disk full")
+        write_atomic(path, content)
+        written.append("rotated")
+
+    written = []
+    results = rotate_vaults(paths, "old", "new", executor_factory=ThreadPoolExecutor, writer=writer)
+    assert [r.status for r in results] == ["rotated", "failed"]
+    assert "rollback failed" in results[0].error
+    _decrypt(paths[0], "new")
+    outcome = format_rotation_outcome(results).splitlines()
+    assert "NEW password" in outcome[0] and "rollback failed" in outcome[0]
+    assert "old password" in outcome[1]
+
+
+if __name__ == "__main__":
+    test_rotate_in_process_pool()
+    test_wrong_password_changes_nothing()
+    test_write_failure_rolls_back()
+    test_failed_rollback_is_reported()
+    print("✅ All tests passed!")
+    sys.exit(0)
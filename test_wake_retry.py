@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test WOL retransmission on missed wake windows
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from metrics import WAKE_ATTEMPTS
+from router_drivers import FakeRouterDriver
+from state_cache import StateCache
+from wake_retry import RetryPolicy, expected_window, policy_for, record_wake_seconds
+from wol_api import wake
+
+CRED = {"router_id": "admin", "router_pw": "pw"}
+
+
+class LossyDriver(FakeRouterDriver):
+    """Fake router that loses the first magic packet"""
+
+    def send_wol(self, mac_addresses):
+        self.state.setdefault("lost", 0)
+        if self.state["lost"] < 1:
+            self.state["lost"] += 1
+            self.state["calls"].append("wol/signal")
+            return
+        super().send_wol(mac_addresses)
+
+
+def _target(retry=None):
+    wol = {"mac_address": "AA:00:00:00:00:01", "lan_port": 1, "path": "router"}
+    if retry is not None:
+        wol["retry"] = retry
+    return {"name": "pc", "rdp": {"server": "127.0.0.1:1"}, "wol": wol,
+            "router": {"type": "fake", "url": "fake://lossy", "ports": {"AA:00:00:00:00:01": 1}}}
+
+
+def test_policy_and_window():
+    assert RetryPolicy(2, max_retries=3, backoff=2).resend_offsets(30) == [2, 6, 14]
+    assert RetryPolicy(2, max_retries=3, backoff=2).resend_offsets(10) == [2, 6]
+    assert RetryPolicy(0.1, max_retries=1).resend_offsets(30) == [2.0]  # Window floor
+    assert policy_for(_target(retry=False), "link") is None
+
+    cache = StateCache(Path(tempfile.mkdtemp()) / "state.json")
+    assert expected_window(_target(), "link", cache) == 5.0
+    for seconds in (1.0, 3.0, 2.0):
+        record_wake_seconds(cache, "pc", "link", seconds)
+    assert expected_window(_target(), "link", cache) == 4.5
+    assert expected_window(_target(), "rdp", cache) == 20.0
+    assert expected_window(_target({"window": 7}), "link", cache) == 7.0
+    for _ in range(20):
+        record_wake_seconds(cache, "pc", "link", 1.0)
+    assert expected_window(_target(), "link", cache) == 2.0  # Old slow wakes age out
+
+
+def test_lost_packet_is_resent():
+    FakeRouterDriver.reset()
+    cache = StateCache(Path(tempfile.mkdtemp()) / "state.json")
+    driver = LossyDriver(_target()["router"], CRED)
+    record_wake_seconds(cache, "pc", "link", 0.2)  # Normally up almost at once
+    before = WAKE_ATTEMPTS.value(attempt="2")
+    start = time.monotonic()
+    result = wake(_target({"window": 0.5, "max_retries": 2}), CRED, ready_timeout=10, poll_interval=0.05,
+                  cache=cache, driver=driver)
+    assert result.status == "ready" and result.attempts == 2 and result.sends == 2
+    assert time.monotonic() - start < 5  # Well before the timeout
+    assert driver.calls.count("wol/signal") == 2
+    assert WAKE_ATTEMPTS.value(attempt="2") == before + 1
+    assert cache.get("wake:pc")["link"][-1] < 1  # Time from the winning WOL recorded
+
+    # Without retries the lost packet costs the whole timeout
+    FakeRouterDriver.reset()
+    driver = LossyDriver(_target()["router"], CRED)
+    result = wake(_target(False), CRED, ready_timeout=0.5, poll_interval=0.05, driver=driver)
+    assert result.status == "timeout" and result.attempts == 1
+
+
+def test_slow_boot_is_not_a_lost_packet():
+    """A boot slower than the first window gets a re-send, but no lost packet is reported"""
+    FakeRouterDriver.reset()
+    cache = StateCache(Path(tempfile.mkdtemp()) / "state.json")
+    target = dict(_target({"max_retries": 2}), router=dict(_target()["router"], url="fake://slow", boot_polls=50))
+    target["wol"]["retry"]["window"] = 0.5  # Floor of 2 s, the boot takes about 2.5 s
+    before = WAKE_ATTEMPTS.value(attempt="1")
+    result = wake(target, CRED, ready_timeout=10, poll_interval=0.05, cache=cache)
+    assert result.status == "ready" and result.sends == 2 and result.attempts == 1
+    assert WAKE_ATTEMPTS.value(attempt="1") == before + 1
+    boot = cache.get("wake:pc")["link"][-1]
+    assert boot >= 2  # Measured from the first WOL, not from the re-send
+
+    # With the boot time learned, the next wake waits long enough and sends once
+    FakeRouterDriver.reset()
+    del target["wol"]["retry"]["window"]
+    result = wake(target, CRED, ready_timeout=10, poll_interval=0.05, cache=cache)
+    assert result.status == "ready" and result.sends == 1 and result.attempts == 1
+
+
+if __name__ == "__main__":
+    test_policy_and_window()
+    test_lost_packet_is_resent()
+    test_slow_boot_is_not_a_lost_packet()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the non-interactive wake API
+"""
+
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from fleet_status import known_link, precheck_target
+from router_drivers import FakeRouterDriver
+from state_cache import StateCache
+from wol_api import wake, wake_many
+
+
+def _target(i, boot_polls=0, url="fake://api"):
+    return {"name": f"pc{i}", "rdp": {"server": "127.0.0.1:1"},
+            "router": {"type": "fake", "url": url, "boot_polls": boot_polls,
+                       "ports": {f"AA:00:00:00:00:{i:02X}": i + 1 for i in range(200)}},
+            "wol": {"mac_address": f"AA:00:00:00:00:{i:02X}", "lan_port": i + 1, "path": "router"}}
+
+
+CRED = {"router_id": "admin", "router_pw": "pw"}
+
+
+def test_wake_ready_and_timeout():
+    FakeRouterDriver.reset()
+    result = wake(_target(0, boot_polls=1), CRED, ready_timeout=2, poll_interval=0.01)
+    assert result.status == "ready" and result.ok and result.path == "router"
+    assert result.ready_seconds >= result.sent_seconds
+    assert result.to_dict()["status"] == "ready"
+
+    FakeRouterDriver.reset()
+    result = wake(_target(0, boot_polls=1000), CRED, ready_timeout=0.1, poll_interval=0.01)
+    assert result.status == "timeout" and not result.ok
+
+
+def test_wake_cancel_and_already_up():
+    FakeRouterDriver.reset()
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    start = time.monotonic()
+    result = wake(_target(0, boot_polls=1000), CRED, ready_timeout=10, poll_interval=0.02, cancel=cancel)
+    assert result.status == "cancelled"
+    assert time.monotonic() - start < 1
+
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    target = dict(_target(0), rdp={"server": f"127.0.0.1:{server.getsockname()[1]}"})
+    cache = StateCache(Path(tempfile.mkdtemp()) / "state.json")
+    assert wake(target, CRED, cache=cache).status == "already_up"
+    server.close()
+
+
+def test_wake_records_the_port_link():
+    """The link value seen while the port came up is kept for RDP profile selection"""
+    FakeRouterDriver.reset()
+    cache = StateCache(Path(tempfile.mkdtemp()) / "state.json", ttl=0.05)
+    target = _target(0, boot_polls=1)
+    assert known_link(cache, target["name"]) is None
+    assert wake(target, CRED, ready_timeout=2, poll_interval=0.01, cache=cache).status == "ready"
+    assert known_link(cache, target["name"]) == "1000f"
+    # A later probe once the entry is stale does not drop it
+    time.sleep(0.1)
+    assert precheck_target(target, cache) is None
+    assert known_link(cache, target["name"]) == "1000f"
+
+
+def test_wake_many():
+    """Hundreds of wakes from one process, results as they complete"""
+    FakeRouterDriver.reset()
+    targets = [_target(i) for i in range(150)]
+    credentials = {t["name"]: CRED for t in targets[:-1]}
+    results = [f.result() for f in wake_many(targets, credentials, ready_timeout=5, poll_interval=0.01)]
+    statuses = {r.name: r.status for r in results}
+    assert len(statuses) == 150
+    assert statuses.pop("pc149") == "failed"
+    assert set(statuses.values()) == {"ready"}
+
+
+if __name__ == "__main__":
+    test_wake_ready_and_timeout()
+    test_wake_cancel_and_already_up()
+    test_wake_records_the_port_link()
+    test_wake_many()
+    print("✅ All tests passed!")
+    sys.exit(0)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vault rotation module
+Re-encrypt many credentials.enc vaults with a new master password in parallel
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from crypto_utils import DEFAULT_KDF_ITERATIONS, decrypt_data, encrypt_data
+
+
+class RotationResult:
+    """Outcome for one vault file
+
+    status is one of:
+        rotated: New vault written
+        failed: This vault could not be decrypted, re-encrypted or written
+        skipped: Not written because another vault failed
+        rolled_back: Was written, then restored because another vault failed
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.status = "pending"
+        self.seconds: Optional[float] = None  # Decrypt + re-encrypt time in the worker
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {"path": str(self.path), "status": self.status, "seconds": self.seconds, "error": self.error}
+
+
+def reencrypt_vault(path: str, old_password: str, new_password: str, iterations: Optional[int] = None) -> dict:
+    """
+    Decrypt a vault with the old password and encrypt it with the new one (no writes)
+
+    Runs in a worker process, so it only takes and returns picklable values.
+
+    Args:
+        path: Vault file
+        old_password: Current master password (verified by decrypting)
+        new_password: New master password
+        iterations: PBKDF2 iterations for the new vault (default: keep the vault's count)
+
+    Returns:
+        {"original": file text, "rotated": new file text, "seconds": crypto time}
+
+    Raises:
+        Exception: Unreadable vault or wrong old password
+    """
+    start = time.perf_counter()
+    original = Path(path).read_text(encoding='utf-8')
+    encrypted = json.loads(original)
+    old_iterations = encrypted.get("iterations", DEFAULT_KDF_ITERATIONS)
+    data = decrypt_data(encrypted["encrypted"], old_password, encrypted["salt"], old_iterations)
+    rotated = encrypt_data(data, new_password, iterations=iterations or old_iterations)
+    return {
+        "original": original,
+        "rotated": json.dumps(rotated, ensure_ascii=False, indent=2),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def write_atomic(path: Path, content: str):
+    """Write a file via a temp file in the same directory and an atomic rename"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def rotate_vaults(paths: Sequence[Path], old_password: str, new_password: str,
+                  iterations: Optional[int] = None, max_workers: Optional[int] = None,
+                  executor_factory: Optional[Callable[[Optional[int]], Executor]] = None,
+                  writer: Callable[[Path, str], None] = write_atomic) -> List[RotationResult]:
+    """
+    Rotate the master password of several vaults, all or nothing
+
+    The key derivations run in a process pool (one PBKDF2 pair per vault).
+    Nothing is written until every vault re-encrypted successfully, and if
+    a write fails the vaults already written are restored.
+
+    Args:
+        paths: Vault files
+        old_password: Current master password
+        new_password: New master password
+        iterations: PBKDF2 iterations for the new vaults (default: keep each vault's count)
+        max_workers: Worker processes (default: CPU count)
+        executor_factory: Callable(max_workers) -> Executor (default: ProcessPoolExecutor)
+        writer: Callable(path, content) writing one file (default: write_atomic)
+
+    Returns:
+        Result per vault, in input order
+    """
+    paths = [Path(p) for p in paths]
+    results = [RotationResult(p) for p in paths]
+    if not paths:
+        return results
+    executor_factory = executor_factory or (lambda n: ProcessPoolExecutor(max_workers=n))
+    outputs: Dict[int, dict] = {}
+
+    with executor_factory(max_workers) as executor:
+        futures = [executor.submit(reencrypt_vault, str(p), old_password, new_password, iterations) for p in paths]
+        for i, future in enumerate(futures):
+            try:
+                outputs[i] = future.result()
+                results[i].seconds = outputs[i]["seconds"]
+            except Exception as e:
+                results[i].status = "failed"
+                results[i].error = str(e)
+
+    if any(r.status == "failed" for r in results):
+        for r in results:
+            if r.status != "failed":
+                r.status = "skipped"
+        return results
+
+    written: List[int] = []
+    for i, path in enumerate(paths):
+        try:
+            writer(path, outputs[i]["rotated"])
+            written.append(i)
+            results[i].status = "rotated"
+        except Exception as e:
+            results[i].status = "failed"
+            results[i].error = str(e)
+            for j in written:
+                try:
+                    writer(paths[j], outputs[j]["original"])
+                    results[j].status = "rolled_back"
+                except Exception as restore_error:
+                    results[j].error = f"rollback failed: {restore_error}"
+            for r in results[i + 1:]:
+                r.status = "skipped"
+            break
+    return results
+
+
+def format_rotation_report(results: List[RotationResult]) -> str:
+    """
+    Format rotation results as a text table
+
+    Args:
+        results: Results from rotate_vaults
+
+    Returns:
+        Report text
+    """
+    lines = [f"{'Vault':<40} {'Status':<12} {'Time(s)':>8}  Error"]
+    for r in results:
+        seconds = f"{r.seconds:.2f}" if r.seconds is not None else "-"
+        lines.append(f"{str(r.path):<40} {r.status:<12} {seconds:>8}  {r.error or ''}")
+    return '\n'.join(lines)
+
+
+def format_rotation_outcome(results: List[RotationResult]) -> str:
+    """
+    Describe which password each vault is left on after a failed rotation
+
+    Args:
+        results: Results from rotate_vaults
+
+    Returns:
+        One line per vault
+    """
+    lines = []
+    for r in results:
+        if r.status == "rotated" and r.error:
+            lines.append(f"⚠️  {r.path}: still on the NEW password ({r.error})")
+        elif r.status == "rotated":
+            lines.append(f"✅ {r.path}: rotated, uses the new password")
+        elif r.status == "rolled_back":
+            lines.append(f"↩️  {r.path}: rolled back, uses the old password")
+        elif r.status == "failed":
+            lines.append(f"❌ {r.path}: failed ({r.error}), uses the old password")
+        else:
+            lines.append(f"⏭️  {r.path}: not written, uses the old password")
+    return '\n'.join(lines)
+
+
+def benchmark(vault_counts: Sequence[int], iteration_counts: Sequence[int],
+              max_workers: Optional[int] = None) -> List[dict]:
+    """
+    Measure rotation throughput for vault count x KDF cost
+
+    Vaults are generated in a temporary directory for each run.
+
+    Returns:
+        One row per combination: vaults, iterations, seconds, vaults_per_second
+    """
+    rows = []
+    for iterations in iteration_counts:
+        for count in vault_counts:
+            with tempfile.TemporaryDirectory() as tmp:
+                paths = []
+                for i in range(count):
+                    path = Path(tmp) / f"vault{i}.enc"
+                    payload = encrypt_data(json.dumps({f"pc{i}": {"rdp_pw": "x"}}), "old", iterations=iterations)
+                    path.write_text(json.dumps(payload), encoding='utf-8')
+                    paths.append(path)
+                start = time.perf_counter()
+                results = rotate_vaults(paths, "old", "new", max_workers=max_workers)
+                seconds = time.perf_counter() - start
+                assert all(r.status == "rotated" for r in results)
+                rows.append({"vaults": count, "iterations": iterations, "seconds": seconds,
+                             "vaults_per_second": count / seconds})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vault rotation benchmark")
+    parser.add_argument("--vaults", default="1,4,16,64", help="Comma-separated vault counts")
+    parser.add_argument("--iterations", default=f"10000,{DEFAULT_KDF_ITERATIONS}",
+                        help="Comma-separated PBKDF2 iteration counts")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    print(f"{'Vaults':>6} {'Iterations':>10} {'Time(s)':>8} {'Vaults/s':>9}")
+    for row in benchmark([int(v) for v in args.vaults.split(',')], [int(i) for i in args.iterations.split(',')],
+                         args.workers):
+        print(f"{row['vaults']:>6} {row['iterations']:>10} {row['seconds']:>8.2f} {row['vaults_per_second']:>9.1f}")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wake and detection engine
+Pick the cheapest router strategy from driver capabilities
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from iptime_wol import IPTimeWOL
+from magic_packet import choose_wake_path, send_direct
+from router_drivers import RouterDriver
+
+
+def send_wol(driver: RouterDriver, mac_addresses: List[str]):
+    """
+    Wake several machines behind one router
+
+    One request for all MACs if the driver supports batch WOL, otherwise
+    one request per MAC; the login is reused when the driver allows it.
+
+    Args:
+        driver: Router driver
+        mac_addresses: MACs to wake
+
+    Raises:
+        Exception: Login or WOL failed
+    """
+    driver.ensure_login()
+    if driver.batch_wol:
+        driver.send_wol(list(mac_addresses))
+    else:
+        for mac in mac_addresses:
+            driver.send_wol([mac])
+
+
+def wake_target(target: dict, driver: Optional[RouterDriver], path: Optional[str] = None) -> str:
+    """
+    Wake one target over the chosen path
+
+    "direct" sends the magic packet on the LAN, "router" goes through the
+    router API, "race" fires both at once. A UDP send cannot confirm
+    anything, so the race waits for the router's answer and only reports
+    "direct" if the router request failed.
+
+    Args:
+        target: Target config
+        driver: Router driver (needed unless the path is direct)
+        path: Path override (default: magic_packet.choose_wake_path)
+
+    Returns:
+        Path that sent the wake ("direct" or "router")
+
+    Raises:
+        Exception: Every path failed
+    """
+    path = path or choose_wake_path(target)
+    mac_address = target["wol"]["mac_address"]
+    senders = {
+        "direct": lambda: send_direct(target),
+        "router": lambda: send_wol(driver, [mac_address]),
+    }
+    if path != "race":
+        senders[path]()
+        return path
+
+    results: "queue.Queue[tuple]" = queue.Queue()
+
+    def run(name: str):
+        try:
+            senders[name]()
+            results.put((name, None))
+        except Exception as e:
+            results.put((name, e))
+
+    for name in senders:
+        threading.Thread(target=run, args=(name,), daemon=True).start()
+    outcomes = dict(results.get() for _ in senders)
+    if outcomes["router"] is None:
+        return "router"
+    if outcomes["direct"] is None:
+        return "direct"
+    raise Exception(f"All wake paths failed ({'; '.join(f'{n}: {e}' for n, e in outcomes.items())})")
+
+
+def fallback_path(path: str) -> str:
+    """Path for re-sends: an unconfirmed direct send falls back to the router"""
+    return "router" if path == "direct" else path
+
+
+def poll_port_links(driver: RouterDriver, ports: Iterable[int]) -> Dict[int, str]:
+    """
+    Link values of LAN ports
+
+    One bulk status request if the driver supports it, otherwise one
+    request per port.
+
+    Args:
+        driver: Router driver
+        ports: LAN ports of interest
+
+    Returns:
+        Port -> router link value (e.g., "1000f", "" if down)
+    """
+    ports = list(ports)
+    driver.ensure_login()
+    if driver.bulk_port_status:
+        links = driver.port_links()
+    else:
+        links = {}
+        for port in ports:
+            links.update(driver.port_links([port]))
+    return {p: links.get(p) or "" for p in ports}
+
+
+def poll_ports(driver: RouterDriver, ports: Iterable[int]) -> Dict[int, bool]:
+    """
+    Link-up state of LAN ports (see poll_port_links)
+
+    Returns:
+        Port -> link up
+    """
+    return {p: IPTimeWOL._link_value_is_up(link) for p, link in poll_port_links(driver, ports).items()}
+
+
+def wait_for_ports(driver: RouterDriver, ports: Iterable[int], timeout: float = 30.0, interval: float = 1.0,
+                   sleep: Callable[[float], None] = time.sleep,
+                   on_tick: Optional[Callable[[float, Dict[int, float]], None]] = None,
+                   cancel: Optional[threading.Event] = None,
+                   on_up: Optional[Callable[[int, str], None]] = None) -> Dict[int, float]:
+    """
+    Poll until every port is up or the timeout expires
+
+    Args:
+        driver: Router driver
+        ports: LAN ports to watch
+        timeout: Seconds to wait
+        interval: Seconds between polls
+        sleep: Sleep function
+        on_tick: Callback(elapsed, ready so far) after each poll
+        cancel: Optional event that stops waiting when set
+        on_up: Callback(port, link value) when a port comes up
+
+    Returns:
+        Port -> seconds until link up (ports that never came up are missing)
+    """
+    pending = set(ports)
+    ready: Dict[int, float] = {}
+    start = time.monotonic()
+    while pending:
+        elapsed = time.monotonic() - start
+        try:
+            for port, link in poll_port_links(driver, pending).items():
+                if IPTimeWOL._link_value_is_up(link):
+                    ready[port] = elapsed
+                    pending.discard(port)
+                    if on_up:
+                        on_up(port, link)
+        except Exception:
+            pass
+        if on_tick:
+            on_tick(elapsed, ready)
+        if not pending or time.monotonic() - start + interval > timeout:
+            break
+        if cancel:
+            if cancel.wait(interval):
+                break
+        else:
+            sleep(interval)
+    return ready
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Staggered wake module
+Wake a batch of machines at a limited power-on rate and report the timeline
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from metrics import LINK_UP_SECONDS, RDP_READY_SECONDS, WAKE_TIMEOUTS
+from rdp_probe import probe_any, rdp_endpoints
+from router_drivers import RouterDriver, create_driver
+from wake_engine import poll_ports, send_wol
+
+
+class WakeEntry:
+    """One machine in a wake plan (offsets are seconds from batch start)"""
+
+    def __init__(self, target: dict, planned_offset: float):
+        self.target = target
+        self.name = target["name"]
+        self.planned_offset = planned_offset
+        self.sent_offset: Optional[float] = None
+        self.ready_offset: Optional[float] = None
+        self.error: Optional[str] = None
+        self.done = False
+
+    @property
+    def status(self) -> str:
+        if self.ready_offset is not None:
+            return "ready"
+        if self.error:
+            return "failed"
+        if self.sent_offset is not None:
+            return "sent"
+        return "planned"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "planned_offset": self.planned_offset,
+            "sent_offset": self.sent_offset,
+            "ready_offset": self.ready_offset,
+            "error": self.error,
+        }
+
+
+def plan_staggered_wake(targets: List[dict], power_on_rate: float = 1.0, power_on_burst: int = 1) -> List[WakeEntry]:
+    """
+    Plan power-on times so at most power_on_rate machines start per second
+
+    Args:
+        targets: Target configs, in wake order
+        power_on_rate: Machines powered on per second
+        power_on_burst: Machines that may power on together at the start
+
+    Returns:
+        Wake entries with planned offsets
+    """
+    if power_on_rate <= 0:
+        raise ValueError("power_on_rate must be positive")
+    burst = max(1, int(power_on_burst))
+    return [WakeEntry(t, max(0, i - burst + 1) / power_on_rate) for i, t in enumerate(targets)]
+
+
+def execute_wake_plan(entries: List[WakeEntry], credentials: Dict[str, dict], ready_timeout: float = 120.0,
+                      poll_interval: float = 1.0, driver_factory: Optional[Callable] = None,
+                      on_event: Optional[Callable[[WakeEntry], None]] = None) -> List[WakeEntry]:
+    """
+    Send WOL at the planned times and watch every machine come up
+
+    Machines behind the same router share one driver, so the batch costs
+    as few router requests as possible: one login if the driver reuses
+    sessions, one WOL request for machines due at the same time if it
+    supports batch WOL, and one port status poll per interval if it
+    supports bulk status. All router requests still go through the
+    router's rate limiter.
+
+    Args:
+        entries: Plan from plan_staggered_wake
+        credentials: Credentials per target name
+        ready_timeout: Seconds to wait for each machine after its WOL
+        poll_interval: Seconds between readiness polls
+        driver_factory: Callable(target, cred) -> RouterDriver (default: create_driver for target["router"])
+        on_event: Callback called when an entry is sent, ready or failed
+
+    Returns:
+        The entries, with actual offsets filled in
+    """
+    driver_factory = driver_factory or (lambda target, cred: create_driver(target["router"], cred, verbose=False))
+    start = time.monotonic()
+    lock = threading.Lock()
+
+    def elapsed() -> float:
+        return time.monotonic() - start
+
+    def finish(entry: WakeEntry, error: Optional[str] = None):
+        with lock:
+            if entry.done:
+                return
+            uses_link = entry.target.get("wol", {}).get("lan_port", 0) > 0
+            if error:
+                entry.error = error
+                if entry.sent_offset is not None:
+                    WAKE_TIMEOUTS.inc(phase="link" if uses_link else "rdp")
+            else:
+                entry.ready_offset = elapsed()
+                (LINK_UP_SECONDS if uses_link else RDP_READY_SECONDS).observe(entry.ready_offset - entry.sent_offset)
+            entry.done = True
+        if on_event:
+            on_event(entry)
+
+    # One driver (and login) per router account
+    groups: Dict[tuple, dict] = {}
+    entry_groups: Dict[int, dict] = {}
+    for entry in entries:
+        cred = credentials.get(entry.name)
+        if cred is None:
+            finish(entry, "no credentials")
+            continue
+        key = (entry.target["router"]["url"].rstrip('/').lower(), cred["router_id"])
+        if key not in groups:
+            groups[key] = {"driver": driver_factory(entry.target, cred), "entries": []}
+        groups[key]["entries"].append(entry)
+        entry_groups[id(entry)] = groups[key]
+
+    def poll_group(group: dict):
+        driver: RouterDriver = group["driver"]
+        while True:
+            with lock:
+                pending = [e for e in group["entries"] if not e.done]
+                sent = [e for e in pending if e.sent_offset is not None]
+            if not pending:
+                return
+            now = elapsed()
+            for e in sent:
+                if now - e.sent_offset > ready_timeout:
+                    finish(e, f"not ready after {ready_timeout:.0f} seconds")
+            sent = [e for e in sent if not e.done]
+            port_entries = [e for e in sent if e.target.get("wol", {}).get("lan_port", 0) > 0]
+            if port_entries:
+                try:
+                    up = poll_ports(driver, {int(e.target["wol"]["lan_port"]) for e in port_entries})
+                    for e in port_entries:
+                        if up[int(e.target["wol"]["lan_port"])]:
+                            finish(e)
+                except Exception:
+                    pass
+            for e in sent:
+                if e not in port_entries:
+                    if probe_any(rdp_endpoints(e.target["rdp"]), timeout=min(poll_interval, 1.0)) is not None:
+                        finish(e)
+            time.sleep(poll_interval)
+
+    pollers = [threading.Thread(target=poll_group, args=(g,), daemon=True) for g in groups.values()]
+    for t in pollers:
+        t.start()
+
+    # Machines due at the same time behind the same router are woken together
+    batches: Dict[tuple, List[WakeEntry]] = {}
+    for entry in entries:
+        if not entry.done:
+            batches.setdefault((entry.planned_offset, id(entry_groups[id(entry)])), []).append(entry)
+
+    for (planned_offset, _), batch in sorted(batches.items(), key=lambda item: item[0][0]):
+        delay = planned_offset - elapsed()
+        if delay > 0:
+            time.sleep(delay)
+        group = entry_groups[id(batch[0])]
+        try:
+            send_wol(group["driver"], [e.target["wol"]["mac_address"] for e in batch])
+            sent_at = elapsed()
+            for entry in batch:
+                entry.sent_offset = sent_at
+                if on_event:
+                    on_event(entry)
+        except Exception as e:
+            for entry in batch:
+                finish(entry, str(e))
+
+    for t in pollers:
+        t.join()
+    return entries
+
+
+def format_wake_timeline(entries: List[WakeEntry]) -> str:
+    """
+    Format planned vs actual wake times as a text table
+
+    Args:
+        entries: Executed wake entries
+
+    Returns:
+        Timeline text
+    """
+    def seconds(value):
+        return f"{value:.1f}" if value is not None else "-"
+
+    lines = [f"{'Target':<16} {'Planned(s)':>10} {'Sent(s)':>8} {'Ready(s)':>8}  Status"]
+    for e in sorted(entries, key=lambda e: e.planned_offset):
+        status = e.status + (f" ({e.error})" if e.error else "")
+        lines.append(f"{e.name:<16} {seconds(e.planned_offset):>10} {seconds(e.sent_offset):>8} "
+                     f"{seconds(e.ready_offset):>8}  {status}")
+    return '\n'.join(lines)
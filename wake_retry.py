@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WOL retransmission module
+Re-send the magic packet when a machine misses its expected wake window
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from state_cache import StateCache
+
+DEFAULT_WINDOWS = {"link": 5.0, "rdp": 20.0}  # Seconds, used until there is history
+MIN_WINDOW = 2.0
+HISTORY_SIZE = 10
+
+
+class RetryPolicy:
+    """When to re-send WOL while waiting for a machine
+
+    The first retransmission happens `window` seconds after the first
+    WOL; each further one waits `backoff` times longer than the previous.
+    """
+
+    def __init__(self, window: float, max_retries: int = 2, backoff: float = 1.5):
+        self.window = max(MIN_WINDOW, float(window))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff = max(1.0, float(backoff))
+
+    def resend_offsets(self, timeout: float) -> List[float]:
+        """
+        Seconds after the first WOL at which to re-send, within the timeout
+
+        Args:
+            timeout: Total seconds the caller waits
+
+        Returns:
+            Increasing offsets (at most max_retries)
+        """
+        offsets = []
+        offset, step = 0.0, self.window
+        for _ in range(self.max_retries):
+            offset += step
+            if offset >= timeout:
+                break
+            offsets.append(offset)
+            step *= self.backoff
+        return offsets
+
+
+def _history_key(name: str) -> str:
+    return "wake:" + name
+
+
+def record_wake_seconds(cache: StateCache, name: str, phase: str, seconds: float):
+    """
+    Remember how long a machine took to come up after the WOL that woke it
+
+    Args:
+        cache: Shared state cache
+        name: Target name
+        phase: "link" (router port) or "rdp" (RDP port)
+        seconds: Seconds from the winning WOL to ready
+    """
+    entry = cache.get(_history_key(name), max_age=float('inf')) or {}
+    history = (entry.get(phase) or [])[-(HISTORY_SIZE - 1):] + [round(seconds, 2)]
+    cache.put(_history_key(name), **{phase: history})
+
+
+def expected_window(target: dict, phase: str, cache: Optional[StateCache] = None) -> float:
+    """
+    Seconds a machine is expected to need to come up after a WOL
+
+    wol.retry.window in the config wins; otherwise 1.5x the slowest of
+    the recent wakes in the cache; otherwise a default per phase.
+
+    Args:
+        target: Target config
+        phase: "link" or "rdp"
+        cache: State cache holding wake history
+
+    Returns:
+        Window in seconds
+    """
+    retry = target.get("wol", {}).get("retry") or {}
+    if retry.get("window"):
+        return max(MIN_WINDOW, float(retry["window"]))
+    entry = cache.get(_history_key(target["name"]), max_age=float('inf')) if cache else None
+    history = (entry or {}).get(phase)
+    if history:
+        return max(MIN_WINDOW, max(history) * 1.5)
+    return DEFAULT_WINDOWS[phase]
+
+
+def policy_for(target: dict, phase: str, cache: Optional[StateCache] = None) -> Optional[RetryPolicy]:
+    """
+    Retry policy for a target (None if wol.retry is false)
+
+    Config: "wol": {"retry": {"window": 6, "max_retries": 2, "backoff": 1.5}}
+    """
+    retry = target.get("wol", {}).get("retry", {})
+    if retry is False:
+        return None
+    retry = retry or {}
+    return RetryPolicy(expected_window(target, phase, cache), retry.get("max_retries", 2), retry.get("backoff", 1.5))
+
+
+def normal_boot(target: dict, phase: str, cache: Optional[StateCache] = None) -> Optional[float]:
+    """Slowest recent wake of the target (seconds from the WOL that woke it), None without history"""
+    entry = cache.get(_history_key(target["name"]), max_age=float('inf')) if cache else None
+    history = (entry or {}).get(phase)
+    return max(history) if history else None
+
+
+def credited_attempt(total: float, send_offsets: List[float], normal: Optional[float]) -> int:
+    """
+    WOL send that most likely woke the machine (1 = the first)
+
+    A re-send is only credited when the machine took longer than a normal
+    boot measured from the first WOL; otherwise a slow boot after a
+    precautionary re-send would be reported as a lost packet.
+
+    Args:
+        total: Seconds from the first WOL to ready
+        send_offsets: Seconds after the first WOL of every send (first is 0)
+        normal: Normal boot time from history (None: unknown, credit the first)
+
+    Returns:
+        Attempt number
+    """
+    if normal is None or total <= normal:
+        return 1
+    return max(1, sum(1 for offset in send_offsets if offset < total))
+
+
+def wait_with_retransmit(resend: Callable[[], None], wait: Callable[[float], Optional[float]], timeout: float,
+                         policy: Optional[RetryPolicy],
+                         cancel: Optional[threading.Event] = None) -> Tuple[Optional[float], List[float]]:
+    """
+    Wait for a machine, re-sending WOL at the policy's offsets
+
+    Args:
+        resend: Sends the WOL again (failures are ignored, the wait goes on)
+        wait: Callable(seconds) -> seconds until ready, or None if not ready in time
+        timeout: Total seconds to wait, measured from the first WOL
+        policy: Retry policy (None: a single wait)
+        cancel: Optional event that stops waiting when set
+
+    Returns:
+        (seconds from the first WOL to ready or None, seconds after the
+        first WOL of every send attempt, starting with 0)
+    """
+    start = time.monotonic()
+    offsets = policy.resend_offsets(timeout) if policy else []
+    sends = [0.0]
+    for next_offset in offsets + [timeout]:
+        waited = wait(max(0.0, next_offset - (time.monotonic() - start)))
+        if waited is not None:
+            return time.monotonic() - start, sends
+        if (cancel and cancel.is_set()) or next_offset >= timeout:
+            break
+        try:
+            resend()
+        except Exception:
+            pass
+        sends.append(time.monotonic() - start)
+    return None, sends
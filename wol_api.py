@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WOL API module
+Non-interactive wake API with structured results (never prompts or prints)
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional
+
+from fleet_status import precheck_target, record_link
+from metrics import LINK_UP_SECONDS, RDP_READY_SECONDS, WAKE_ATTEMPTS, WAKE_TIMEOUTS
+from port_discovery import record_link_check
+from rdp_probe import probe_any, rdp_endpoints, wait_for_any_port
+from router_drivers import RouterDriver, create_driver
+from state_cache import StateCache
+from wake_engine import fallback_path, wait_for_ports, wake_target
+from wake_retry import credited_attempt, normal_boot, policy_for, record_wake_seconds, wait_with_retransmit
+
+
+class WakeResult:
+    """Outcome of one wake (seconds are measured from the start of the call)
+
+    status is one of:
+        already_up: RDP port answered before any WOL was sent
+        ready: WOL sent and the machine came up
+        timeout: WOL sent but the machine did not come up in time
+        failed: WOL could not be sent
+        cancelled: Cancelled before the outcome was known
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"
+        self.path: Optional[str] = None  # "direct" or "router"
+        self.rdp_server: Optional[str] = None  # Endpoint that answered first (readiness by RDP port)
+        self.sent_seconds: Optional[float] = None
+        self.ready_seconds: Optional[float] = None
+        self.total_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.sends = 0  # WOL sends made
+        self.attempts = 0  # On success, the send credited with the wake (see wake_retry.credited_attempt)
+        self.port_mismatch = False  # Up by RDP port although wol.lan_port never came up
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("already_up", "ready")
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "path": self.path,
+            "rdp_server": self.rdp_server,
+            "sent_seconds": self.sent_seconds,
+            "ready_seconds": self.ready_seconds,
+            "total_seconds": self.total_seconds,
+            "error": self.error,
+            "sends": self.sends,
+            "attempts": self.attempts,
+            "port_mismatch": self.port_mismatch,
+        }
+
+
+def wake(target: dict, cred: dict, ready_timeout: float = 30.0, poll_interval: float = 1.0,
+         cancel: Optional[threading.Event] = None, cache: Optional[StateCache] = None,
+         driver: Optional[RouterDriver] = None,
+         on_tick: Optional[Callable[[float], None]] = None,
+         on_attempt: Optional[Callable[[int], None]] = None) -> WakeResult:
+    """
+    Wake a target and wait until it is up
+
+    Readiness is the router port link if wol.lan_port is set, otherwise
+    any RDP endpoint (rdp.server and rdp.servers) accepting TCP connections.
+    The WOL is re-sent when the machine misses its expected wake window
+    (see wake_retry), so a lost magic packet costs seconds, not the
+    whole timeout. Re-sends after a direct LAN send go through the router.
+
+    If the port link never comes up but an RDP endpoint answers, the
+    machine is ready and the result is flagged with port_mismatch; with a
+    cache, consecutive mismatches are counted so a stale lan_port can be
+    rediscovered (see port_discovery).
+
+    Args:
+        target: Target config
+        cred: Target credentials
+        ready_timeout: Seconds to wait after the WOL
+        poll_interval: Seconds between readiness checks
+        cancel: Optional event that stops the wake when set
+        cache: State cache; if given, a target that is already up is not woken
+            and the lan_port mapping health, wake times and port link value are recorded
+        driver: Router driver (default: create_driver for target["router"])
+        on_tick: Callback(seconds waited) after each readiness check
+        on_attempt: Callback(attempt number, 1 = first) after each WOL send
+
+    Returns:
+        WakeResult (errors are reported in the result, never raised)
+    """
+    result = WakeResult(target["name"])
+    start = time.monotonic()
+
+    def done(status: str, error: Optional[str] = None) -> WakeResult:
+        result.status = status
+        result.error = error
+        result.total_seconds = time.monotonic() - start
+        return result
+
+    if cancel and cancel.is_set():
+        return done("cancelled")
+    if cache is not None and precheck_target(target, cache):
+        return done("already_up")
+
+    try:
+        driver = driver or create_driver(target["router"], cred, verbose=False)
+        result.path = wake_target(target, driver)
+        result.sent_seconds = time.monotonic() - start
+    except Exception as e:
+        return done("failed", str(e))
+    if on_attempt:
+        on_attempt(1)
+
+    lan_port = target.get("wol", {}).get("lan_port", 0)
+    phase = "link" if lan_port > 0 else "rdp"
+    sent_at = time.monotonic()
+    endpoints = rdp_endpoints(target["rdp"])
+
+    seen_links: Dict[int, str] = {}
+
+    def wait_link(seconds: float) -> Optional[float]:
+        ready = wait_for_ports(driver, [lan_port], timeout=seconds, interval=poll_interval,
+                               on_tick=(lambda *_: on_tick(time.monotonic() - sent_at)) if on_tick else None,
+                               cancel=cancel, on_up=seen_links.__setitem__)
+        if lan_port in ready:
+            return ready[lan_port]
+        if cancel and cancel.is_set():
+            return None
+        # Up without its port: no point re-sending, the mapping is wrong
+        winner = probe_any(endpoints, timeout=min(poll_interval, 1.0))
+        if winner is None:
+            return None
+        result.rdp_server = winner[0]
+        result.port_mismatch = True
+        return 0.0
+
+    def wait_rdp(seconds: float) -> Optional[float]:
+        ready = wait_for_any_port(endpoints, timeout=seconds, interval=poll_interval, cancel=cancel)
+        if ready is None:
+            return None
+        result.rdp_server = ready[0]
+        return ready[1]
+
+    sends = [1]
+
+    def resend():
+        wake_target(target, driver, fallback_path(result.path))
+        sends[0] += 1
+        if on_attempt:
+            on_attempt(sends[0])
+
+    normal = normal_boot(target, phase, cache)
+    waited, send_offsets = wait_with_retransmit(
+        resend, wait_link if lan_port > 0 else wait_rdp,
+        ready_timeout, policy_for(target, phase, cache), cancel)
+    result.sends = len(send_offsets)
+    result.attempts = credited_attempt(waited, send_offsets, normal) if waited is not None else result.sends
+
+    if cache is not None and lan_port > 0 and waited is not None:
+        record_link_check(cache, target["name"], correlated=not result.port_mismatch)
+        if lan_port in seen_links:
+            # Link speed for the RDP profile of the session that follows
+            record_link(cache, target["name"], seen_links[lan_port])
+    if waited is not None:
+        result.ready_seconds = result.sent_seconds + waited
+        if not result.port_mismatch:
+            (LINK_UP_SECONDS if lan_port > 0 else RDP_READY_SECONDS).observe(waited)
+            WAKE_ATTEMPTS.inc(attempt=str(result.attempts))
+            if cache is not None:
+                # Boot time from the WOL that woke it: the first one unless a lost packet is credited
+                record_wake_seconds(cache, target["name"], phase, waited - send_offsets[result.attempts - 1])
+        return done("ready")
+    if cancel and cancel.is_set():
+        return done("cancelled")
+    WAKE_TIMEOUTS.inc(phase=phase)
+    return done("timeout", f"not up after {ready_timeout:.0f} seconds ({result.sends} WOL sends)")
+
+
+def wake_many(targets: List[dict], credentials: Dict[str, dict], max_workers: int = 32,
+              cancel: Optional[threading.Event] = None, **kwargs) -> Iterator["Future[WakeResult]"]:
+    """
+    Wake many targets concurrently
+
+    Router requests still go through each router's shared rate limiter
+    and connection pool, so hundreds of wakes behind one router do not
+    flood it.
+
+    Args:
+        targets: Target configs
+        credentials: Credentials per target name
+        max_workers: Wakes running at once
+        cancel: Optional event that cancels pending and running wakes
+        **kwargs: Passed to wake()
+
+    Returns:
+        Iterator yielding futures of WakeResult as they complete
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wake")
+    futures = []
+    for target in targets:
+        cred = credentials.get(target["name"])
+        if cred is None:
+            future: Future = Future()
+            result = WakeResult(target["name"])
+            result.status, result.error, result.total_seconds = "failed", "no credentials", 0.0
+            future.set_result(result)
+        else:
+            future = executor.submit(wake, target, cred, cancel=cancel, **kwargs)
+        futures.append(future)
+    executor.shutdown(wait=False)
+    return as_completed(futures)
@@ -11,13 +11,29 @@ import getpass
 import argparse
 from pathlib import Path
 
-from crypto_utils import (
-    encrypt_data, decrypt_data, verify_password,
-    is_keyring_available, load_master_password, save_master_password, delete_master_password
-)
+from crypto_utils import encrypt_data, decrypt_data, verify_password
+from bootstrap import app_dir
+from credential_providers import PromptProvider, default_chain
 from config_manager import ConfigManager
 from iptime_wol import IPTimeWOL
+from router_drivers import create_driver
+from magic_packet import choose_wake_path
+from wake_engine import wake_target
+from wol_api import wake
+from live_console import KeyReader, LiveWait
+from port_discovery import discover_lan_port, mapping_suspect, reset_link_checks
 from mstsc_connector import MSTSCConnector
+from prewake_scheduler import PreWakeScheduler
+from router_trace import enable_recording
+from profiling import Profiler
+from metrics import start_metrics_export
+from link_watch import build_watcher, print_json_event
+from fleet_status import (status_sweep, precheck_target, record_connected, known_link,
+                          format_status_header, format_status_row)
+from state_cache import StateCache, DEFAULT_STATE_FILE
+from wake_plan import plan_staggered_wake, execute_wake_plan, format_wake_timeline
+from vault_rotation import rotate_vaults, format_rotation_report, format_rotation_outcome
+from session_launcher import SessionLauncher, LaunchJob, LaunchResult, ClientSupervisor, format_launch_report
 
 
 def get_master_password(confirm=False, prompt="Enter master password: ", allow_saved=True):
@@ -32,27 +48,29 @@ def get_master_password(confirm=False, prompt="Enter master password: ", allow_s
     Returns:
         Master password string
     """
-    # Try to load from Windows Credential Manager
-    if allow_saved and is_keyring_available():
-        saved_password = load_master_password()
+    chain = default_chain()
+    keyring_provider = chain.provider("keyring")
+    # Try the environment/fd, then Windows Credential Manager (looked up once per process)
+    if allow_saved:
+        saved_password, provider = chain.lookup()
         if saved_password:
-            print("🔑 Using saved master password from Windows Credential Manager")
+            print(f"🔑 Using saved master password from {provider.description}")
             return saved_password
     
     # Manual password input
-    password = getpass.getpass(prompt)
+    password = PromptProvider(prompt).get() or ""
     
     if confirm:
-        password_confirm = getpass.getpass("Confirm master password: ")
+        password_confirm = PromptProvider("Confirm master password: ").get() or ""
         if password != password_confirm:
             print("❌ Passwords do not match")
             sys.exit(1)
     
     # Ask if user wants to save to Credential Manager
-    if password and is_keyring_available() and not load_master_password():
+    if password and keyring_provider.available() and not keyring_provider.get():
         save_choice = input("💾 Save this password to Windows Credential Manager? (y/n): ").strip().lower()
         if save_choice == 'y':
-            if save_master_password(password):
+            if keyring_provider.store(password):
                 print("✅ Master password saved to Windows Credential Manager")
             else:
                 print("⚠️  Failed to save password")
@@ -90,12 +108,18 @@ def initialize_config(master_password=None, add_target=False):
     if not mac_address:
         mac_address = "00:00:00:00:00:00"  # Default MAC address if blank
         print(f"[Info] No MAC address entered. Using default: {mac_address}")
-    lan_port_str = input("Router LAN port number connected to PC (e.g., 1-4): ").strip()
-    try:
-        lan_port = int(lan_port_str)
-    except ValueError:
-        print("⚠️  Invalid port number, defaulting to port check disabled")
+    lan_port_str = input("Router LAN port number connected to PC (e.g., 1-4, Enter to detect): ").strip()
+    if not lan_port_str:
         lan_port = 0
+        if input("Detect the port now? The PC must be off and wired to the router (y/n): ").strip().lower() == 'y':
+            cred = {"router_id": router_id, "router_pw": router_pw}
+            lan_port = propose_lan_port(name, create_driver({"type": "iptime", "url": router_url}, cred), mac_address)
+    else:
+        try:
+            lan_port = int(lan_port_str)
+        except ValueError:
+            print("⚠️  Invalid port number, defaulting to port check disabled")
+            lan_port = 0
     # MSTSC info
     print("\n🖥️  Enter Remote Desktop information")
     rdp_server = input("Server address (e.g., 192.168.0.100:3389 or domain.com:3389): ").strip()
@@ -154,26 +178,66 @@ def change_master_password():
         config_manager.change_master_password(old_password, new_password)
         print("\n✅ Master password changed successfully!\n")
         
-        # Update saved password in Credential Manager if exists
-        if is_keyring_available() and load_master_password():
-            if save_master_password(new_password):
-                print("✅ Saved password in Credential Manager updated\n")
+        update_saved_master_password(new_password)
     except Exception as e:
         print(f"\n❌ Failed to change master password: {e}\n")
         sys.exit(1)
 
 
+def update_saved_master_password(new_password):
+    """Update the master password saved in Credential Manager (delete it if the update fails)"""
+    keyring_provider = default_chain().provider("keyring")
+    if not (keyring_provider.available() and keyring_provider.get()):
+        return
+    if keyring_provider.store(new_password):
+        print("✅ Saved password in Credential Manager updated\n")
+    elif keyring_provider.delete():
+        print("⚠️  Could not update the saved password in Credential Manager; it was deleted\n")
+    else:
+        print("⚠️  Saved password in Credential Manager is outdated; delete it from the options menu\n")
+
+
+def rotate_vault_files(paths, kdf_iterations=None, workers=None):
+    """Rotate the master password of several credentials vaults at once (all or nothing)"""
+    print("=" * 60)
+    print(f"🔑 Rotate Master Password ({len(paths)} vault(s))")
+    print("=" * 60)
+    old_password = getpass.getpass("Current password: ")
+    new_password = getpass.getpass("New master password: ")
+    if not new_password:
+        print("❌ Master password cannot be empty")
+        sys.exit(1)
+    if new_password != getpass.getpass("Confirm master password: "):
+        print("❌ Passwords do not match")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    results = rotate_vaults([Path(p) for p in paths], old_password, new_password,
+                            iterations=kdf_iterations, max_workers=workers)
+    print("\n" + format_rotation_report(results))
+    # This app's own vault now opens with the new password: keep Credential Manager in step
+    own_vault = ConfigManager().cred_path.resolve()
+    if any(r.status == "rotated" and r.path.resolve() == own_vault for r in results):
+        update_saved_master_password(new_password)
+    if all(r.status == "rotated" for r in results):
+        print(f"\n✅ {len(results)} vault(s) rotated in {time.perf_counter() - start:.1f}s\n")
+    else:
+        print("\n❌ Rotation failed\n" + format_rotation_outcome(results) + "\n")
+        sys.exit(1)
+
+
 def delete_saved_master_password():
     """Delete saved master password from Windows Credential Manager"""
     print("\n" + "=" * 60)
     print("🗑️  Delete Saved Master Password")
     print("=" * 60)
     
-    if not is_keyring_available():
+    keyring_provider = default_chain().provider("keyring")
+    if not keyring_provider.available():
         print("⚠️  Windows Credential Manager is not available")
         return
     
-    saved_password = load_master_password()
+    saved_password = keyring_provider.get()
     if not saved_password:
         print("ℹ️  No saved master password found in Credential Manager")
         return
@@ -183,7 +247,7 @@ def delete_saved_master_password():
         print("Cancelled.")
         return
     
-    if delete_master_password():
+    if keyring_provider.delete():
         print("✅ Saved master password deleted from Windows Credential Manager")
         print("   You will need to enter your password manually next time")
     else:
@@ -198,7 +262,7 @@ def install_command_to_path():
     os.makedirs(user_bin, exist_ok=True)
     bat_path = os.path.join(user_bin, "wolrdp.bat")
     # Create a simple batch file that runs run.bat in this folder
-    script = f"@echo off\ncd /d \"{os.path.dirname(os.path.abspath(__file__))}\"\ncall run.bat %*\n"
+    script = f"@echo off\ncd /d \"{app_dir()}\"\ncall run.bat %*\n"
     with open(bat_path, "w", encoding="utf-8") as f:
         f.write(script)
     print(f"\n✅ 'wolrdp.bat' installed to: {bat_path}")
@@ -278,7 +342,139 @@ def options_menu():
             print("Invalid selection. Please choose 1-9.")
 
 
-def run_main_flow(master_password: str, select_mode: bool = False):
+def propose_lan_port(name: str, driver, mac_address: str) -> int:
+    """Run port discovery for one machine and ask to use the proposed port; 0 if none was accepted."""
+    print(f"📡 Sending WOL to {mac_address} and watching the router's LAN ports...")
+    result = discover_lan_port(name, driver, mac_address)
+    if result.port is None:
+        print(f"❌ Port not detected: {result.error}")
+        return 0
+    print(f"✅ LAN port {result.port} came up {result.seconds:.0f} seconds after the WOL")
+    if input(f"Use port {result.port} for '{name}'? (y/n): ").strip().lower() != 'y':
+        return 0
+    return result.port
+
+
+def run_discover_flow(master_password: str, names: str):
+    """Detect and store wol.lan_port for the named targets (one at a time, each must be off)."""
+    config_manager = ConfigManager()
+    try:
+        config = config_manager.load_config()
+        credentials = config_manager.load_credentials(master_password)
+    except Exception as e:
+        print(f"❌ Failed to load config/credentials: {e}")
+        sys.exit(1)
+
+    targets = select_targets(config, names)
+    if not targets:
+        return
+    state_cache = StateCache(config_manager.config_dir / DEFAULT_STATE_FILE)
+    changed = False
+    for target in targets:
+        name = target["name"]
+        cred = credentials.get(name)
+        if not cred:
+            print(f"❌ No credentials found for target '{name}', skipping")
+            continue
+        print("\n" + "=" * 60)
+        print(f"🔎 Detecting LAN port for '{name}' (current: {target['wol'].get('lan_port', 0) or 'none'})")
+        print("=" * 60)
+        input("Make sure the PC is shut down, then press Enter...")
+        port = propose_lan_port(name, create_driver(target["router"], cred, verbose=False),
+                                target["wol"]["mac_address"])
+        if port:
+            target["wol"]["lan_port"] = port
+            reset_link_checks(state_cache, name)
+            changed = True
+    if changed:
+        config_manager.save_config(config)
+
+
+def wake_and_wait(target: dict, cred: dict, state_cache: StateCache = None) -> str:
+    """
+    Send WOL for a target and wait for it to wake up.
+
+    On a terminal the wait runs in the live console (keys: connect now,
+    re-send WOL, abort, switch target). Returns "connect" (go on to Remote
+    Desktop), "retry" (the user chose not to continue), "abort" or "switch".
+    """
+    name = target["name"]
+    lan_port = target.get("wol", {}).get("lan_port", 0)
+    max_wait_seconds = 30
+    # WOL
+    print("\n" + "=" * 60)
+    print(f"📡 Sending WOL packet for target '{name}'...")
+    print("=" * 60)
+    if choose_wake_path(target) != "direct":
+        print(f"📡 Connecting to router... ({target['router']['url']})")
+    if lan_port > 0:
+        print(f"⏳ Waiting for PC to wake up (checking port {lan_port} status)...")
+    else:
+        print(f"⏳ Waiting for PC to wake up (checking RDP port {target['rdp']['server']})...")
+
+    keys = KeyReader()
+    if keys.interactive:
+        try:
+            result, action = LiveWait(target, cred, ready_timeout=max_wait_seconds, cache=state_cache, keys=keys).run()
+        except Exception as e:
+            print(f"❌ WOL transmission failed: {e}")
+            response = input("\nContinue anyway? (y/n): ").strip().lower()
+            return "connect" if response == 'y' else "retry"
+        if action == "connect":
+            print("⏩ Connecting now without waiting for the wake")
+            return "connect"
+        if action == "abort":
+            print(f"⏹️  Wake aborted for '{name}'")
+            return "abort"
+        if action == "switch":
+            return "switch"
+    else:
+        def on_tick(elapsed):
+            if int(elapsed) % 5 == 0 and int(elapsed) > 0:
+                print(f"   Still waiting... ({int(elapsed)}/{max_wait_seconds}s)")
+
+        result = wake(target, cred, ready_timeout=max_wait_seconds, cache=state_cache, on_tick=on_tick)
+    if result.status == "already_up":
+        print("✅ PC is already awake, skipping wake")
+        return "connect"
+    if result.status == "failed":
+        print(f"❌ WOL transmission failed: {result.error}")
+        response = input("\nContinue anyway? (y/n): ").strip().lower()
+        return "connect" if response == 'y' else "retry"
+    print(f"✅ WOL packet sent successfully (via {'LAN broadcast' if result.path == 'direct' else 'router'})")
+    if result.port_mismatch:
+        print(f"⚠️  RDP port answered but router port {lan_port} never came up")
+        if state_cache is not None and mapping_suspect(state_cache, name):
+            print(f"   The PC may have moved to another port. Run with --discover-port {name} to detect it again.")
+    if result.status == "ready":
+        retried = f", woke on WOL attempt {result.attempts}" if result.attempts > 1 else ""
+        print(f"✅ PC is awake! (up after {result.ready_seconds - result.sent_seconds:.0f} seconds{retried})")
+        return "connect"
+    print(f"\n❌ Timeout: Could not detect PC wake up after {max_wait_seconds} seconds")
+    print("   The PC may still be booting, or WOL may have failed.")
+    response = input("   Continue to Remote Desktop anyway? (y/n): ").strip().lower()
+    return "connect" if response == 'y' else "retry"
+
+
+def prompt_target(targets: list):
+    """Ask which target to use; index into targets, or None if the answer is invalid."""
+    print("\nAvailable targets:")
+    for idx, t in enumerate(targets):
+        print(f"  {idx+1}. {t['name']} (RDP: {t['rdp']['server']})")
+    sel = input(f"Select target (1-{len(targets)}) [default: 1]: ").strip()
+    if not sel:
+        sel = "1"
+        print(f"  → Using default target: 1")
+    try:
+        sel_idx = int(sel) - 1
+        assert 0 <= sel_idx < len(targets)
+    except Exception:
+        print("Invalid selection.")
+        return None
+    return sel_idx
+
+
+def run_main_flow(master_password: str, select_mode: bool = False, client: str = "mstsc"):
     """Select target, load config/credentials, run WOL+MSTSC for that target."""
     config_manager = ConfigManager()
     # Load config/credentials
@@ -301,18 +497,8 @@ def run_main_flow(master_password: str, select_mode: bool = False):
         return
 
     if select_mode:
-        print("\nAvailable targets:")
-        for idx, t in enumerate(targets):
-            print(f"  {idx+1}. {t['name']} (RDP: {t['rdp']['server']})")
-        sel = input(f"Select target (1-{len(targets)}) [default: 1]: ").strip()
-        if not sel:
-            sel = "1"
-            print(f"  → Using default target: 1")
-        try:
-            sel_idx = int(sel) - 1
-            assert 0 <= sel_idx < len(targets)
-        except Exception:
-            print("Invalid selection.")
+        sel_idx = prompt_target(targets)
+        if sel_idx is None:
             return
     else:
         sel_idx = 0
@@ -325,50 +511,34 @@ def run_main_flow(master_password: str, select_mode: bool = False):
         print(f"❌ No credentials found for target '{name}'. Please re-add this target.")
         return
 
+    state_cache = StateCache(config_manager.config_dir / DEFAULT_STATE_FILE)
     while True:
-        # WOL
-        print("\n" + "=" * 60)
-        print(f"📡 Sending WOL packet for target '{name}'...")
-        print("=" * 60)
-        wol_obj = None
-        try:
-            wol_obj = IPTimeWOL(
-                router_url=target["router"]["url"],
-                router_id=cred["router_id"],
-                router_pw=cred["router_pw"]
-            )
-            wol_obj.send_wol_packet(target["wol"]["mac_address"])
-            print("✅ WOL packet sent successfully")
-        except Exception as e:
-            print(f"❌ WOL transmission failed: {e}")
-            response = input("\nContinue anyway? (y/n): ").strip().lower()
-            if response != 'y':
-                continue
-        # Wait for PC to wake up
-        lan_port = target.get("wol", {}).get("lan_port", 0)
-        if wol_obj and lan_port > 0:
-            print(f"\n⏳ Waiting for PC to wake up (checking port {lan_port} status)...")
-            max_wait_seconds = 30
-            check_interval = 1
-            for elapsed in range(0, max_wait_seconds, check_interval):
-                try:
-                    if wol_obj.is_lan_port_up(lan_port):
-                        print(f"✅ PC is awake! (port {lan_port} up after {elapsed} seconds)")
-                        break
-                except Exception:
-                    pass
-                if elapsed % 5 == 0 and elapsed > 0:
-                    print(f"   Still waiting... ({elapsed}/{max_wait_seconds}s)")
-                time.sleep(check_interval)
+        status = precheck_target(target, state_cache)
+        if status:
+            if status.cached_age is not None:
+                print(f"\n✅ Target '{name}' was up {status.cached_age:.0f}s ago, skipping wake")
             else:
-                print(f"\n❌ Timeout: Could not detect PC wake up after {max_wait_seconds} seconds")
-                print("   The PC may still be booting, or WOL may have failed.")
-                response = input("   Continue to Remote Desktop anyway? (y/n): ").strip().lower()
-                if response != 'y':
-                    continue
+                print(f"\n✅ Target '{name}' is up (RDP port answered in {status.rdp_seconds * 1000:.0f} ms), skipping wake")
         else:
-            print("\n⏳ Waiting for PC to boot... (5 seconds, no port check configured)")
-            time.sleep(5)
+            action = wake_and_wait(target, cred, state_cache)
+            if action == "abort":
+                print("\nPress [r] to retry, [s] to switch target, [q] to quit...")
+                action = {"s": "switch", "q": "quit"}.get(input().strip().lower(), "retry")
+                if action == "quit":
+                    print("Exiting program.")
+                    break
+            if action == "switch":
+                sel_idx = prompt_target(targets)
+                if sel_idx is not None:
+                    target = targets[sel_idx]
+                    name = target["name"]
+                    cred = credentials.get(name)
+                    if not cred:
+                        print(f"❌ No credentials found for target '{name}'. Please re-add this target.")
+                        return
+                continue
+            if action != "connect":
+                continue
         # MSTSC
         print("\n" + "=" * 60)
         print("🖥️  Connecting to Remote Desktop...")
@@ -377,10 +547,21 @@ def run_main_flow(master_password: str, select_mode: bool = False):
             mstsc = MSTSCConnector(
                 server=target["rdp"]["server"],
                 username=cred["rdp_id"],
-                password=cred["rdp_pw"]
+                password=cred["rdp_pw"],
+                settings=target["rdp"].get("settings"),
+                client=target["rdp"].get("client", client),
+                profile=target["rdp"].get("profile", "auto"),
+                servers=target["rdp"].get("servers"),
+                link=known_link(state_cache, name)
             )
-            mstsc.connect()
-            print("✅ Remote Desktop connection initiated")
+            result = ClientSupervisor().supervise(mstsc, LaunchResult(name))
+            if result.status == "connected":
+                record_connected(target, state_cache)
+                print(f"✅ Remote Desktop connected ({result.connect_seconds:.1f}s after launch)")
+            elif result.status == "unconfirmed":
+                print(f"⚠️  Remote Desktop client is running: {result.error}")
+            else:
+                print(f"❌ Remote Desktop client exited: {result.error} (attempts: {result.attempts})")
         except Exception as e:
             print(f"❌ Remote Desktop connection failed: {e}")
             continue
@@ -400,6 +581,190 @@ def run_main_flow(master_password: str, select_mode: bool = False):
         # r 또는 Enter면 루프 반복 (재연결)
 
 
+def select_targets(config: dict, names: str):
+    """Resolve comma-separated target names (or "all") to target configs; None if any name is unknown."""
+    targets = config.get("targets", [])
+    if names.strip().lower() == "all":
+        return targets
+    wanted = [n.strip() for n in names.split(",") if n.strip()]
+    by_name = {t["name"]: t for t in targets}
+    missing = [n for n in wanted if n not in by_name]
+    if missing:
+        print(f"❌ Unknown target(s): {', '.join(missing)}")
+        return None
+    return [by_name[n] for n in wanted]
+
+
+def run_multi_flow(master_password: str, names: str, max_concurrent: int = 4, client: str = "mstsc"):
+    """Wake several targets and open a Remote Desktop session for each as soon as it is ready."""
+    config_manager = ConfigManager()
+    try:
+        config = config_manager.load_config()
+        credentials = config_manager.load_credentials(master_password)
+    except Exception as e:
+        print(f"❌ Failed to load config/credentials: {e}")
+        sys.exit(1)
+
+    targets = select_targets(config, names)
+    if targets is None:
+        return
+
+    state_cache = StateCache(config_manager.config_dir / DEFAULT_STATE_FILE)
+    jobs = []
+    for target in targets:
+        cred = credentials.get(target["name"])
+        if not cred:
+            print(f"⚠️  No credentials found for target '{target['name']}', skipping")
+            continue
+        driver = create_driver(target["router"], cred)
+        mstsc = MSTSCConnector(
+            server=target["rdp"]["server"],
+            username=cred["rdp_id"],
+            password=cred["rdp_pw"],
+            settings=target["rdp"].get("settings"),
+            client=target["rdp"].get("client", client),
+            profile=target["rdp"].get("profile", "auto"),
+            servers=target["rdp"].get("servers"),
+            link=known_link(state_cache, target["name"])
+        )
+        jobs.append(LaunchJob(target["name"], mstsc, wake=lambda t=target, d=driver: wake_target(t, d)))
+
+    if not jobs:
+        print("⚠️  No targets to launch.")
+        return
+
+    print("\n" + "=" * 60)
+    print(f"🚀 Launching {len(jobs)} target(s) (max {max_concurrent} at once)...")
+    print("=" * 60)
+
+    def on_status(result):
+        print(f"   [{result.name}] {result.status}" + (f": {result.error}" if result.error else ""))
+
+    launcher = SessionLauncher(max_concurrent=max_concurrent, on_status=on_status)
+    try:
+        results = launcher.launch_all(jobs)
+    except KeyboardInterrupt:
+        launcher.cancel()
+        raise
+    print("\n" + format_launch_report(results))
+
+
+def run_wake_flow(master_password: str, names: str, power_on_rate: float = 1.0):
+    """Wake several targets with staggered power-on (no Remote Desktop) and print the timeline."""
+    config_manager = ConfigManager()
+    try:
+        config = config_manager.load_config()
+        credentials = config_manager.load_credentials(master_password)
+    except Exception as e:
+        print(f"❌ Failed to load config/credentials: {e}")
+        sys.exit(1)
+
+    targets = select_targets(config, names)
+    if not targets:
+        return
+    plan = plan_staggered_wake(targets, power_on_rate=power_on_rate)
+    print("\n" + "=" * 60)
+    print(f"📡 Waking {len(plan)} target(s) at {power_on_rate:g} machine(s)/s "
+          f"(planned {plan[-1].planned_offset:.1f}s to power on all)...")
+    print("=" * 60)
+
+    def on_event(entry):
+        print(f"   [{entry.name}] {entry.status}" + (f": {entry.error}" if entry.error else ""))
+
+    execute_wake_plan(plan, credentials, on_event=on_event)
+    print("\n" + format_wake_timeline(plan))
+
+
+def run_status_flow(master_password: str, deadline: float = 5.0, handshake: bool = False):
+    """Check every configured target at once and stream a status table."""
+    config_manager = ConfigManager()
+    try:
+        config = config_manager.load_config()
+        credentials = config_manager.load_credentials(master_password)
+    except Exception as e:
+        print(f"❌ Failed to load config/credentials: {e}")
+        sys.exit(1)
+
+    targets = config.get("targets", [])
+    if not targets:
+        print("⚠️  No targets configured. Please add a target first.")
+        return
+    state_cache = StateCache(config_manager.config_dir / DEFAULT_STATE_FILE)
+    print("\n" + format_status_header())
+    results = status_sweep(
+        targets,
+        credentials,
+        deadline=deadline,
+        handshake=handshake,
+        cache=state_cache,
+        max_age=state_cache.ttl,
+        on_result=lambda status: print(format_status_row(status), flush=True)
+    )
+    up = sum(1 for r in results if r.is_up)
+    print(f"\n{up}/{len(results)} target(s) up")
+
+
+def run_watch_flow(master_password: str, interval: float = 2.0):
+    """Watch router port links of all targets and print change events as JSON lines."""
+    config_manager = ConfigManager()
+    try:
+        config = config_manager.load_config()
+        credentials = config_manager.load_credentials(master_password)
+    except Exception as e:
+        print(f"❌ Failed to load config/credentials: {e}")
+        sys.exit(1)
+
+    watcher = build_watcher(config.get("targets", []), credentials, interval=interval, on_event=print_json_event)
+    if not watcher.routers:
+        print("⚠️  No routers to watch.", file=sys.stderr)
+        return
+    print(f"👀 Watching {len(watcher.routers)} router(s) every {interval:g}s (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+        raise
+
+
+def run_prewake_flow(master_password: str):
+    """Run the pre-wake scheduler for targets with a "prewake" schedule until interrupted."""
+    config_manager = ConfigManager()
+    try:
+        config = config_manager.load_config()
+        credentials = config_manager.load_credentials(master_password)
+    except Exception as e:
+        print(f"❌ Failed to load config/credentials: {e}")
+        sys.exit(1)
+
+    scheduler = PreWakeScheduler(
+        config.get("targets", []),
+        credentials,
+        history_path=config_manager.config_dir / "prewake_history.jsonl"
+    )
+    print("\n" + "=" * 60)
+    print(f"⏰ Pre-wake scheduler running ({len(scheduler.entries)} scheduled target(s), Ctrl+C to stop)")
+    print("=" * 60)
+    for wake_at, session_at, target in scheduler.upcoming():
+        print(f"   {target['name']}: wake {wake_at:%Y-%m-%d %H:%M} for session {session_at:%H:%M}")
+    scheduler.run()
+
+
+def instrument_for_profiling(profiler: Profiler):
+    """Time the CLI flows, menu actions and known hot spots (keyring, PBKDF2, router, client launch) as phases."""
+    import crypto_utils
+    this = sys.modules[__name__]
+    profiler.instrument([
+        (this, "get_master_password"), (crypto_utils, "load_master_password"), (crypto_utils, "save_master_password"),
+        (this, "initialize_config"), (this, "change_master_password"), (this, "delete_saved_master_password"),
+        (this, "install_command_to_path"), (this, "uninstall_command_from_path"), (this, "options_menu"),
+        (this, "run_main_flow"), (this, "wake_and_wait"), (this, "run_multi_flow"), (this, "run_wake_flow"),
+        (this, "run_status_flow"), (this, "run_watch_flow"), (this, "run_prewake_flow"),
+        (crypto_utils, "derive_key_from_password"),
+        (IPTimeWOL, "_post"),
+        (MSTSCConnector, "connect"),
+    ])
+
+
 def main():
     """Main program entry: prompt for master password immediately, options menu if blank."""
     print("=" * 60)
@@ -425,17 +790,50 @@ def main():
     run_main_flow(master_password, select_mode=False)
 
 
-if __name__ == "__main__":
+def cli():
+    """Command line entry: parse options and run the selected flow."""
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='WOL-MSTSC: Wake-on-LAN + Remote Desktop Connection Tool')
     parser.add_argument('--change-password', action='store_true', help='Change master password')
+    parser.add_argument('--rotate', nargs='+', metavar='VAULT', help='Re-encrypt several credentials.enc vaults with a new master password in parallel')
+    parser.add_argument('--kdf-iterations', type=int, help='PBKDF2 iterations for vaults written by --rotate (default: keep each vault\'s count)')
+    parser.add_argument('--workers', type=int, help='Worker processes for --rotate (default: CPU count)')
     parser.add_argument('-s', '--select', action='store_true', help='Select RDP target profile interactively')
+    parser.add_argument('-m', '--multi', metavar='NAMES', help='Wake and connect several targets at once (comma-separated names or "all")')
+    parser.add_argument('--max-concurrent', type=int, default=4, help='Maximum clients started at the same time with --multi (default: 4)')
+    parser.add_argument('-w', '--wake', metavar='NAMES', help='Wake several targets with staggered power-on, no Remote Desktop (comma-separated names or "all")')
+    parser.add_argument('--power-on-rate', type=float, default=1.0, help='Machines powered on per second with --wake (default: 1)')
+    parser.add_argument('--status', action='store_true', help='Check all targets at once (router port link + RDP port)')
+    parser.add_argument('--deadline', type=float, default=5.0, help='Seconds for the whole --status sweep (default: 5)')
+    parser.add_argument('--handshake', action='store_true', help='Also perform an RDP handshake with --status')
+    parser.add_argument('--watch', action='store_true', help='Watch router port links and print up/down/speed events as JSON lines')
+    parser.add_argument('--watch-interval', type=float, default=2.0, help='Seconds between polls of each router with --watch (default: 2)')
+    parser.add_argument('--discover-port', metavar='NAMES', help='Detect the router LAN port of targets by waking them (comma-separated names or "all")')
+    parser.add_argument('--prewake', action='store_true', help='Run the pre-wake scheduler (targets with a "prewake" schedule in config.json)')
+    parser.add_argument('--metrics-file', metavar='PATH', help='Write Prometheus metrics to this file (periodically in long-running modes, and at exit)')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT', help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--record-trace', metavar='PATH', help='Record router API traffic (credentials scrubbed) to a JSON lines trace')
+    parser.add_argument('--profile', metavar='PATH', help='Profile the run with cProfile; write stats to PATH and a summary to PATH.txt')
+    parser.add_argument('--trace-malloc', action='store_true', help='Track memory allocations with tracemalloc and summarize the top allocations')
+    parser.add_argument('--profile-interval', type=float, metavar='SECONDS', help='Sample all threads and rewrite a snapshot summary every SECONDS (long-running modes)')
+    parser.add_argument('--client', default='mstsc', help='Remote Desktop client: mstsc or xfreerdp (default: mstsc)')
 
     args = parser.parse_args()
 
+    if args.record_trace:
+        enable_recording(Path(args.record_trace))
+    if args.metrics_file or args.metrics_port is not None:
+        start_metrics_export(path=args.metrics_file, port=args.metrics_port)
+    profiler = Profiler(args.profile, args.trace_malloc, args.profile_interval)
+    if profiler.enabled:
+        instrument_for_profiling(profiler)
+        profiler.start()
+
     try:
         if args.change_password:
             change_master_password()
+        elif args.rotate:
+            rotate_vault_files(args.rotate, args.kdf_iterations, args.workers)
         else:
             # select_mode: True면 타겟 선택, False면 1번 자동
             def main_with_select():
@@ -450,11 +848,30 @@ if __name__ == "__main__":
                 if not config_manager.config_exists():
                     print("\n⚠️  No configuration found. Starting initial setup...")
                     master_password = initialize_config()
-                run_main_flow(master_password, select_mode=args.select)
-            main_with_select()
+                if args.status:
+                    run_status_flow(master_password, args.deadline, args.handshake)
+                elif args.watch:
+                    run_watch_flow(master_password, args.watch_interval)
+                elif args.discover_port:
+                    run_discover_flow(master_password, args.discover_port)
+                elif args.prewake:
+                    run_prewake_flow(master_password)
+                elif args.wake:
+                    run_wake_flow(master_password, args.wake, args.power_on_rate)
+                elif args.multi:
+                    run_multi_flow(master_password, args.multi, args.max_concurrent, args.client)
+                else:
+                    run_main_flow(master_password, select_mode=args.select, client=args.client)
+            profiler.wrap(main_with_select, "main")()
     except KeyboardInterrupt:
         print("\n\nProgram interrupted by user")
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ Unexpected error occurred: {e}")
         sys.exit(1)
+    finally:
+        profiler.stop()
+
+
+if __name__ == "__main__":
+    cli()